@@ -0,0 +1,48 @@
+"""
+Compare two benchmark result files, e.g. of a base and a head commit.
+
+    python benchmarks/compare.py benchmarks/results/<base>.json benchmarks/results/<head>.json
+"""
+from typing import Dict, Any, Tuple, Optional
+import sys
+import json
+
+
+def load(path: str) -> Tuple[Dict[str, Any], Dict[Tuple[str, int], Dict[str, Any]]]:
+    with open(path) as file:
+        report = json.load(file)
+    return report, {(result["scenario"], result["models"]): result for result in report["results"]}
+
+
+def ratio(base: Optional[float], head: Optional[float]) -> str:
+    if not base or head is None:
+        return "-"
+    return f"{head / base:.2f}x"
+
+
+def main(base_path: str, head_path: str) -> None:
+    base_report, base = load(base_path)
+    head_report, head = load(head_path)
+
+    if base_report["parameters"] != head_report["parameters"]:
+        print("Warning: Runs were made with different parameters, results are not directly comparable.")
+
+    print(f"base {base_report['commit']}  head {head_report['commit']}")
+    print(f"{'scenario':<22} {'models':>7} {'models/s':>12} {'speedup':>8} {'peak memory':>12} {'api calls':>12}")
+    for key, head_result in head.items():
+        base_result = base.get(key)
+        if base_result is None:
+            continue
+
+        base_calls = sum(base_result["api_calls"].values())
+        head_calls = sum(head_result["api_calls"].values())
+        print(f"{key[0]:<22} {key[1]:>7} {head_result['models_per_sec']:>12.1f} "
+              f"{ratio(base_result['models_per_sec'], head_result['models_per_sec']):>8} "
+              f"{ratio(base_result['peak_memory_bytes'], head_result['peak_memory_bytes']):>12} "
+              f"{base_calls:>5} -> {head_calls:<5}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        raise SystemExit(__doc__)
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,259 @@
+from typing import List, Dict, Any, Optional
+import re
+import json
+import time
+import threading
+from collections import Counter
+import pandas as pd
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+from bqml_registry import RegistrySchema
+
+
+class FakeQueryJob():
+    """Finished query job, also acts as its own RowIterator."""
+
+    def __init__(self, df: pd.DataFrame, job_id: str) -> None:
+        self.df = df
+        self.job_id = job_id
+        # Rough estimate, 8 bytes per cell
+        self.total_bytes_processed = 8 * df.size
+        self.total_bytes_billed = max(self.total_bytes_processed, 10 * 1024 ** 2)
+        self.slot_millis = len(df)
+        self.cache_hit = False
+
+    def result(self, **kwargs) -> "FakeQueryJob":
+        return self
+
+    def cancel(self) -> bool:
+        return True
+
+    def to_dataframe(self, **kwargs) -> pd.DataFrame:
+        return self.df
+
+    def to_arrow(self, **kwargs):
+        import pyarrow as pa
+        return pa.Table.from_pandas(self.df, preserve_index=False)
+
+    def to_arrow_iterable(self, **kwargs):
+        return iter(self.to_arrow().to_batches())
+
+    def to_dataframe_iterable(self, **kwargs):
+        return (batch.to_pandas() for batch in self.to_arrow_iterable())
+
+
+class FakeBigQueryClient():
+    """
+    In-process stand-in for bigquery.Client, serving synthetic models of a single dataset.
+    Model resources and ML.* results are generated on demand from model id, so memory use
+    of the fake does not grow with the number of models. Every API call sleeps for latency
+    seconds, queries for query_latency seconds, and is counted in calls.
+    """
+
+    def __init__(self,
+                 project_id: str = "bench-project",
+                 dataset_id: str = "bench_dataset",
+                 num_models: int = 1000,
+                 num_features: int = 100,
+                 num_hyperparams: int = 50,
+                 num_trials: int = 20,
+                 tuning_every: int = 2,
+                 latency: float = 0.0,
+                 query_latency: float = 0.0) -> None:
+        self.project = project_id
+        self.dataset_id = dataset_id
+        self.num_models = num_models
+        self.num_features = num_features
+        self.num_hyperparams = num_hyperparams
+        self.num_trials = num_trials
+        self.tuning_every = tuning_every
+        self.latency = latency
+        self.query_latency = query_latency
+
+        self.calls: Counter = Counter()
+        self.inserted_rows = 0
+        self.inserted_bytes = 0
+        self._lock = threading.Lock()
+
+        registry_schema = RegistrySchema(feature_importance=True)
+        self.registry_schema = (
+            registry_schema.general_fields + registry_schema.feature_importance_fields + registry_schema.eval_fields
+            + registry_schema.training_info_fields + registry_schema.hyperparam_fields + registry_schema.tunning_fields
+        )
+
+    def model_ids(self) -> List[str]:
+        return [f"model_{index:06d}" for index in range(self.num_models)]
+
+    def _call(self, name: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self.calls[name] += 1
+        latency = self.latency if latency is None else latency
+        if latency:
+            time.sleep(latency)
+
+    def _model_index(self, full_model_id: str) -> int:
+        match = re.fullmatch(rf"{re.escape(self.project)}\.{re.escape(self.dataset_id)}\.model_(\d+)", full_model_id)
+        if match is None or int(match.group(1)) >= self.num_models:
+            raise NotFound(f"Not found: Model {full_model_id}")
+        return int(match.group(1))
+
+    def _is_tuned(self, index: int) -> bool:
+        return self.tuning_every > 0 and index % self.tuning_every == 0
+
+    def model_resource(self, full_model_id: str) -> Dict[str, Any]:
+        """Synthetic BOOSTED_TREE_REGRESSOR resource, every tuning_every-th model is hyperparameter-tuned."""
+
+        index = self._model_index(full_model_id)
+        tuned = self._is_tuned(index)
+
+        # Mix of float, string and list hyperparameters, as in real training options
+        training_options: Dict[str, Any] = {"inputLabelColumns": ["label"], "numTrials": str(self.num_trials if tuned else 0)}
+        for position in range(self.num_hyperparams):
+            if position % 3 == 0:
+                training_options[f"hparam_{position}"] = position * 0.5
+            elif position % 3 == 1:
+                training_options[f"hparam_{position}"] = f"option_{position}"
+            else:
+                training_options[f"hparam_{position}"] = [f"column_{position}", f"column_{position + 1}"]
+
+        training_run = {
+            "trainingOptions": training_options,
+            "results": [{"index": 0, "trainingLoss": 1.5, "evalLoss": 1.7, "durationMs": "1000"}],
+        }
+        if not tuned:
+            training_run["evaluationMetrics"] = {
+                "regressionMetrics": {"meanAbsoluteError": 0.5, "meanSquaredError": 0.4, "r2Score": 0.9}
+            }
+
+        return {
+            "modelReference": {"projectId": self.project, "datasetId": self.dataset_id, "modelId": f"model_{index:06d}"},
+            "modelType": "BOOSTED_TREE_REGRESSOR",
+            "etag": f"etag-{index}",
+            "creationTime": str(1700000000000 + index * 1000),
+            "lastModifiedTime": str(1700000000000 + index * 1000),
+            "location": "US",
+            "featureColumns": [
+                {"name": f"feature_{position}", "type": {"typeKind": "FLOAT64"}} for position in range(self.num_features)
+            ],
+            "labelColumns": [{"name": "predicted_label", "type": {"typeKind": "FLOAT64"}}],
+            "trainingRuns": [training_run],
+        }
+
+    def _feature_importance(self) -> List[Dict[str, Any]]:
+        return [
+            {"feature": f"feature_{position}", "importance_weight": float(position),
+             "importance_gain": position * 0.1, "importance_cover": position * 0.01}
+            for position in range(self.num_features)
+        ]
+
+    def _trials(self) -> List[Dict[str, Any]]:
+        """Trials in the nested layout of ML.TRIAL_INFO, hyperparameters vary per trial."""
+        return [
+            {
+                "trial_id": trial,
+                "hyperparameters": {
+                    "learn_rate": 0.01 * (trial + 1),
+                    "max_tree_depth": trial % 10 + 1,
+                    "l1_reg": trial * 0.1,
+                    "booster_type": "GBTREE" if trial % 2 else "DART",
+                },
+                "hparam_tuning_evaluation_metrics": {"mean_squared_error": 1.0 / (trial + 1), "r2_score": trial / self.num_trials},
+                "training_loss": 1.0 / (trial + 1),
+                "eval_loss": 1.1 / (trial + 1),
+                "status": "SUCCEEDED",
+                "error_message": None,
+                "is_optimal": trial == self.num_trials - 1,
+            }
+            for trial in range(self.num_trials)
+        ]
+
+    def seed(self, backend) -> None:
+        """Add the synthetic models with their ML.* records to a LocalBackend, to run scenarios on its SQL engine."""
+        for model_id in self.model_ids():
+            full_model_id = f"{self.project}.{self.dataset_id}.{model_id}"
+            tuned = self._is_tuned(self._model_index(full_model_id))
+            backend.add_model(self.model_resource(full_model_id), self._feature_importance(),
+                              self._trials() if tuned else None)
+
+    def get_model(self, model_ref, **kwargs) -> bigquery.Model:
+        self._call("get_model")
+        if not isinstance(model_ref, str):
+            model_ref = f"{model_ref.project}.{model_ref.dataset_id}.{model_ref.model_id}"
+        return bigquery.Model.from_api_repr(self.model_resource(model_ref))
+
+    def list_models(self, dataset_id, **kwargs) -> List[bigquery.Model]:
+        self._call("list_models")
+        return [
+            bigquery.Model.from_api_repr(self.model_resource(f"{self.project}.{self.dataset_id}.{model_id}"))
+            for model_id in self.model_ids()
+        ]
+
+    def get_table(self, table_id, **kwargs) -> bigquery.Table:
+        self._call("get_table")
+        table = bigquery.Table(table_id, schema=self.registry_schema)
+        table._properties["etag"] = "registry-etag"
+        return table
+
+    def create_table(self, table: bigquery.Table, **kwargs) -> bigquery.Table:
+        self._call("create_table")
+        return table
+
+    def insert_rows_json(self, table_id, rows, **kwargs) -> List[Dict[str, Any]]:
+        self._call("insert_rows_json")
+
+        # Serialize like the real client would, rows themselves are not kept
+        num_bytes = len(json.dumps(list(rows), default=str))
+        with self._lock:
+            self.inserted_rows += len(rows)
+            self.inserted_bytes += num_bytes
+        return []
+
+    def query(self, sql: str, job_config=None, **kwargs) -> FakeQueryJob:
+        self._call("query", self.query_latency)
+        job_id = f"job_{sum(self.calls.values())}"
+        model_ids = re.findall(r"MODEL `([^`]+)`", sql)
+
+        if "ML.FEATURE_IMPORTANCE" in sql:
+            records = []
+            for full_model_id in model_ids:
+                self._model_index(full_model_id)
+                records.extend({"model_id": full_model_id, **row} for row in self._feature_importance())
+
+            df = pd.DataFrame.from_records(records)
+            if "AS model_id" not in sql:
+                df = df.drop(columns="model_id")
+            return FakeQueryJob(df, job_id)
+
+        if "ML.TRIAL_INFO" in sql:
+            for full_model_id in model_ids:
+                if not self._is_tuned(self._model_index(full_model_id)):
+                    raise ValueError(f"Model {full_model_id} is not a hyperparameter tuning model")
+
+            # Batched form, trials serialized to JSON per model
+            if "TO_JSON_STRING" in sql:
+                trials = [json.dumps(trial) for trial in self._trials()]
+                df = pd.DataFrame({
+                    "model_id": [full_model_id for full_model_id in model_ids for _ in trials],
+                    "trial": trials * len(model_ids),
+                })
+                return FakeQueryJob(df, job_id)
+
+            # Single model form with structs expanded, projection is not emulated
+            records = []
+            for trial in self._trials():
+                record = {"trial_id": trial["trial_id"], **trial["hyperparameters"], **trial["hparam_tuning_evaluation_metrics"]}
+                record.update({key: trial[key] for key in ("training_loss", "eval_loss", "status", "error_message", "is_optimal")})
+                records.append(record)
+
+            df = pd.DataFrame.from_records(records)
+            if "WHERE is_optimal" in sql:
+                df = df[df["is_optimal"]]
+            limit = re.search(r"LIMIT (\d+)", sql)
+            if limit is not None:
+                df = df.head(int(limit.group(1)))
+            return FakeQueryJob(df.reset_index(drop=True), job_id)
+
+        # Registry reads (e.g. registered keys) and INFORMATION_SCHEMA lookups find nothing
+        return FakeQueryJob(pd.DataFrame({"project_id": pd.Series(dtype=object), "dataset_id": pd.Series(dtype=object),
+                                          "model_name": pd.Series(dtype=object), "created": pd.Series(dtype=object),
+                                          "full_model_id": pd.Series(dtype=object), "query": pd.Series(dtype=object)}), job_id)
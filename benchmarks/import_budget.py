@@ -0,0 +1,78 @@
+"""
+Import-time budget check. Each import statement runs in a fresh interpreter with -X importtime,
+the cost of modules it loads (beyond interpreter startup) must stay within its budget and
+heavy dependencies must not be loaded where they are not needed. Exits with status 1 on failure.
+
+    python benchmarks/import_budget.py --repeat 5
+"""
+from typing import List, Dict, Tuple, Set
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependencies, loaded only by code paths that need them
+HEAVY_MODULES = ("pandas", "google.cloud.bigquery", "googleapiclient", "google.oauth2.service_account")
+
+# Import statement, budget in milliseconds, modules that must not be loaded by it
+BUDGETS: List[Tuple[str, float, Tuple[str, ...]]] = [
+    ("import bqml_registry", 20, HEAVY_MODULES),
+    ("from bqml_registry import Config, QueryCache, MetadataCache, Instrumentation, RegistrationReport", 60, HEAVY_MODULES),
+    ("from bqml_registry import BigQueryPermissionError, RequiredPermissions, ModelNames", 20, HEAVY_MODULES),
+    ("from bqml_registry import ModelRegistry, ModelData", 2500, ("googleapiclient",)),
+]
+
+
+def measure(statement: str) -> Tuple[Dict[str, int], Set[str]]:
+    """Cumulative import time in microseconds of top-level imports, and names of all loaded modules."""
+
+    code = f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))"
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    # Lines look like "import time:   self [us] |  cumulative |   package", nesting is indented
+    top_level = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, set(process.stdout.split())
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per statement, the fastest one is compared.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of all budgets, e.g. for slow machines.")
+    args = parser.parse_args(argv)
+
+    # Modules loaded by interpreter startup are not attributed to statements
+    startup_modules = set(measure("pass")[0])
+
+    failed = False
+    for statement, budget, forbidden in BUDGETS:
+        best = None
+        for _ in range(args.repeat):
+            top_level, loaded = measure(statement)
+            cost = sum(cumulative for name, cumulative in top_level.items() if name not in startup_modules) / 1000
+            best = cost if best is None else min(best, cost)
+
+        unexpected = [module for module in forbidden if module in loaded]
+        within_budget = best <= budget * args.scale
+        status = "ok" if within_budget and not unexpected else "FAIL"
+        failed |= status == "FAIL"
+
+        print(f"{status:<4} {best:>8.1f} ms / {budget * args.scale:>7.1f} ms  {statement}")
+        for module in unexpected:
+            print(f"     loads {module}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,193 @@
+"""
+Throughput, peak memory and API call counts of registry operations, measured against
+an in-process fake of bigquery.Client. Results are written as JSON tagged with the git commit,
+so runs of different commits can be compared with compare.py. With --backend local the same
+synthetic models are served by LocalBackend, so queries and inserts run on SQLite.
+
+    python benchmarks/run_benchmarks.py --sizes 1,1000,100000 --latency 0.005
+    python benchmarks/run_benchmarks.py --sizes 1,1000 --backend local
+"""
+from typing import List, Dict, Any, Callable
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bqml_registry import Config, BigQueryConnector, ModelData, ModelRegistry, Instrumentation, LocalBackend, RegistrySchema
+from benchmarks.fake_bigquery import FakeBigQueryClient
+
+
+def bench_add_model(client: FakeBigQueryClient, connector: BigQueryConnector) -> int:
+    """Register models one by one with ModelRegistry.add_model."""
+    registry = ModelRegistry(client.project, client.dataset_id, "model_registry", connector=connector)
+    for model_id in client.model_ids():
+        registry.add_model(ModelData(client.project, client.dataset_id, model_id, connector=connector))
+    return client.num_models
+
+
+def bench_add_models(client: FakeBigQueryClient, connector: BigQueryConnector) -> int:
+    """Register all models with batched ModelRegistry.add_models."""
+    registry = ModelRegistry(client.project, client.dataset_id, "model_registry", connector=connector)
+    report = registry.add_models(client.model_ids())
+    return len(report.succeeded)
+
+
+def bench_fetch_trial_info(client: FakeBigQueryClient, connector: BigQueryConnector) -> int:
+    """Fetch unpivoted trials of every model, all models are hyperparameter-tuned."""
+    for model_id in client.model_ids():
+        ModelData(client.project, client.dataset_id, model_id, connector=connector).fetch_trial_info()
+    return client.num_models
+
+
+def bench_fetch_hyperparameters(client: FakeBigQueryClient, connector: BigQueryConnector) -> int:
+    """Load every model and fetch its hyperparameters."""
+    for model_id in client.model_ids():
+        ModelData(client.project, client.dataset_id, model_id, connector=connector).fetch_hyperparameters()
+    return client.num_models
+
+
+SCENARIOS: Dict[str, Callable[[FakeBigQueryClient, BigQueryConnector], int]] = {
+    "add_model": bench_add_model,
+    "add_models": bench_add_models,
+    "fetch_trial_info": bench_fetch_trial_info,
+    "fetch_hyperparameters": bench_fetch_hyperparameters,
+}
+
+
+def run_scenario(name: str, num_models: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run single scenario with a fresh fake client and connector, so no state is shared between runs."""
+
+    client = FakeBigQueryClient(
+        num_models=num_models,
+        num_features=args.features,
+        num_hyperparams=args.hyperparams,
+        num_trials=args.trials,
+        tuning_every=1 if name == "fetch_trial_info" else args.tuning_every,
+        latency=args.latency,
+        query_latency=args.query_latency,
+    )
+    Config._client = client
+    Config.backend = None
+    BigQueryConnector._model_sql_cache.clear()
+
+    # Local backend serves the same models, with an empty registry table, latency options do not apply
+    if args.backend == "local":
+        Config.backend = LocalBackend(project=client.project)
+        client.seed(Config.backend)
+        Config.backend.create_table(
+            RegistrySchema(feature_importance=True).build_table(f"{client.project}.{client.dataset_id}.model_registry")
+        )
+    connector = BigQueryConnector(permission_check="skip", use_storage_api=False, instrumentation=Instrumentation())
+
+    if not args.no_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    processed = SCENARIOS[name](client, connector)
+    seconds = time.perf_counter() - start
+
+    peak_memory = None
+    if not args.no_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stats = connector.instrumentation.stats()
+    if args.backend == "local":
+        Config.backend.close()
+        Config.backend = None
+
+    # Local runs have no fake to count calls, instrumented ones are used without result downloads
+    instrumented_calls = {call: summary["count"] for call, summary in stats["calls"].items()}
+    api_calls = dict(client.calls) if args.backend == "fake" else {
+        call: count for call, count in instrumented_calls.items() if call != "download"
+    }
+    return {
+        "scenario": name,
+        "models": num_models,
+        "processed": processed,
+        "seconds": seconds,
+        "models_per_sec": num_models / seconds if seconds else None,
+        "peak_memory_bytes": peak_memory,
+        "api_calls": api_calls,
+        "instrumented_calls": instrumented_calls,
+        "jobs": stats["jobs"],
+        "inserted_rows": client.inserted_rows if args.backend == "fake" else stats["inserts"]["rows"],
+        "inserted_bytes": client.inserted_bytes if args.backend == "fake" else stats["inserts"]["bytes"],
+    }
+
+
+def git_commit() -> Dict[str, Any]:
+    """Commit of the working tree, dirty if it has uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": bool(status.strip())}
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,1000,100000", help="Comma separated numbers of models.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated scenario names.")
+    parser.add_argument("--features", type=int, default=100, help="Feature columns per model.")
+    parser.add_argument("--hyperparams", type=int, default=50, help="Training options per model.")
+    parser.add_argument("--trials", type=int, default=20, help="Trials per hyperparameter-tuned model.")
+    parser.add_argument("--tuning-every", type=int, default=2, help="Every n-th model is tuned, 0 for none.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each API call.")
+    parser.add_argument("--query-latency", type=float, default=0.0, help="Seconds added to each query job.")
+    parser.add_argument("--backend", choices=("fake", "local"), default="fake",
+                        help="Serve models from the fake client, or from LocalBackend seeded with them.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc, which slows down Python code.")
+    parser.add_argument("--output", default=None, help="Result file, defaults to benchmarks/results/<commit>.json.")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> None:
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    scenarios = args.scenarios.split(",")
+    for name in scenarios:
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name}, available: {', '.join(SCENARIOS)}")
+
+    results = []
+    for name in scenarios:
+        for num_models in sizes:
+            result = run_scenario(name, num_models, args)
+            results.append(result)
+
+            peak = "-" if result["peak_memory_bytes"] is None else f"{result['peak_memory_bytes'] / 1024 ** 2:.1f} MB"
+            print(f"{name:<22} {num_models:>7} models {result['models_per_sec']:>10.1f} models/s  "
+                  f"peak {peak:>10}  calls {sum(result['api_calls'].values())}")
+
+    revision = git_commit()
+    report = {
+        **revision,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        tag = (revision["commit"] or "unknown")[:12] + ("-dirty" if revision["dirty"] else "")
+        output = os.path.join(ROOT, "benchmarks", "results", f"{tag}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
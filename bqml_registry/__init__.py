@@ -1,8 +1,84 @@
-from .config import Config
-from .model_data import ModelData
-from .model_names import ModelNames
-from .model_registry import ModelRegistry
-from .schemas import RegistrySchema
-from .connector import BigQueryConnector
-from .exceptions import BigQueryPermissionError, SQLNotFoundError
-from .permissions import RequiredPermissions
\ No newline at end of file
+from typing import TYPE_CHECKING
+import importlib
+
+# Public names mapped to modules defining them. Modules are imported on first access,
+# so importing the package does not load BigQuery, pandas or auth libraries.
+_exports = {
+    "Config": ".config",
+    "ModelData": ".model_data",
+    "ModelSnapshot": ".snapshot",
+    "ModelNames": ".model_names",
+    "ModelRegistry": ".model_registry",
+    "AsyncModelRegistry": ".async_registry",
+    "AsyncModelData": ".async_registry",
+    "RegistrySchema": ".schemas",
+    "BigQueryConnector": ".connector",
+    "BigQueryPermissionError": ".exceptions",
+    "SQLNotFoundError": ".exceptions",
+    "RegistryWriteError": ".exceptions",
+    "QueryBudgetExceededError": ".exceptions",
+    "QueryCancelledError": ".exceptions",
+    "RequiredPermissions": ".permissions",
+    "RegistrationReport": ".reports",
+    "MetadataCache": ".metadata_cache",
+    "QueryCache": ".query_cache",
+    "Instrumentation": ".instrumentation",
+    "Transport": ".transport",
+    "AdaptiveLimiter": ".transport",
+    "CostGovernor": ".governor",
+    "ClientPool": ".client_pool",
+    "Backend": ".backends",
+    "LocalBackend": ".backends",
+    "RegistrySink": ".sinks",
+    "StreamingSink": ".sinks",
+    "LoadJobSink": ".sinks",
+    "StorageWriteSink": ".sinks",
+    "MergeSink": ".sinks",
+    "ModelWatcher": ".watcher",
+    "ModelEvent": ".watcher",
+    "EventSource": ".watcher",
+    "InMemoryEventSource": ".watcher",
+    "PollingEventSource": ".watcher",
+    "PubSubEventSource": ".watcher",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .config import Config
+    from .model_data import ModelData
+    from .snapshot import ModelSnapshot
+    from .model_names import ModelNames
+    from .model_registry import ModelRegistry
+    from .async_registry import AsyncModelRegistry, AsyncModelData
+    from .schemas import RegistrySchema
+    from .connector import BigQueryConnector
+    from .exceptions import (BigQueryPermissionError, SQLNotFoundError, RegistryWriteError,
+                             QueryBudgetExceededError, QueryCancelledError)
+    from .permissions import RequiredPermissions
+    from .reports import RegistrationReport
+    from .metadata_cache import MetadataCache
+    from .query_cache import QueryCache
+    from .instrumentation import Instrumentation
+    from .transport import Transport, AdaptiveLimiter
+    from .governor import CostGovernor
+    from .client_pool import ClientPool
+    from .backends import Backend, LocalBackend
+    from .sinks import RegistrySink, StreamingSink, LoadJobSink, StorageWriteSink, MergeSink
+    from .watcher import (ModelWatcher, ModelEvent, EventSource, InMemoryEventSource, 
+                          PollingEventSource, PubSubEventSource)
@@ -0,0 +1,221 @@
+from typing import List, Dict, Union, Optional, Literal, Any, Callable
+import asyncio
+import pandas as pd
+from google.cloud import bigquery
+from .model_data import ModelData
+from .model_registry import ModelRegistry
+from .schemas import RegistrySchema
+from .connector import BigQueryConnector, JobTracker, job_tracker
+from .reports import RegistrationReport
+from .sinks import RegistrySink
+from .metadata_cache import MetadataCache
+
+
+async def _run_blocking(semaphore: asyncio.Semaphore, function: Callable, *args, **kwargs) -> Any:
+    """
+    Run blocking function in a worker thread, bounded by semaphore. If the awaiting task is cancelled,
+    query jobs started by the function are cancelled, later ones as soon as they start, and the semaphore
+    is held until the worker thread returns.
+    """
+    async with semaphore:
+        # Context is copied into the worker thread, jobs it starts are registered with this tracker
+        tracker = JobTracker()
+        token = job_tracker.set(tracker)
+        try:
+            worker = asyncio.ensure_future(asyncio.to_thread(function, *args, **kwargs))
+        finally:
+            job_tracker.reset(token)
+
+        try:
+            return await asyncio.shield(worker)
+
+        except asyncio.CancelledError:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, tracker.cancel)
+
+            # Worker thread cannot be interrupted, it keeps its slot until it returns
+            await asyncio.wait([worker])
+            if not worker.cancelled():
+                worker.exception()
+            raise
+
+
+class AsyncModelData():
+    """Asyncio counterpart of ModelData, blocking API calls and queries run in worker threads."""
+
+    def __init__(self, model: ModelData, semaphore: Optional[asyncio.Semaphore] = None) -> None:
+        self.model_data = model
+        self.semaphore = semaphore or asyncio.Semaphore(32)
+
+    @classmethod
+    async def create(cls,
+                     project_id: str,
+                     dataset_id: str,
+                     model_id: str,
+                     connector: Optional[BigQueryConnector] = None,
+                     semaphore: Optional[asyncio.Semaphore] = None,
+                     cache: Optional[MetadataCache] = None) -> "AsyncModelData":
+        """Awaitable construction, model metadata is fetched without blocking the event loop."""
+        semaphore = semaphore or asyncio.Semaphore(32)
+        model = await _run_blocking(
+            semaphore, ModelData, project_id, dataset_id, model_id, connector=connector, lazy=False, cache=cache
+        )
+        return cls(model, semaphore)
+
+    def __getattr__(self, name: str) -> Any:
+        # Plain attributes (model_id, model_type, created, ...) are read from wrapped ModelData
+        return getattr(self.model_data, name)
+
+    async def _call(self, method: str, *args, **kwargs) -> Any:
+        return await _run_blocking(self.semaphore, getattr(self.model_data, method), *args, **kwargs)
+
+    async def fetch_target(self) -> str:
+        return await self._call("fetch_target")
+
+    async def fetch_feature_names(self) -> List[Dict[str, str]]:
+        return await self._call("fetch_feature_names")
+
+    async def fetch_feature_importance(self) -> List[Dict[str, Union[str, float]]]:
+        return await self._call("fetch_feature_importance")
+
+    async def fetch_hyperparameters(self) -> List[Dict[str, Union[str, float]]]:
+        return await self._call("fetch_hyperparameters")
+
+    async def fetch_eval_metrics(self) -> List[Dict[str, float]]:
+        return await self._call("fetch_eval_metrics")
+
+    async def fetch_training_info(self) -> List[Dict[str, float]]:
+        return await self._call("fetch_training_info")
+
+    async def fetch_trial_info(self,
+                               columns: Optional[List[str]] = None,
+                               only_optimal: bool = False,
+                               top_k: Optional[int] = None,
+                               order_by: Optional[str] = None,
+                               ascending: bool = False) -> List[Dict[str, Union[str, float]]]:
+        return await self._call("fetch_trial_info", columns, only_optimal, top_k, order_by, ascending)
+
+    async def generate_model_sql(self, region: Optional[str] = None) -> str:
+        return await self._call("generate_model_sql", region)
+
+
+class AsyncModelRegistry():
+    """Asyncio counterpart of ModelRegistry, concurrency of BigQuery calls is bounded by a semaphore."""
+
+    def __init__(self, registry: ModelRegistry, max_concurrency: int = 32) -> None:
+        self.registry = registry
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    async def create(cls,
+                     project_id: str,
+                     dataset_id: str,
+                     table_id: str,
+                     connector: Optional[BigQueryConnector] = None,
+                     sink: Optional[RegistrySink] = None,
+                     max_concurrency: int = 32) -> "AsyncModelRegistry":
+        """Awaitable construction, connector permission check does not block the event loop."""
+        registry = await asyncio.to_thread(ModelRegistry, project_id, dataset_id, table_id, connector, sink)
+        return cls(registry, max_concurrency)
+
+    async def __aenter__(self) -> "AsyncModelRegistry":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.flush()
+
+    async def _call(self, function: Callable, *args, **kwargs) -> Any:
+        return await _run_blocking(self.semaphore, function, *args, **kwargs)
+
+    async def load_model(self, model_id: str, project_id: Optional[str] = None, dataset_id: Optional[str] = None) -> AsyncModelData:
+        """Create AsyncModelData sharing registry connector and concurrency limit."""
+        return await AsyncModelData.create(
+            project_id or self.registry.project_id,
+            dataset_id or self.registry.dataset_id,
+            model_id,
+            connector=self.registry.connector,
+            semaphore=self.semaphore,
+            cache=self.registry.metadata_cache,
+        )
+
+    async def create_registry(self, schema: RegistrySchema) -> None:
+        await self._call(self.registry.create_registry, schema)
+
+    async def fetch_schema(self, refresh: bool = False) -> List[bigquery.SchemaField]:
+        return await self._call(self.registry.fetch_schema, refresh)
+
+    async def search(self,
+                     filters: Optional[Dict[str, Any]] = None,
+                     metrics: Optional[List[str]] = None,
+                     hyperparams: Union[List[str], Literal["all"], None] = None,
+                     order_by: Optional[str] = None,
+                     ascending: bool = False,
+                     limit: Optional[int] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Search registered models, see ModelRegistry.search."""
+        return await self._call(self.registry.search, filters, metrics, hyperparams, order_by, ascending, limit, columns)
+
+    async def compact(self) -> int:
+        return await self._call(self.registry.compact)
+
+    async def flush(self) -> None:
+        await self._call(self.registry.flush)
+
+    async def add_model(self, model: Union[AsyncModelData, ModelData]) -> None:
+        """Adds a model to the registry."""
+        if isinstance(model, AsyncModelData):
+            model = model.model_data
+        await self._call(self.registry.add_model, model)
+
+    async def add_models(self,
+                         model_ids: List[str],
+                         project_id: Optional[str] = None,
+                         dataset_id: Optional[str] = None,
+                         batch_size: int = 500) -> RegistrationReport:
+        """
+        Adds many models to the registry, see ModelRegistry.add_models. Models of each window
+        are loaded and built as concurrent tasks, rows are written to the sink once per window.
+        """
+        await self.fetch_schema()
+        report = RegistrationReport()
+
+        async def gather_per_model(coroutines: Dict[str, Any]) -> Dict[str, Any]:
+            results = await asyncio.gather(*coroutines.values(), return_exceptions=True)
+
+            succeeded = {}
+            for model_id, result in zip(coroutines, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if isinstance(result, Exception):
+                    report.add_failure(model_id, result)
+                else:
+                    succeeded[model_id] = result
+            return succeeded
+
+        for start in range(0, len(model_ids), batch_size):
+            window = model_ids[start:start + batch_size]
+
+            # Fetch model metadata concurrently
+            models = await gather_per_model({
+                model_id: self.load_model(model_id, project_id, dataset_id) for model_id in window
+            })
+            models = {model_id: model.model_data for model_id, model in models.items()}
+
+            # Run ML.* functions for the whole window in batched jobs, schema checks may revalidate the table
+            feature_importance = await self._call(self.registry.has_field, 'features.importance_weight')
+            trial_info = await self._call(self.registry.has_field, 'tunning')
+            await self._call(
+                ModelData.batch_fetch,
+                list(models.values()),
+                feature_importance=feature_importance,
+                trial_info=trial_info,
+            )
+
+            # Build rows concurrently and stream them to the sink
+            rows = await gather_per_model({
+                model_id: self._call(self.registry._build_row, model) for model_id, model in models.items()
+            })
+            if rows:
+                await self._call(self.registry._insert_rows, list(rows.items()), report)
+
+        return report
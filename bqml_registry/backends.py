@@ -0,0 +1,880 @@
+from typing import List, Dict, Optional, Any, Union, Iterator, Tuple
+import io
+import os
+import re
+import json
+import time
+import uuid
+import decimal
+import sqlite3
+import datetime
+import threading
+from collections import OrderedDict
+import pandas as pd
+from google.api_core.exceptions import NotFound, Conflict, BadRequest
+from google.cloud import bigquery
+from google.cloud.bigquery import ArrayQueryParameter
+
+
+class Backend():
+    """
+    Subset of bigquery.Client used by BigQueryConnector. Set as Config.backend (or passed to a connector),
+    a backend replaces the BigQuery client, e.g. LocalBackend for offline runs. Methods take the arguments
+    of their bigquery.Client counterparts, retry and timeout arguments are accepted and ignored.
+    Permissions are checked with test_iam_permissions instead of Cloud Resource Manager.
+    """
+
+    project: Optional[str] = None
+
+    def get_model(self, model_ref, **kwargs) -> bigquery.Model:
+        raise NotImplementedError
+
+    def list_models(self, dataset, **kwargs) -> Iterator[bigquery.Model]:
+        raise NotImplementedError
+
+    def get_dataset(self, dataset_ref, **kwargs) -> bigquery.Dataset:
+        raise NotImplementedError
+
+    def get_table(self, table, **kwargs) -> bigquery.Table:
+        raise NotImplementedError
+
+    def create_table(self, table, exists_ok: bool = False, **kwargs) -> bigquery.Table:
+        raise NotImplementedError
+
+    def delete_table(self, table, not_found_ok: bool = False, **kwargs) -> None:
+        raise NotImplementedError
+
+    def insert_rows_json(self, table, json_rows: List[Dict[str, Any]], row_ids=None, **kwargs) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def load_table_from_file(self, file_obj, destination, job_config=None, **kwargs):
+        raise NotImplementedError
+
+    def query(self, query: str, job_config=None, **kwargs):
+        """Start query job, including ML.* functions and INFORMATION_SCHEMA views."""
+        raise NotImplementedError
+
+    def test_iam_permissions(self, permissions: List[str]) -> List[str]:
+        """Subset of permissions granted on the backend project."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LocalQueryJob():
+    """Finished query job of LocalBackend, also acts as its own RowIterator."""
+
+    def __init__(self,
+                 columns: List[str],
+                 rows: List[tuple],
+                 bytes_processed: int = 0,
+                 dry_run: bool = False,
+                 job_id: Optional[str] = None) -> None:
+        self.job_id = job_id or f"local_{uuid.uuid4().hex}"
+        self.state = "DONE"
+        self.columns = columns
+        self.rows = rows
+        self.total_rows = len(rows)
+        self.dry_run = dry_run
+        # Bytes are estimated from stored sizes of referenced tables, billing rounds up to 10MB like BigQuery
+        self.total_bytes_processed = bytes_processed
+        self.total_bytes_billed = 0 if dry_run or not bytes_processed else max(bytes_processed, 10 * 1024 ** 2)
+        self.slot_millis = 0
+        self.cache_hit = False
+
+    def result(self, **kwargs) -> "LocalQueryJob":
+        return self
+
+    def done(self, **kwargs) -> bool:
+        return True
+
+    def cancel(self, **kwargs) -> bool:
+        return True
+
+    def __iter__(self) -> Iterator[bigquery.Row]:
+        field_to_index = {column: index for index, column in enumerate(self.columns)}
+        return (bigquery.Row(row, field_to_index) for row in self.rows)
+
+    def to_dataframe(self, **kwargs) -> pd.DataFrame:
+        return pd.DataFrame.from_records(self.rows, columns=self.columns)
+
+    def to_arrow(self, **kwargs):
+        import pyarrow as pa
+        arrays = [pa.array([row[index] for row in self.rows]) for index in range(len(self.columns))]
+        return pa.Table.from_arrays(arrays, names=self.columns)
+
+    def to_arrow_iterable(self, **kwargs):
+        return iter(self.to_arrow().to_batches())
+
+    def to_dataframe_iterable(self, **kwargs):
+        return (batch.to_pandas() for batch in self.to_arrow_iterable())
+
+
+class LocalLoadJob():
+    """Finished load job of LocalBackend."""
+
+    def __init__(self, destination: str, output_rows: int) -> None:
+        self.job_id = f"local_{uuid.uuid4().hex}"
+        self.state = "DONE"
+        self.destination = destination
+        self.output_rows = output_rows
+        self.errors = None
+
+    def result(self, **kwargs) -> "LocalLoadJob":
+        return self
+
+    def done(self, **kwargs) -> bool:
+        return True
+
+
+class LocalBackend(Backend):
+    """
+    In-process backend on SQLite, seeded with model resources, their ML.FEATURE_IMPORTANCE and ML.TRIAL_INFO
+    records and CREATE MODEL statements (see add_model and load_fixtures). Tables are SQLite tables named by
+    their full id, RECORD and REPEATED values are stored as JSON text. Queries are translated from the
+    BigQuery SQL issued by this library (ML.* functions, INFORMATION_SCHEMA.JOBS_BY_PROJECT, UNNEST,
+    QUALIFY, MERGE upserts, CREATE OR REPLACE TABLE ... AS SELECT), other statements are passed to SQLite
+    after the same translation. DATE and TIMESTAMP values are returned as ISO strings.
+    Storage Read and Write APIs are not emulated, connectors fall back to the REST paths.
+    """
+
+    def __init__(self,
+                 project: str = "local-project",
+                 location: str = "US",
+                 database: str = ":memory:",
+                 granted_permissions: Optional[List[str]] = None,
+                 insert_id_ttl: float = 60.0) -> None:
+        """
+        Database is a SQLite file to keep state between runs, in memory by default. All permissions are granted
+        unless listed. Streaming inserts are deduplicated by insert id for insert_id_ttl seconds, about a minute in BigQuery.
+        """
+        self.project = project
+        self.location = location
+        self.granted_permissions = granted_permissions
+        self.insert_id_ttl = insert_id_ttl
+
+        self._connection = sqlite3.connect(database, check_same_thread=False, isolation_level=None)
+        self._connection.create_function("CONCAT", -1, _concat, deterministic=True)
+        self._lock = threading.RLock()
+
+        # Insert ids seen per table with the time they were inserted, in insertion order
+        self._insert_ids: Dict[str, "OrderedDict[str, float]"] = {}
+
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS _models (model_id TEXT PRIMARY KEY, dataset_id TEXT, resource TEXT);
+            CREATE INDEX IF NOT EXISTS _models_dataset ON _models (dataset_id);
+            CREATE TABLE IF NOT EXISTS _ml (function TEXT, model_id TEXT, position INTEGER, record TEXT);
+            CREATE INDEX IF NOT EXISTS _ml_model ON _ml (function, model_id);
+            CREATE TABLE IF NOT EXISTS _jobs (
+                project_id TEXT, region TEXT, job_id TEXT, creation_time TEXT, statement_type TEXT,
+                state TEXT, destination_table TEXT, query TEXT
+            );
+            CREATE TABLE IF NOT EXISTS _tables (table_id TEXT PRIMARY KEY, resource TEXT, num_rows INTEGER, num_bytes INTEGER);
+        """)
+
+    # Seeding
+
+    def add_model(self,
+                  resource: Union[Dict[str, Any], bigquery.Model],
+                  feature_importance: Optional[List[Dict[str, Any]]] = None,
+                  trial_info: Optional[List[Dict[str, Any]]] = None,
+                  create_statement: Optional[str] = None) -> str:
+        """
+        Add (or replace) a model from its API resource. Feature importance and trial info are records
+        returned by ML.FEATURE_IMPORTANCE and ML.TRIAL_INFO, with nested hyperparameters and metrics.
+        Create statement is recorded as a CREATE_MODEL job of INFORMATION_SCHEMA.JOBS_BY_PROJECT.
+        Returns full model id.
+        """
+        if isinstance(resource, bigquery.Model):
+            resource = resource.to_api_repr()
+        resource = dict(resource)
+        resource.setdefault("location", self.location)
+        resource.setdefault("creationTime", str(int(time.time() * 1000)))
+        resource.setdefault("lastModifiedTime", resource["creationTime"])
+
+        reference = resource["modelReference"]
+        dataset_id = f"{reference['projectId']}.{reference['datasetId']}"
+        model_id = f"{dataset_id}.{reference['modelId']}"
+
+        with self._lock:
+            self._connection.execute("DELETE FROM _ml WHERE model_id = ?", (model_id,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO _models VALUES (?, ?, ?)", (model_id, dataset_id, json.dumps(resource))
+            )
+            for function, records in (("FEATURE_IMPORTANCE", feature_importance), ("TRIAL_INFO", trial_info)):
+                self._connection.executemany(
+                    "INSERT INTO _ml VALUES (?, ?, ?, ?)",
+                    [(function, model_id, position, json.dumps(record, default=_json_default))
+                     for position, record in enumerate(records or [])]
+                )
+
+            if create_statement is not None:
+                created = datetime.datetime.fromtimestamp(int(resource["creationTime"]) / 1000, datetime.timezone.utc)
+                destination = {"project_id": reference["projectId"], "dataset_id": reference["datasetId"],
+                               "table_id": reference["modelId"]}
+                self._connection.execute(
+                    "INSERT INTO _jobs VALUES (?, ?, ?, ?, 'CREATE_MODEL', 'DONE', ?, ?)",
+                    (reference["projectId"], resource["location"].lower(), f"local_{uuid.uuid4().hex}",
+                     _timestamp_text(created), json.dumps(destination), create_statement)
+                )
+        return model_id
+
+    def load_fixtures(self, path: str) -> int:
+        """
+        Add models from a JSON fixture file, or from all .json files of a directory. A fixture is an object
+        (or list of objects) with "model" resource and optional "feature_importance", "trial_info" and
+        "create_statement" keys, see add_model. Returns number of added models.
+        """
+        if os.path.isdir(path):
+            paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".json"))
+        else:
+            paths = [path]
+
+        count = 0
+        for file_path in paths:
+            with open(file_path) as file:
+                fixtures = json.load(file)
+            for fixture in fixtures if isinstance(fixtures, list) else [fixtures]:
+                self.add_model(fixture["model"], fixture.get("feature_importance"), fixture.get("trial_info"),
+                               fixture.get("create_statement"))
+                count += 1
+        return count
+
+    # Models and datasets
+
+    def get_model(self, model_ref, retry=None, timeout=None) -> bigquery.Model:
+        model_id = self._full_id(model_ref)
+        row = self._fetchone("SELECT resource FROM _models WHERE model_id = ?", (model_id,))
+        if row is None:
+            raise NotFound(f"Not found: Model {model_id}")
+        return bigquery.Model.from_api_repr(json.loads(row[0]))
+
+    def list_models(self, dataset, retry=None, timeout=None, **kwargs) -> Iterator[bigquery.Model]:
+        dataset_id = self._dataset_id(dataset)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT resource FROM _models WHERE dataset_id = ? ORDER BY model_id", (dataset_id,)
+            ).fetchall()
+        return iter([bigquery.Model.from_api_repr(json.loads(resource)) for (resource,) in rows])
+
+    def get_dataset(self, dataset_ref, retry=None, timeout=None) -> bigquery.Dataset:
+        """Datasets exist implicitly, while they hold a model or a table."""
+        dataset_id = self._dataset_id(dataset_ref)
+        row = self._fetchone("SELECT json_extract(resource, '$.location') FROM _models WHERE dataset_id = ?", (dataset_id,))
+        if row is None:
+            row = self._fetchone(
+                "SELECT json_extract(resource, '$.location') FROM _tables WHERE table_id LIKE ? ESCAPE '\\'",
+                (dataset_id.replace("_", "\\_").replace("%", "\\%") + ".%",)
+            )
+        if row is None:
+            raise NotFound(f"Not found: Dataset {dataset_id}")
+
+        project_id, dataset_name = dataset_id.split(".")
+        return bigquery.Dataset.from_api_repr({
+            "datasetReference": {"projectId": project_id, "datasetId": dataset_name},
+            "location": row[0] or self.location,
+        })
+
+    # Tables
+
+    def get_table(self, table, retry=None, timeout=None) -> bigquery.Table:
+        table_id = self._full_id(table)
+        with self._lock:
+            row = self._table_row(table_id)
+            if row is None:
+                raise NotFound(f"Not found: Table {table_id}")
+            resource, num_rows, num_bytes = row
+
+        resource = json.loads(resource)
+        resource.update({"numRows": str(num_rows), "numBytes": str(num_bytes)})
+        return bigquery.Table.from_api_repr(resource)
+
+    def create_table(self, table, exists_ok: bool = False, retry=None, timeout=None) -> bigquery.Table:
+        if not isinstance(table, bigquery.Table):
+            table = bigquery.Table(self._full_id(table))
+        table_id = self._full_id(table)
+        if not table.schema:
+            raise NotImplementedError(f"Tables without schema are not supported by LocalBackend: {table_id}")
+
+        with self._lock:
+            if self._table_row(table_id) is not None:
+                if exists_ok:
+                    return self.get_table(table_id)
+                raise Conflict(f"Already Exists: Table {table_id}")
+
+            resource = table.to_api_repr()
+            resource.update({
+                "creationTime": str(int(time.time() * 1000)),
+                "etag": uuid.uuid4().hex,
+                "location": self.location,
+                "type": "TABLE",
+            })
+            columns = ", ".join(_quote(field.name) for field in table.schema)
+            self._connection.execute(f"CREATE TABLE {_quote(table_id)} ({columns})")
+            self._connection.execute("INSERT INTO _tables VALUES (?, ?, 0, 0)", (table_id, json.dumps(resource)))
+        return self.get_table(table_id)
+
+    def delete_table(self, table, not_found_ok: bool = False, retry=None, timeout=None) -> None:
+        table_id = self._full_id(table)
+        with self._lock:
+            if self._table_row(table_id) is None:
+                if not_found_ok:
+                    return
+                raise NotFound(f"Not found: Table {table_id}")
+            self._drop_table(table_id)
+
+    def _table_row(self, table_id: str) -> Optional[Tuple[str, int, int]]:
+        """Stored resource, row count and size of a table, expired tables are dropped on access."""
+        row = self._connection.execute(
+            "SELECT resource, num_rows, num_bytes FROM _tables WHERE table_id = ?", (table_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        expires = json.loads(row[0]).get("expirationTime")
+        if expires is not None and int(expires) < time.time() * 1000:
+            self._drop_table(table_id)
+            return None
+        return row
+
+    def _drop_table(self, table_id: str) -> None:
+        self._connection.execute(f"DROP TABLE IF EXISTS {_quote(table_id)}")
+        self._connection.execute("DELETE FROM _tables WHERE table_id = ?", (table_id,))
+        self._insert_ids.pop(table_id, None)
+
+    def _schema(self, table_id: str) -> List[bigquery.SchemaField]:
+        row = self._table_row(table_id)
+        if row is None:
+            raise NotFound(f"Not found: Table {table_id}")
+        return [bigquery.SchemaField.from_api_repr(field) for field in json.loads(row[0])["schema"]["fields"]]
+
+    def _refresh_stats(self, table_id: str) -> None:
+        """Recount rows and size of a table rewritten by a statement, and change its etag."""
+        columns = [field.name for field in self._schema(table_id)]
+        size = " + ".join(f"COALESCE(length({_quote(column)}), 0)" for column in columns)
+        num_rows, num_bytes = self._connection.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({size}), 0) FROM {_quote(table_id)}"
+        ).fetchone()
+        self._connection.execute(
+            "UPDATE _tables SET num_rows = ?, num_bytes = ?, resource = json_set(resource, '$.etag', ?) WHERE table_id = ?",
+            (num_rows, num_bytes, uuid.uuid4().hex, table_id)
+        )
+
+    # Writes
+
+    def insert_rows_json(self,
+                         table,
+                         json_rows: List[Dict[str, Any]],
+                         row_ids=None,
+                         skip_invalid_rows: Optional[bool] = None,
+                         ignore_unknown_values: Optional[bool] = None,
+                         retry=None,
+                         timeout=None,
+                         **kwargs) -> List[Dict[str, Any]]:
+        """
+        Streaming insert, returns per-row errors. Like BigQuery, a request with invalid rows inserts
+        nothing unless skip_invalid_rows, and rows with an insert id seen in the last insert_id_ttl seconds are skipped.
+        """
+        table_id = self._full_id(table)
+        if not isinstance(row_ids, (list, tuple)):
+            row_ids = [None] * len(json_rows)
+
+        with self._lock:
+            schema = self._schema(table_id)
+            seen = self._insert_ids.setdefault(table_id, OrderedDict())
+
+            # Ids are deduplicated within a short window only, expired ones are dropped oldest first
+            now = time.monotonic()
+            while seen and next(iter(seen.values())) <= now - self.insert_id_ttl:
+                seen.popitem(last=False)
+
+            rows = [
+                (index, row) for index, (row, row_id) in enumerate(zip(json_rows, row_ids))
+                if row_id is None or row_id not in seen
+            ]
+            errors = self._insert(table_id, schema, rows, bool(skip_invalid_rows), bool(ignore_unknown_values))
+            if not errors or skip_invalid_rows:
+                failed = {error["index"] for error in errors}
+                for index, row_id in enumerate(row_ids):
+                    if row_id is not None and index not in failed and row_id not in seen:
+                        seen[row_id] = now
+        return errors
+
+    def load_table_from_file(self,
+                             file_obj,
+                             destination,
+                             rewind: bool = False,
+                             job_config: Optional[bigquery.LoadJobConfig] = None,
+                             **kwargs) -> LocalLoadJob:
+        """Load job of NEWLINE_DELIMITED_JSON or PARQUET data, runs to completion before returning."""
+        table_id = self._full_id(destination)
+        job_config = job_config or bigquery.LoadJobConfig()
+        if rewind:
+            file_obj.seek(0)
+        data = file_obj.read()
+
+        source_format = job_config.source_format
+        if source_format == bigquery.SourceFormat.NEWLINE_DELIMITED_JSON:
+            rows = [json.loads(line) for line in data.decode("utf-8").splitlines() if line.strip()]
+        elif source_format == bigquery.SourceFormat.PARQUET:
+            import pyarrow.parquet as pq
+            rows = pq.read_table(io.BytesIO(data)).to_pylist()
+        else:
+            raise NotImplementedError(f"Source format {source_format} is not supported by LocalBackend.")
+
+        with self._lock:
+            if self._table_row(table_id) is None:
+                if not job_config.schema:
+                    raise NotFound(f"Not found: Table {table_id}")
+                self.create_table(bigquery.Table(table_id, schema=job_config.schema))
+
+            # A failed load job leaves the table untouched
+            self._connection.execute("SAVEPOINT load_job")
+            if job_config.write_disposition == bigquery.WriteDisposition.WRITE_TRUNCATE:
+                self._connection.execute(f"DELETE FROM {_quote(table_id)}")
+            errors = self._insert(table_id, self._schema(table_id), list(enumerate(rows)), False,
+                                  bool(job_config.ignore_unknown_values))
+            if errors:
+                self._connection.execute("ROLLBACK TO load_job")
+                self._connection.execute("RELEASE load_job")
+                raise BadRequest(f"Load job into {table_id} failed with {len(errors)} invalid rows.",
+                                 errors=[error for row in errors for error in row["errors"]])
+            self._connection.execute("RELEASE load_job")
+            if job_config.write_disposition == bigquery.WriteDisposition.WRITE_TRUNCATE:
+                self._refresh_stats(table_id)
+
+        return LocalLoadJob(table_id, len(rows))
+
+    def _insert(self,
+                table_id: str,
+                schema: List[bigquery.SchemaField],
+                rows: List[Tuple[int, Dict[str, Any]]],
+                skip_invalid_rows: bool,
+                ignore_unknown_values: bool) -> List[Dict[str, Any]]:
+        """Validate and insert (index, row) pairs, returns errors in insert_rows_json format."""
+
+        fields = {field.name: field for field in schema}
+        errors, values = [], []
+        for index, row in rows:
+            message = _validate_row(row, fields, ignore_unknown_values)
+            if message is not None:
+                errors.append({"index": index, "errors": [{"reason": "invalid", "location": "", "message": message}]})
+                continue
+            values.append(tuple(_to_sql(row.get(field.name), field) for field in schema))
+
+        # Valid rows of a rejected request are reported as stopped
+        if errors and not skip_invalid_rows:
+            invalid = {error["index"] for error in errors}
+            errors.extend({"index": index, "errors": [{"reason": "stopped", "location": "", "message": ""}]}
+                          for index, _ in rows if index not in invalid)
+            return sorted(errors, key=lambda error: error["index"])
+
+        columns = ", ".join(_quote(field.name) for field in schema)
+        placeholders = ", ".join("?" for _ in schema)
+        self._connection.executemany(f"INSERT INTO {_quote(table_id)} ({columns}) VALUES ({placeholders})", values)
+        num_bytes = sum(len(str(value)) for row in values for value in row if value is not None)
+        self._connection.execute(
+            "UPDATE _tables SET num_rows = num_rows + ?, num_bytes = num_bytes + ? WHERE table_id = ?",
+            (len(values), num_bytes, table_id)
+        )
+        return errors
+
+    # Queries
+
+    def query(self, query: str, job_config: Optional[bigquery.QueryJobConfig] = None, job_id: Optional[str] = None,
+              job_retry=None, retry=None, timeout=None, **kwargs) -> LocalQueryJob:
+        """
+        Run query to completion. Dry runs only estimate bytes processed, jobs estimated to bill more than
+        maximum_bytes_billed fail with bytesBilledLimitExceeded. SQLite errors are raised as BadRequest.
+        """
+        params = self._parameters(job_config)
+        statement = _normalize_quotes(query.strip().rstrip(";"))
+
+        with self._lock:
+            bytes_processed = self._referenced_bytes(statement)
+            if job_config is not None and job_config.dry_run:
+                return LocalQueryJob([], [], bytes_processed, dry_run=True, job_id=job_id)
+
+            job = LocalQueryJob([], [], bytes_processed, job_id=job_id)
+            maximum_bytes_billed = job_config.maximum_bytes_billed if job_config is not None else None
+            if maximum_bytes_billed and job.total_bytes_billed > maximum_bytes_billed:
+                raise BadRequest(
+                    f"Query exceeded limit for bytes billed: {maximum_bytes_billed}. "
+                    f"{job.total_bytes_billed} or higher required.",
+                    errors=[{"reason": "bytesBilledLimitExceeded", "message": "Query exceeded limit for bytes billed"}]
+                )
+
+            try:
+                job.columns, job.rows = self._execute(statement, params)
+            except sqlite3.Error as error:
+                raise BadRequest(f"{error}: {' '.join(query.split())[:200]}") from error
+
+        job.total_rows = len(job.rows)
+        return job
+
+    def _execute(self, statement: str, params: Dict[str, Any]) -> Tuple[List[str], List[tuple]]:
+        """Run normalized statement, DDL and DML forms SQLite lacks are emulated."""
+
+        replace = re.match(r'CREATE\s+OR\s+REPLACE\s+TABLE\s+"([^"]+)".*?\bAS\s+(SELECT\b.*)$', statement, re.I | re.S)
+        if replace is not None:
+            self._replace_table(replace.group(1), replace.group(2), params)
+            return [], []
+
+        merge = re.match(
+            r'MERGE\s+"([^"]+)"\s+(?:AS\s+)?(\w+)\s+USING\s+"([^"]+)"\s+(?:AS\s+)?(\w+)\s+ON\s+(.*?)\s+'
+            r'WHEN\s+MATCHED\s+THEN\s+UPDATE\s+SET\s+.*?\s+WHEN\s+NOT\s+MATCHED\s+THEN\s+INSERT\s+ROW$',
+            statement, re.I | re.S
+        )
+        if merge is not None:
+            self._merge(*merge.groups(), params)
+            return [], []
+
+        return self._select(statement, params)
+
+    def _select(self, statement: str, params: Dict[str, Any]) -> Tuple[List[str], List[tuple]]:
+        sql, converters = self._rewrite(statement)
+        cursor = self._connection.execute(sql, params)
+        if cursor.description is None:
+            return [], []
+
+        columns = [_column_name(column[0]) for column in cursor.description]
+        rows = cursor.fetchall()
+
+        # Helper columns of QUALIFY and ML.* sources are dropped, JSON and BOOL values converted back
+        keep = [index for index, column in enumerate(columns) if column not in ("_qualify", "_json")]
+        convert = [converters.get(columns[index]) for index in keep]
+        rows = [
+            tuple(value if function is None or value is None else function(value)
+                  for value, function in zip((row[index] for index in keep), convert))
+            for row in rows
+        ]
+        return [columns[index] for index in keep], rows
+
+    def _replace_table(self, table_id: str, select: str, params: Dict[str, Any]) -> None:
+        """CREATE OR REPLACE TABLE ... AS SELECT of an existing table, its schema and options are kept."""
+
+        if self._table_row(table_id) is None:
+            raise NotImplementedError(f"CREATE TABLE AS SELECT of new tables is not supported by LocalBackend: {table_id}")
+
+        sql, _ = self._rewrite(select)
+        cursor = self._connection.execute(sql, params)
+        keep = [index for index, column in enumerate(cursor.description) if column[0] != "_qualify"]
+        columns = ", ".join(_quote(_column_name(cursor.description[index][0])) for index in keep)
+        placeholders = ", ".join("?" for _ in keep)
+        rows = [tuple(row[index] for index in keep) for row in cursor.fetchall()]
+
+        self._connection.execute("SAVEPOINT replace_table")
+        self._connection.execute(f"DELETE FROM {_quote(table_id)}")
+        self._connection.executemany(f"INSERT INTO {_quote(table_id)} ({columns}) VALUES ({placeholders})", rows)
+        self._connection.execute("RELEASE replace_table")
+        self._refresh_stats(table_id)
+
+    def _merge(self, target_id: str, target: str, source_id: str, source: str, condition: str,
+               params: Dict[str, Any]) -> None:
+        """Upsert MERGE (matched rows updated from source, others inserted) as delete of matched rows and insert."""
+
+        condition, _ = self._rewrite(condition)
+        source_columns = {field.name for field in self._schema(source_id)}
+        columns = ", ".join(_quote(field.name) for field in self._schema(target_id) if field.name in source_columns)
+
+        self._connection.execute("SAVEPOINT merge")
+        self._connection.execute(
+            f"DELETE FROM {_quote(target_id)} AS {target} "
+            f"WHERE EXISTS (SELECT 1 FROM {_quote(source_id)} AS {source} WHERE {condition})", params
+        )
+        self._connection.execute(
+            f"INSERT INTO {_quote(target_id)} ({columns}) SELECT {columns} FROM {_quote(source_id)}"
+        )
+        self._connection.execute("RELEASE merge")
+        self._refresh_stats(target_id)
+
+    def _rewrite(self, statement: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Translate normalized BigQuery SQL to SQLite. Returns sql and converters of result columns,
+        by column name, restoring JSON and BOOL values from their stored form.
+        """
+        converters: Dict[str, Any] = {}
+        structs: Dict[str, List[str]] = {}
+
+        for table_id in set(re.findall(r'"([^"]+\.[^"]+)"', statement)):
+            row = self._table_row(table_id)
+            if row is not None:
+                for field in self._schema(table_id):
+                    converters.update(_field_converters(field))
+
+        # QUALIFY of the first row per partition, as GROUP BY with MAX/MIN picking values of that row
+        qualify = _QUALIFY.search(statement)
+        if qualify is not None:
+            partition, order, direction = qualify.groups()
+            statement = statement[:qualify.start()] + f"GROUP BY {partition}" + statement[qualify.end():]
+            if order is not None:
+                aggregate = "MAX" if (direction or "").upper() == "DESC" else "MIN"
+                statement = re.sub(r"\bFROM\b", f', {aggregate}({order}) AS "_qualify" FROM', statement, count=1, flags=re.I)
+
+        statement = _ML_FUNCTION.sub(lambda match: self._ml_source(match.group(1).upper(), match.group(2),
+                                                                  structs, converters), statement)
+        statement = _JOBS_VIEW.sub(lambda match: self._jobs_source(match.group(1), match.group(2),
+                                                                   structs, converters), statement)
+        statement = re.sub(r"\bTO_JSON_STRING\(\s*(\w+)\s*\)", r'\1."_json"', statement, flags=re.I)
+
+        aliases = set(re.findall(r"\bUNNEST\(\s*\w+\s*\)\s+AS\s+(\w+)", statement, flags=re.I))
+        return _map_code(statement, lambda code: _rewrite_code(code, aliases, structs)), converters
+
+    def _ml_source(self, function: str, model_id: str, structs: Dict[str, List[str]], converters: Dict[str, Any]) -> str:
+        """Subquery over seeded records of ML.FEATURE_IMPORTANCE or ML.TRIAL_INFO, one column per record key."""
+
+        rows = self._connection.execute(
+            "SELECT record FROM _ml WHERE function = ? AND model_id = ? ORDER BY position", (function, model_id)
+        ).fetchall()
+        if not rows:
+            if self._fetchone("SELECT 1 FROM _models WHERE model_id = ?", (model_id,)) is None:
+                raise NotFound(f"Not found: Model {model_id}")
+            raise BadRequest(f"ML.{function} is not available for model {model_id}, no records were seeded.")
+
+        keys: Dict[str, None] = {}
+        for (record,) in rows:
+            for key, value in json.loads(record).items():
+                keys[key] = None
+                if isinstance(value, dict):
+                    subkeys = structs.setdefault(key, [])
+                    subkeys.extend(subkey for subkey in value if subkey not in subkeys)
+                    converters[key] = json.loads
+                    converters.update({subkey: bool for subkey, item in value.items() if isinstance(item, bool)})
+                elif isinstance(value, bool):
+                    converters[key] = bool
+
+        columns = ", ".join(f"json_extract(record, '$.\"{key}\"') AS {_quote(key)}" for key in keys)
+        return (f"(SELECT {columns}, record AS \"_json\" FROM _ml "
+                f"WHERE function = '{function}' AND model_id = {_literal(model_id)} ORDER BY position)")
+
+    def _jobs_source(self, project_id: Optional[str], region: str, structs: Dict[str, List[str]],
+                     converters: Dict[str, Any]) -> str:
+        """Subquery over CREATE MODEL jobs of a project and region, in the layout of JOBS_BY_PROJECT."""
+
+        structs["destination_table"] = ["project_id", "dataset_id", "table_id"]
+        converters["destination_table"] = json.loads
+        return (f"(SELECT project_id, region, job_id, creation_time, statement_type, state, destination_table, query "
+                f"FROM _jobs WHERE project_id = {_literal(project_id or self.project)} "
+                f"AND region = {_literal(region.lower())})")
+
+    def _referenced_bytes(self, statement: str) -> int:
+        """Bytes a statement would process, estimated from stored sizes of the tables and models it references."""
+
+        num_bytes = 0
+        for table_id in set(re.findall(r'"([^"]+\.[^"]+)"', statement)):
+            row = self._table_row(table_id)
+            if row is not None:
+                num_bytes += row[2]
+        for _, model_id in _ML_FUNCTION.findall(statement):
+            num_bytes += self._fetchone("SELECT COALESCE(SUM(length(record)), 0) FROM _ml WHERE model_id = ?", (model_id,))[0]
+        if _JOBS_VIEW.search(statement):
+            num_bytes += self._fetchone("SELECT COALESCE(SUM(length(query)), 0) FROM _jobs")[0]
+        return num_bytes
+
+    @staticmethod
+    def _parameters(job_config: Optional[bigquery.QueryJobConfig]) -> Dict[str, Any]:
+        """Named query parameters as SQLite values, arrays are passed as JSON for json_each."""
+
+        params = {}
+        for parameter in getattr(job_config, "query_parameters", None) or []:
+            if isinstance(parameter, ArrayQueryParameter):
+                values = [_sql_scalar(value, parameter.array_type) for value in parameter.values]
+                params[parameter.name] = json.dumps(values)
+            else:
+                params[parameter.name] = _sql_scalar(parameter.value, parameter.type_)
+        return params
+
+    # Helpers
+
+    def test_iam_permissions(self, permissions: List[str]) -> List[str]:
+        if self.granted_permissions is None:
+            return list(permissions)
+        return [permission for permission in permissions if permission in self.granted_permissions]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchone()
+
+    def _full_id(self, reference) -> str:
+        """Full "project.dataset.name" id of a model or table given as string, reference or resource."""
+
+        if isinstance(reference, str):
+            parts = reference.replace(":", ".").split(".")
+            return ".".join([self.project] + parts if len(parts) == 2 else parts)
+
+        reference = getattr(reference, "reference", reference)
+        name = getattr(reference, "model_id", None) or getattr(reference, "table_id")
+        return f"{reference.project}.{reference.dataset_id}.{name}"
+
+    def _dataset_id(self, dataset) -> str:
+        if isinstance(dataset, str):
+            parts = dataset.replace(":", ".").split(".")
+            return ".".join([self.project] + parts if len(parts) == 1 else parts)
+
+        reference = getattr(dataset, "reference", dataset)
+        return f"{reference.project}.{reference.dataset_id}"
+
+
+# BigQuery string literals, backtick identifiers, and strings or identifiers of translated SQLite
+_BIGQUERY_TOKENS = re.compile(r"""('(?:[^'\\]|\\.)*')|("(?:[^"\\]|\\.)*")|(`[^`]*`)""", re.S)
+_SQLITE_TOKENS = re.compile(r"""'(?:[^']|'')*'|"[^"]*\"""")
+
+_QUALIFY = re.compile(
+    r"\bQUALIFY\s+ROW_NUMBER\(\)\s+OVER\s*\(\s*PARTITION\s+BY\s+(.+?)"
+    r"(?:\s+ORDER\s+BY\s+(\S+)(?:\s+(ASC|DESC))?)?\s*\)\s*=\s*1",
+    re.I | re.S
+)
+_ML_FUNCTION = re.compile(r'\bML\.(FEATURE_IMPORTANCE|TRIAL_INFO)\(\s*MODEL\s+"([^"]+)"\s*\)', re.I)
+_JOBS_VIEW = re.compile(r'"(?:([^".]+)\.)?region-([\w-]+)\.INFORMATION_SCHEMA\.JOBS(?:_BY_PROJECT)?"', re.I)
+_JSON_EXTRACT_COLUMN = re.compile(r"""json_extract\(.+, '\$\."?(\w+)"?'\)""")
+
+# Function and type names of BigQuery SQL replaced by their SQLite counterparts
+_CODE_REPLACEMENTS = [
+    (re.compile(r"\bIF\s*\(", re.I), "iif("),
+    (re.compile(r"\bLOGICAL_OR\s*\(", re.I), "MAX("),
+    (re.compile(r"\bLOGICAL_AND\s*\(", re.I), "MIN("),
+    (re.compile(r"\bAS\s+STRING\s*\)", re.I), "AS TEXT)"),
+    (re.compile(r"\bAS\s+FLOAT64\s*\)", re.I), "AS REAL)"),
+    (re.compile(r"\bAS\s+INT64\s*\)", re.I), "AS INTEGER)"),
+]
+
+
+def _normalize_quotes(sql: str) -> str:
+    """Quote as SQLite does: string literals in single quotes, identifiers in double quotes instead of backticks."""
+
+    def replace(match: re.Match) -> str:
+        single, double, backtick = match.groups()
+        if single is not None:
+            return single.replace("\\'", "''")
+        if double is not None:
+            return "'" + double[1:-1].replace('\\"', '"').replace("'", "''") + "'"
+        return _quote(backtick[1:-1])
+
+    return _BIGQUERY_TOKENS.sub(replace, sql)
+
+
+def _map_code(sql: str, function) -> str:
+    """Apply function to parts of sql outside of string literals and quoted identifiers."""
+
+    parts, position = [], 0
+    for match in _SQLITE_TOKENS.finditer(sql):
+        parts.append(function(sql[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(function(sql[position:]))
+    return "".join(parts)
+
+
+def _rewrite_code(code: str, aliases: set, structs: Dict[str, List[str]]) -> str:
+    """Translate unquoted part of a statement: UNNEST, struct fields, parameters and functions."""
+
+    code = re.sub(r"\bIN\s+UNNEST\(\s*@(\w+)\s*\)", r"IN (SELECT value FROM json_each(:\1))", code, flags=re.I)
+    code = re.sub(r"\bUNNEST\(\s*(\w+)\s*\)(\s+AS\s+\w+)", r"json_each(\1)\2", code, flags=re.I)
+
+    def field(match: re.Match) -> str:
+        head, name = match.groups()
+        if head in aliases and name != "*":
+            return f"json_extract({head}.value, '$.{name}')"
+        if head in structs:
+            if name == "*":
+                return ", ".join(f"json_extract({head}, '$.\"{key}\"') AS {_quote(key)}" for key in structs[head])
+            return f"json_extract({head}, '$.{name}')"
+        return match.group()
+
+    code = re.sub(r"(?<![\w.])([A-Za-z_]\w*)\.(\*|[A-Za-z_]\w*)", field, code)
+    code = re.sub(r"@(\w+)", r":\1", code)
+    for pattern, replacement in _CODE_REPLACEMENTS:
+        code = pattern.sub(replacement, code)
+    return code
+
+
+def _column_name(name: str) -> str:
+    """Result column of an unaliased struct field keeps the field name, as in BigQuery."""
+    match = _JSON_EXTRACT_COLUMN.fullmatch(name)
+    return match.group(1) if match is not None else name
+
+
+def _field_converters(field: bigquery.SchemaField) -> Dict[str, Any]:
+    if field.mode == "REPEATED" or field.field_type in ("RECORD", "STRUCT", "JSON"):
+        return {field.name: json.loads}
+    if field.field_type in ("BOOL", "BOOLEAN"):
+        return {field.name: bool}
+    return {}
+
+
+def _validate_row(row: Dict[str, Any], fields: Dict[str, bigquery.SchemaField], ignore_unknown_values: bool) -> Optional[str]:
+    """Error message of a row not matching the table schema, None for valid rows."""
+
+    unknown = [name for name in row if name not in fields]
+    if unknown and not ignore_unknown_values:
+        return f"no such field: {unknown[0]}."
+    for name, field in fields.items():
+        value = row.get(name)
+        if value is None and field.mode == "REQUIRED":
+            return f"Missing required field: {name}."
+        if value is not None and field.mode == "REPEATED" and not isinstance(value, list):
+            return f"Array specified for non-repeated field: {name}."
+    return None
+
+
+def _to_sql(value: Any, field: bigquery.SchemaField) -> Any:
+    """Stored form of a column value: nested and repeated values as JSON text, BOOL as integer."""
+
+    if value is None:
+        return None
+    if field.mode == "REPEATED" or field.field_type in ("RECORD", "STRUCT", "JSON"):
+        return json.dumps(value, default=_json_default)
+    return _sql_scalar(value, field.field_type)
+
+
+def _sql_scalar(value: Any, field_type: Optional[str] = None) -> Any:
+    if value is None:
+        return None
+    if field_type == "DATE" and isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.datetime):
+        return _timestamp_text(value)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, bool) or field_type in ("BOOL", "BOOLEAN"):
+        return int(value in (True, "true", "True", 1))
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def _timestamp_text(value: datetime.datetime) -> str:
+    """Timestamps are stored in UTC, so they compare as text. Naive timestamps are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return _timestamp_text(value)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _concat(*values: Any) -> Optional[str]:
+    """CONCAT of BigQuery, NULL if any argument is NULL."""
+    if any(value is None for value in values):
+        return None
+    return "".join(str(value) for value in values)
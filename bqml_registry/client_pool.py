@@ -0,0 +1,78 @@
+from typing import Dict, Tuple, Optional, Any
+import time
+import threading
+from collections import OrderedDict
+from .transport import Transport
+
+
+class ClientPool():
+    """
+    Thread-safe pool of BigQuery clients keyed by (project, location, credentials). Clients are
+    created on first use and shared by all threads asking for the same key. Clients not used for
+    idle_timeout seconds are dropped, as are least recently used ones beyond max_clients.
+    Dropped clients are not closed, threads still holding one can finish their calls.
+    """
+
+    def __init__(self,
+                 transport: Optional[Transport] = None,
+                 idle_timeout: float = 600,
+                 max_clients: int = 64) -> None:
+        self.transport = transport
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+
+        # key -> (client, last use timestamp), least recently used first
+        self._clients: "OrderedDict[Tuple[Optional[str], Optional[str], Any], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def credentials_key(credentials) -> Any:
+        """Service accounts are matched by email, other credentials by identity."""
+        return getattr(credentials, "service_account_email", None) or id(credentials)
+
+    def get(self, credentials, project: Optional[str] = None, location: Optional[str] = None):
+        """Client for project and default job location, None uses defaults of the credentials."""
+        from .config import Config
+
+        key = (project, location, self.credentials_key(credentials))
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict(now)
+            entry = self._clients.get(key)
+            if entry is None:
+                transport = self.transport or Config.transport
+                entry = (transport.build_client(credentials, project, location), now)
+            self._clients[key] = (entry[0], now)
+            self._clients.move_to_end(key)
+            self._evict(now)
+            return entry[0]
+
+    def evict_idle(self) -> int:
+        """Drop clients idle for longer than idle_timeout, returns number of dropped clients."""
+        with self._lock:
+            size = len(self._clients)
+            self._evict(time.monotonic())
+            return size - len(self._clients)
+
+    def clear(self) -> None:
+        """Drop all clients, their connections are closed."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), OrderedDict()
+
+        for client, _ in clients:
+            client.close()
+
+    def _evict(self, now: float) -> None:
+        while self._clients:
+            key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used <= self.idle_timeout and len(self._clients) <= self.max_clients:
+                break
+            del self._clients[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"clients": len(self._clients), "max_clients": self.max_clients}
+
+    def __len__(self) -> int:
+        return len(self._clients)
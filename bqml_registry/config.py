@@ -1,45 +1,138 @@
+from typing import Optional, TYPE_CHECKING
 import os
-import pandas as pd
-from google.cloud import bigquery
-from googleapiclient import discovery
-from google.oauth2 import service_account
+import time
+import threading
+from .instrumentation import Instrumentation
+from .transport import Transport
+from .governor import CostGovernor
+from .client_pool import ClientPool
+
+if TYPE_CHECKING:
+    from .backends import Backend
 
 class Config:
     """Base class to handle configuration and authentication."""
     _client = None
     _credentials = None
+    _read_client = None
+    _lock = threading.RLock()
+
+    # Process-wide API call statistics, connectors can be given their own instance
+    instrumentation = Instrumentation()
+
+    # Connection pool of the shared client, retries and concurrency limit of API calls
+    transport = Transport()
+
+    # Byte budgets of query jobs, queries are not governed unless one is set
+    governor: Optional[CostGovernor] = None
+
+    # Clients of other projects and locations, e.g. for scans across an organisation
+    client_pool = ClientPool()
+
+    # Replacement of the BigQuery client, e.g. LocalBackend for offline runs, BigQuery is used unless one is set
+    backend: Optional["Backend"] = None
+
+    # Permission checks are shared process-wide, keyed by credentials and project
+    _permission_session = None
+    _permission_cache = {}
+    _permission_lock = threading.Lock()
+    permission_ttl = 3600
 
     @property
     def credentials(self):
+        # Shared objects are created once, threads racing on first use wait for the first one
         if Config._credentials is None:
-            path_to_keys = os.environ.get("SERVICE_ACCOUNT_CREDENTIALS")
-            if path_to_keys is None:
-                raise EnvironmentError("The SERVICE_ACCOUNT_CREDENTIALS environment variable is not set.")
-            
-            Config._credentials = service_account.Credentials.from_service_account_file(
-                path_to_keys,
-                scopes=["https://www.googleapis.com/auth/cloud-platform"]
-            )
+            with Config._lock:
+                if Config._credentials is None:
+                    from google.oauth2 import service_account
+
+                    path_to_keys = os.environ.get("SERVICE_ACCOUNT_CREDENTIALS")
+                    if path_to_keys is None:
+                        raise EnvironmentError("The SERVICE_ACCOUNT_CREDENTIALS environment variable is not set.")
+
+                    Config._credentials = service_account.Credentials.from_service_account_file(
+                        path_to_keys,
+                        scopes=["https://www.googleapis.com/auth/cloud-platform"]
+                    )
         return Config._credentials
 
     @property
     def client(self):
+        if self.backend is not None:
+            return self.backend
         if Config._client is None:
-            Config._client = bigquery.Client(credentials=self.credentials)
+            with Config._lock:
+                if Config._client is None:
+                    Config._client = self.transport.build_client(self.credentials)
         return Config._client
 
-    def check_permissions(self, permissions: list) -> bool:
-        """Check if the service account has the required permissions."""
-        service = discovery.build('cloudresourcemanager', 'v1', credentials=self.credentials)
+    @property
+    def read_client(self):
+        """BigQuery Storage Read API client, None if google-cloud-bigquery-storage is not installed."""
+        if Config._read_client is None:
+            try:
+                from google.cloud import bigquery_storage
+            except ImportError:
+                return None
+            with Config._lock:
+                if Config._read_client is None:
+                    Config._read_client = bigquery_storage.BigQueryReadClient(credentials=self.credentials)
+        return Config._read_client
+
+    @property
+    def permission_session(self):
+        """
+        Authorized HTTP session for Cloud Resource Manager, created once and reused for all permission checks.
+        testIamPermissions is called directly over REST, building a discovery client costs more than the check.
+        """
+        if Config._permission_session is None:
+            with Config._lock:
+                if Config._permission_session is None:
+                    Config._permission_session = self.transport.build_session(self.credentials)
+        return Config._permission_session
+
+    def check_permissions(self, permissions: list, use_cache: bool = True) -> bool:
+        """
+        Check if the service account has the required permissions.
+        Results are cached for permission_ttl seconds per credentials and project.
+        Backends check permissions themselves, without credentials.
+        """
+        if self.backend is not None:
+            return set(permissions).issubset(self.backend.test_iam_permissions(permissions))
+
+        credentials_key = getattr(self.credentials, "service_account_email", None) or id(self.credentials)
+        resource = f"{self.client.project}"
+        cache_key = (credentials_key, resource, frozenset(permissions))
+
+        with Config._permission_lock:
+            cached = Config._permission_cache.get(cache_key)
+
+        if use_cache and cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
         body = {
             'permissions': permissions
         }
-        resource = f"{self.client.project}"
-        request = service.projects().testIamPermissions(resource=resource, body=body)
-        response = request.execute()
+        url = f"https://cloudresourcemanager.googleapis.com/v1/projects/{resource}:testIamPermissions"
+
+        def test_permissions() -> dict:
+            with self.instrumentation.timed("testIamPermissions"):
+                http_response = self.permission_session.post(url, json=body)
+                http_response.raise_for_status()
+                return http_response.json()
+
+        response = self.transport.call(test_permissions)
 
         # Check if all required permissions are granted
-        return set(permissions).issubset(set(response.get('permissions', [])))
-    
+        granted = set(permissions).issubset(set(response.get('permissions', [])))
+
+        with Config._permission_lock:
+            Config._permission_cache[cache_key] = (time.monotonic() + self.permission_ttl, granted)
 
+        return granted
 
+    @classmethod
+    def clear_permission_cache(cls) -> None:
+        """Drop cached permission checks, next check calls testIamPermissions again."""
+        with cls._permission_lock:
+            cls._permission_cache.clear()
@@ -1,44 +1,421 @@
-from typing import Union
+from typing import Union, Literal, List, Dict, Optional, Iterator, Any, Callable, Tuple, TypeVar
+import io
+import json
 import datetime
+import threading
+import contextvars
+from collections import OrderedDict
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, Future
 import pandas as pd
-from google.cloud.bigquery import ScalarQueryParameter, QueryJobConfig
+from google.cloud import bigquery
+from google.cloud.bigquery import ScalarQueryParameter, ArrayQueryParameter, QueryJobConfig, QueryJob
+from google.cloud.bigquery.table import RowIterator
 from .config import Config
 from .permissions import RequiredPermissions
-from .exceptions import BigQueryPermissionError, SQLNotFoundError
+from .exceptions import BigQueryPermissionError, SQLNotFoundError, QueryBudgetExceededError, QueryCancelledError
+from .query_cache import QueryCache
+from .instrumentation import Instrumentation
+from .transport import Transport
+from .governor import CostGovernor
+from .backends import Backend
 
 
-class BigQueryConnector(Config):
+class JobTracker():
+    """
+    Query jobs started on behalf of a caller, e.g. an asyncio task. Once cancelled, its jobs are cancelled,
+    jobs started later are cancelled as soon as they are registered and new queries are refused.
+    """
+
     def __init__(self) -> None:
+        self.jobs: List[QueryJob] = []
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def add(self, job: QueryJob) -> None:
+        with self._lock:
+            self.jobs.append(job)
+            cancelled = self.cancelled
+        if cancelled:
+            job.cancel()
+
+    def cancel(self) -> None:
+        """Cancel started jobs and all jobs started from now on."""
+        with self._lock:
+            self.cancelled = True
+            jobs = list(self.jobs)
+
+        for job in jobs:
+            try:
+                job.cancel()
+            except Exception as error:
+                print(f"Warning: Query job {job.job_id} could not be cancelled: {error}")
+
+
+# Query jobs started in the current context are registered here when set,
+# so callers (e.g. async wrappers) can cancel them on their behalf
+job_tracker: ContextVar[Optional[JobTracker]] = ContextVar("job_tracker", default=None)
+
+T = TypeVar("T")
+
+
+def submit_in_context(executor: ThreadPoolExecutor, function: Callable, *args) -> Future:
+    """Submit function to executor in a copy of the caller's context, so query jobs it starts reach job_tracker."""
+    return executor.submit(contextvars.copy_context().run, function, *args)
+
+
+class BigQueryConnector(Config):
+    # Creation sql of a model version never changes, statements are cached process-wide by full model id
+    # and creation time (CREATE OR REPLACE MODEL keeps the id), least recently used ones are dropped
+    model_sql_cache_size = 10000
+    _model_sql_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+    _model_sql_lock = threading.Lock()
+
+    def __init__(self, 
+                 permission_check: Literal["eager", "lazy", "skip"] = "eager",
+                 use_storage_api: bool = True,
+                 cache: Optional[QueryCache] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 transport: Optional[Transport] = None,
+                 governor: Optional[CostGovernor] = None,
+                 project_id: Optional[str] = None,
+                 location: Optional[str] = None,
+                 backend: Optional[Backend] = None) -> None:
+        """
+        Permission check modes: eager checks on initialization, lazy checks on first client use
+        and skip does not check at all. Checks are cached process-wide, see Config.check_permissions.
+        With use_storage_api, large results are downloaded with BigQuery Storage Read API if installed.
+        With cache, DataFrame results of query and parameterized_query are served from QueryCache.
+        API calls are recorded in the process-wide Config.instrumentation, unless one is provided.
+        API calls are retried and limited by the process-wide Config.transport, unless one is provided.
+        With governor (or process-wide Config.governor), queries are dry-run and held to its byte budgets.
+        With project_id or location, the connector uses a client of Config.client_pool bound to them,
+        jobs run (and are billed) in that project and location instead of the credentials' defaults.
+        With backend (or process-wide Config.backend), API calls and queries go to it instead of BigQuery.
+        """
+        self.use_storage_api = use_storage_api
+        self.cache = cache
+        self.project_id = project_id
+        self.location = location
+        if instrumentation is not None:
+            self.instrumentation = instrumentation
+        if transport is not None:
+            self.transport = transport
+        if governor is not None:
+            self.governor = governor
+        if backend is not None:
+            self.backend = backend
+        if permission_check not in ("eager", "lazy", "skip"):
+            raise ValueError(f"Unknown permission check mode: {permission_check}")
+
+        self.permission_check = permission_check
+        self._permissions_verified = permission_check == "skip"
+
+        if permission_check == "eager":
+            self.verify_permissions()
+
+    @property
+    def client(self):
+        # Lazy mode, permissions are verified before the client is first used
+        if not self._permissions_verified:
+            self.verify_permissions()
+        if self.backend is not None:
+            return self.backend
+        if self.project_id is None and self.location is None:
+            return Config.client.fget(self)
+        return self.client_pool.get(self.credentials, self.project_id, self.location)
+
+    def verify_permissions(self) -> None:
+        """Raise BigQueryPermissionError if service account lacks required permissions."""
+
+        # Mark as verified upfront, permission check itself needs the client
+        self._permissions_verified = True
         if not self.check_permissions(RequiredPermissions.ALL.value):
+            self._permissions_verified = False
             raise BigQueryPermissionError("Service account does not meet all permission requirements.")
-        
-    def query(self, sql: str) -> pd.DataFrame:
+
+    def _call(self, name: str, function: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run API call through the transport, each attempt is timed separately. Client side retries
+        are disabled (retry=None) by callers, so quota errors reach the transport's concurrency limiter.
+        """
+
+        def attempt() -> T:
+            with self.instrumentation.timed(name):
+                return function(*args, **kwargs)
+
+        # Lazy permission check runs its own call, it must not wait for a slot inside one
+        self.client
+        return self.transport.call(attempt)
+
+    def get_model(self, model_ref: Union[bigquery.Model, str]) -> bigquery.Model:
+        return self._call("get_model", lambda: self.client.get_model(model_ref, retry=None))
+
+    def get_dataset(self, dataset_id: str) -> bigquery.Dataset:
+        return self._call("get_dataset", lambda: self.client.get_dataset(dataset_id, retry=None))
+
+    def get_table(self, table_id: str) -> bigquery.Table:
+        return self._call("get_table", lambda: self.client.get_table(table_id, retry=None))
+
+    def create_table(self, table: bigquery.Table) -> bigquery.Table:
+        return self._call("create_table", lambda: self.client.create_table(table, retry=None))
+
+    def delete_table(self, table_id: str) -> None:
+        self._call("delete_table", lambda: self.client.delete_table(table_id, not_found_ok=True, retry=None))
+
+    def list_models(self, dataset_id: str) -> List[bigquery.Model]:
+        """List all models of a dataset, following all result pages."""
+        return self._call("list_models", lambda: list(self.client.list_models(dataset_id, retry=None)))
+
+    def insert_rows_json(self, 
+                         table_id: str, 
+                         rows: List[Dict[str, Any]],
+                         row_ids: Optional[List[str]] = None,
+                         num_bytes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Streaming insert of rows, returns per-row insert errors. Without row_ids, the client generates
+        random insert ids, so a retried request may duplicate rows. num_bytes is the serialized size if known.
+        """
+        errors = self._call(
+            "insert_rows_json", lambda: self.client.insert_rows_json(table_id, rows, row_ids=row_ids, retry=None)
+        )
+
+        if num_bytes is None:
+            num_bytes = sum(len(json.dumps(row, default=str)) for row in rows)
+        self.instrumentation.record_insert(len(rows), num_bytes)
+        return errors
+
+    def load_table_from_file(self, 
+                             data: io.BytesIO, 
+                             table_id: str, 
+                             job_config: bigquery.LoadJobConfig, 
+                             num_rows: int) -> bigquery.LoadJob:
+        """Run load job and wait for it to finish, raise on job errors."""
+
+        def load() -> bigquery.LoadJob:
+            # Retried attempts upload the file again from the start
+            data.seek(0)
+            job = self.client.load_table_from_file(data, table_id, job_config=job_config)
+            job.result()
+            return job
+
+        job = self._call("load_job", load)
+
+        self.instrumentation.record_insert(num_rows, data.getbuffer().nbytes)
+        return job
+
+    def start_query(self, sql: str, job_config: Optional[QueryJobConfig] = None) -> QueryJob:
+        """
+        Start query job, job is registered in job_tracker if one is set.
+        Raises QueryCancelledError if the tracker was cancelled, instead of starting another job.
+        """
+        tracker = job_tracker.get()
+        if tracker is not None and tracker.cancelled:
+            raise QueryCancelledError("Query was not started, its task was cancelled.")
+
+        job = self.client.query(sql, job_config=job_config, retry=None, job_retry=None)
+        if tracker is not None:
+            tracker.add(job)
+        return job
+
+    def query(self, sql: str, use_cache: bool = True) -> pd.DataFrame:
         """Query BigQuery tables with sql and save results into DataFrame."""
-        return self.client.query(sql).to_dataframe()
+        return self._cached_dataframe(sql, None, use_cache)
 
-    def parameterized_query(self, sql: str, params: list[dict[str, str]]) -> pd.DataFrame:
+    def parameterized_query(self, sql: str, params: list[dict[str, str]], use_cache: bool = True) -> pd.DataFrame:
         """
         Query BigQuery tables with sql and save results into DataFrame.
         Params should be a list of dicts, where each dict contains the following keys:
-        name: name of the parameter, value: value of the parameter, type: type of the parameter
+        name: name of the parameter, value: value of the parameter, type: type of the parameter.
+        List values are passed as array parameters, with type of their elements.
+        """
+        return self._cached_dataframe(sql, params, use_cache)
+
+    def _cached_dataframe(self, sql: str, params: Optional[list[dict[str, str]]], use_cache: bool) -> pd.DataFrame:
         """
-        query_params = [ScalarQueryParameter(param["name"], param["type"], param["value"]) for param in params]
-        
+        Serve DataFrame result from cache if enabled, otherwise run the query and cache its result.
+        Queries refused by a fallback governor are served from expired cache entries if there are any.
+        """
+
+        if self.cache is None or not use_cache:
+            return self._download_dataframe(sql, params)
+
+        key = self.cache.key(sql, params)
+        result = self.cache.get(key)
+        if result is None:
+            try:
+                result = self._download_dataframe(sql, params)
+            except QueryBudgetExceededError as error:
+                stale = self.cache.get(key, allow_expired=True) if self.governor.fallback else None
+                if stale is None:
+                    raise
+                print(f"Warning: {error.message} Serving expired cached result instead.")
+                return stale
+            self.cache.put(key, sql, result)
+        return result
+
+    def _download_dataframe(self, sql: str, params: Optional[list[dict[str, str]]]) -> pd.DataFrame:
+        rows = self._result(sql, params)
+        with self.instrumentation.timed("download"):
+            return rows.to_dataframe(bqstorage_client=self._read_client_if_enabled())
+
+    def query_arrow(self, sql: str, params: Optional[list[dict[str, str]]] = None):
+        """Query BigQuery tables with sql and save results into pyarrow.Table."""
+        return self._result(sql, params).to_arrow(bqstorage_client=self._read_client_if_enabled())
+
+    def iter_query_batches(self, sql: str, params: Optional[list[dict[str, str]]] = None) -> Iterator[Any]:
+        """Query BigQuery tables with sql and stream results as pyarrow.RecordBatch objects."""
+        return self._result(sql, params).to_arrow_iterable(bqstorage_client=self._read_client_if_enabled())
+
+    def iter_query_dataframes(self, sql: str, params: Optional[list[dict[str, str]]] = None) -> Iterator[pd.DataFrame]:
+        """Query BigQuery tables with sql and stream results as DataFrame chunks, memory use is bounded by chunk size."""
+        return self._result(sql, params).to_dataframe_iterable(bqstorage_client=self._read_client_if_enabled())
+
+    def _result(self, sql: str, params: Optional[list[dict[str, str]]] = None) -> RowIterator:
+        """Run (parameterized) query and wait for its result."""
+        return self._run_query(sql, params)[1]
+
+    def execute(self, sql: str, params: Optional[list[dict[str, str]]] = None) -> QueryJob:
+        """Run (parameterized) statement, e.g. DML or DDL, and wait for it to finish."""
+        return self._run_query(sql, params)[0]
+
+    def estimate_bytes(self, sql: str, params: Optional[list[dict[str, str]]] = None) -> int:
+        """Bytes the query would process, from a (free) dry run."""
+
+        job_config = self._job_config(params) or QueryJobConfig()
+        job_config.dry_run = True
+        job_config.use_query_cache = False
+        job = self._call("dry_run", lambda: self.client.query(sql, job_config=job_config, retry=None, job_retry=None))
+        return job.total_bytes_processed or 0
+
+    def _run_query(self, sql: str, params: Optional[list[dict[str, str]]]) -> Tuple[QueryJob, RowIterator]:
+        """Run query job, within byte budgets of the governor if one is set."""
+
+        job_config = self._job_config(params)
+        if self.governor is None:
+            job, result = self._run_job(sql, job_config)
+            self.instrumentation.record_job(job)
+            return job, result
+
+        estimated_bytes = self.estimate_bytes(sql, params) if self.governor.dry_run else 0
+        job_config = job_config or QueryJobConfig()
+        job_config.maximum_bytes_billed = self.governor.admit(estimated_bytes, sql)
+
+        try:
+            job, result = self._run_job(sql, job_config)
+        except Exception as error:
+            self.governor.settle(estimated_bytes, 0)
+            if "bytesBilledLimitExceeded" in self.transport.error_reasons(error):
+                raise QueryBudgetExceededError(
+                    f"Query exceeded maximum_bytes_billed of {job_config.maximum_bytes_billed} bytes.",
+                    estimated_bytes=estimated_bytes,
+                    budget_bytes=job_config.maximum_bytes_billed,
+                ) from error
+            raise
+
+        self.governor.settle(estimated_bytes, job.total_bytes_billed)
+        self.instrumentation.record_job(job)
+        return job, result
+
+    def _run_job(self, sql: str, job_config: Optional[QueryJobConfig]) -> Tuple[QueryJob, RowIterator]:
+        """
+        Start query job through the transport and wait for its result outside of it. Only the job insert
+        is retried, so a slot is not held while the query runs and a failed statement is not run again.
+        """
+        job = self._call("query", self.start_query, sql, job_config)
+        with self.instrumentation.timed("query_result"):
+            return job, job.result(job_retry=None)
+
+    def _query_with_fallback(self, 
+                             candidates: List[str], 
+                             params: Optional[list[dict[str, str]]] = None) -> pd.DataFrame:
+        """
+        Run the first of candidate queries (from full to cheapest) admitted by the governor.
+        Without a fallback governor only the first one is run. Results of a narrower query
+        have attrs["fallback"] set, so callers do not store them as the full result.
+        """
+        for index, sql in enumerate(candidates):
+            try:
+                result = self._cached_dataframe(sql, params, use_cache=True)
+            except QueryBudgetExceededError as error:
+                if not self.governor.fallback or index == len(candidates) - 1:
+                    raise
+                print(f"Warning: {error.message} Falling back to a narrower query.")
+                continue
+
+            if index:
+                # Cached DataFrames are shared, the flag is set on a shallow copy
+                result = result.copy(deep=False)
+                result.attrs["fallback"] = True
+            return result
+
+    @staticmethod
+    def _job_config(params: Optional[list[dict[str, str]]]) -> Optional[QueryJobConfig]:
+        """Query job config with query parameters, list values are passed as array parameters."""
+
+        if params is None:
+            return None
+
         job_config = QueryJobConfig()
-        job_config.query_parameters = query_params
-        
-        return self.client.query(sql, job_config=job_config).to_dataframe()
+        job_config.query_parameters = [
+            ArrayQueryParameter(param["name"], param["type"], param["value"]) if isinstance(param["value"], list)
+            else ScalarQueryParameter(param["name"], param["type"], param["value"])
+            for param in params
+        ]
+        return job_config
 
-    def execute_trial_info_sql(self, full_model_id: str) -> pd.DataFrame:
-        """Executes ML.TRIAL_INFO() function and saves results in a DataFrame."""
+    def _read_client_if_enabled(self):
+        # Backends serve results themselves, without Storage Read API
+        return self.read_client if self.use_storage_api and self.backend is None else None
 
-        trial_info_sql = f"""
-            SELECT 
-                trial_id, hyperparameters.*, hparam_tuning_evaluation_metrics.*, 
-                training_loss, eval_loss, status, error_message, is_optimal
-            FROM ML.TRIAL_INFO(MODEL `{full_model_id}`)
+    def execute_trial_info_sql(self, 
+                               full_model_id: str,
+                               columns: Optional[List[str]] = None,
+                               only_optimal: bool = False,
+                               top_k: Optional[int] = None,
+                               order_by: Optional[str] = None,
+                               ascending: bool = False) -> pd.DataFrame:
+        """
+        Executes ML.TRIAL_INFO() function and saves results in a DataFrame.
+        Filtering is pushed down to BigQuery: columns selects output columns besides trial_id
+        (e.g. 'hyperparameters.l1_reg', 'eval_loss'), only_optimal keeps the optimal trial and
+        top_k keeps best trials ordered by order_by column.
         """
-        return self.query(trial_info_sql)
+        if top_k is not None and order_by is None:
+            raise ValueError("Parameter top_k requires order_by column.")
+
+        for column in (columns or []) + ([order_by] if order_by else []):
+            if not self._is_column_path(column):
+                raise ValueError(f"Invalid column name: {column}")
+
+        # Fallback governors may drop to hyperparameters and eval loss only, if all columns are over budget
+        if columns is None:
+            projections = ["""trial_id, hyperparameters.*, hparam_tuning_evaluation_metrics.*, 
+                training_loss, eval_loss, status, error_message, is_optimal""",
+                           "trial_id, hyperparameters.*, eval_loss, is_optimal"]
+        else:
+            projections = [", ".join(["trial_id"] + columns)]
+
+        def trial_info_sql(projection: str) -> str:
+            sql = f"""
+                SELECT 
+                    {projection}
+                FROM ML.TRIAL_INFO(MODEL `{full_model_id}`)
+            """
+            if only_optimal:
+                sql += "WHERE is_optimal\n"
+            if order_by is not None:
+                sql += f"ORDER BY {order_by} {'ASC' if ascending else 'DESC'}\n"
+            if top_k is not None:
+                sql += f"LIMIT {int(top_k)}\n"
+            return sql
+
+        return self._query_with_fallback([trial_info_sql(projection) for projection in projections])
+
+    @staticmethod
+    def _is_column_path(column: str) -> bool:
+        """Check if column is a plain (optionally nested) column name, safe to put into sql."""
+        return all(part.isidentifier() for part in column.split("."))
 
     def execute_feature_importance_sql(self, full_model_id: str) -> pd.DataFrame:
         """Executes ML.FEATURE_IMPORTANCE() function and saves results in a DataFrame."""
@@ -49,25 +426,111 @@ class BigQueryConnector(Config):
         """
         return self.query(feature_importance_sql)
 
+    def execute_feature_importance_sql_many(self, 
+                                            full_model_ids: List[str], 
+                                            chunk_size: int = 50,
+                                            max_workers: int = 4) -> Dict[str, pd.DataFrame]:
+        """
+        Executes ML.FEATURE_IMPORTANCE() for many models, combined with UNION ALL into one job
+        per chunk of chunk_size models. Results are split back into a DataFrame per model id.
+        """
+
+        def run_chunk(chunk: List[str]) -> Dict[str, pd.DataFrame]:
+            feature_importance_sql = "\nUNION ALL\n".join(f"""
+                SELECT '{full_model_id}' AS model_id, *
+                FROM ML.FEATURE_IMPORTANCE(MODEL `{full_model_id}`)
+            """ for full_model_id in chunk)
+            return self._split_by_model(self.query(feature_importance_sql), chunk)
+
+        return self._run_chunked(run_chunk, full_model_ids, chunk_size, max_workers)
+
+    def execute_trial_info_sql_many(self, 
+                                    full_model_ids: List[str], 
+                                    chunk_size: int = 50,
+                                    max_workers: int = 4) -> Dict[str, pd.DataFrame]:
+        """
+        Executes ML.TRIAL_INFO() for many models, combined with UNION ALL into one job per chunk
+        of chunk_size models. Hyperparameters differ between models, so trials are serialized
+        to JSON and flattened back into the execute_trial_info_sql layout per model id.
+        """
+
+        def run_chunk(chunk: List[str]) -> Dict[str, pd.DataFrame]:
+            trial_info_sql = "\nUNION ALL\n".join(f"""
+                SELECT '{full_model_id}' AS model_id, TO_JSON_STRING(trials) AS trial
+                FROM ML.TRIAL_INFO(MODEL `{full_model_id}`) AS trials
+            """ for full_model_id in chunk)
+            df = self.query(trial_info_sql)
+
+            # Unpack structs the same way as hyperparameters.*, hparam_tuning_evaluation_metrics.*
+            records = {full_model_id: [] for full_model_id in chunk}
+            for model_id, trial in zip(df.get("model_id", []), df.get("trial", [])):
+                trial = json.loads(trial)
+                record = {"trial_id": trial["trial_id"]}
+                record.update(trial.get("hyperparameters") or {})
+                record.update(trial.get("hparam_tuning_evaluation_metrics") or {})
+                for key in ("training_loss", "eval_loss", "status", "error_message", "is_optimal"):
+                    record[key] = trial.get(key)
+                records[model_id].append(record)
+
+            return {model_id: pd.DataFrame.from_records(rows) for model_id, rows in records.items()}
+
+        return self._run_chunked(run_chunk, full_model_ids, chunk_size, max_workers)
+
+    @staticmethod
+    def _run_chunked(run_chunk, full_model_ids: List[str], chunk_size: int, max_workers: int) -> Dict[str, pd.DataFrame]:
+        """
+        Run batched query function over chunks of model ids on a thread pool.
+        A single invalid model fails the whole job, models of failed chunks are left out of results.
+        """
+
+        chunks = [full_model_ids[i:i + chunk_size] for i in range(0, len(full_model_ids), chunk_size)]
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [submit_in_context(executor, run_chunk, chunk) for chunk in chunks]
+            for future in futures:
+                try:
+                    results.update(future.result())
+                except Exception as error:
+                    print(f"Warning: Batched query failed, models will be queried one by one: {error}")
+        return results
+
+    @staticmethod
+    def _split_by_model(df: pd.DataFrame, full_model_ids: List[str]) -> Dict[str, pd.DataFrame]:
+        """Split result of batched query into a DataFrame per model, tagged by model_id column."""
+
+        if df.empty:
+            return {full_model_id: pd.DataFrame() for full_model_id in full_model_ids}
+
+        groups = {
+            model_id: group.drop(columns="model_id").reset_index(drop=True)
+            for model_id, group in df.groupby("model_id", sort=False)
+        }
+        return {full_model_id: groups.get(full_model_id, pd.DataFrame()) for full_model_id in full_model_ids}
+
     def execute_search_model_sql(self, 
                                  project_id: str, 
                                  model_id: str, 
                                  limit_date: Union[str, datetime.datetime] = None,
                                  region: str = "us") -> pd.DataFrame:
-        """Executes query on INFORMATION_SCHEMA and searches for model creation statement."""
-
-        search_model_sql = f"""
-            SELECT *
-            FROM `{project_id}.region-{region}.INFORMATION_SCHEMA.JOBS_BY_PROJECT`
-            WHERE project_id = @project_id
-                AND statement_type = "CREATE_MODEL"
-                AND state = "DONE"
-                AND destination_table.table_id = @model_id
-                AND DATE(creation_time) = @limit_date
-            
-            ORDER BY creation_time DESC
-            LIMIT 1
         """
+        Executes query on INFORMATION_SCHEMA and searches for model creation statement.
+        With a fallback governor, only statement columns are read if the full row is over budget.
+        """
+
+        def search_model_sql(projection: str) -> str:
+            return f"""
+                SELECT {projection}
+                FROM `{project_id}.region-{region}.INFORMATION_SCHEMA.JOBS_BY_PROJECT`
+                WHERE project_id = @project_id
+                    AND statement_type = "CREATE_MODEL"
+                    AND state = "DONE"
+                    AND destination_table.table_id = @model_id
+                    AND DATE(creation_time) = @limit_date
+                
+                ORDER BY creation_time DESC
+                LIMIT 1
+            """
+
         # Define parameters for parameterized query
         params = [
             {"name": "project_id", "type": "STRING", "value": project_id},
@@ -77,10 +540,77 @@ class BigQueryConnector(Config):
 
         # Execute parameterized query, raise error if no results are found
         try:  
-            query_result = self.parameterized_query(search_model_sql, params)
+            query_result = self._query_with_fallback(
+                [search_model_sql("*"), search_model_sql("job_id, creation_time, destination_table, query")], params
+            )
             
         except ValueError:
             raise SQLNotFoundError(("No results found for search_model_sql query. " 
                                    "Model create statement was most likely executed on a different project."))
 
-        return query_result
\ No newline at end of file
+        return query_result
+
+    def search_model_sql_many(self,
+                              full_model_ids: List[str],
+                              start_time: datetime.datetime,
+                              end_time: datetime.datetime,
+                              region: str = "us",
+                              created: Optional[Dict[str, datetime.datetime]] = None) -> Dict[str, str]:
+        """
+        Searches INFORMATION_SCHEMA for creation statements of many models, with a single query
+        per project. Jobs are filtered on creation_time range (partition column of the view)
+        and only needed columns are read. Statements are cached by full model id and model creation
+        time from created, models without a creation time are always looked up. Models without
+        a statement found in the range are left out of results.
+        """
+        created = created or {}
+        versions = {
+            full_model_id: (full_model_id, created[full_model_id].isoformat())
+            for full_model_id in full_model_ids if full_model_id in created
+        }
+
+        statements = {}
+        with self._model_sql_lock:
+            for full_model_id, key in versions.items():
+                if key in self._model_sql_cache:
+                    self._model_sql_cache.move_to_end(key)
+                    statements[full_model_id] = self._model_sql_cache[key]
+
+        # Jobs views are per project, models are looked up in the project they belong to
+        missing_by_project: Dict[str, List[str]] = {}
+        for full_model_id in full_model_ids:
+            if full_model_id not in statements:
+                missing_by_project.setdefault(full_model_id.split(".")[0], []).append(full_model_id)
+
+        for project_id, project_model_ids in missing_by_project.items():
+            search_model_sql = f"""
+                SELECT 
+                    CONCAT(destination_table.project_id, ".", destination_table.dataset_id, ".", 
+                           destination_table.table_id) AS full_model_id, 
+                    query
+                FROM `{project_id}.region-{region}.INFORMATION_SCHEMA.JOBS_BY_PROJECT`
+                WHERE creation_time BETWEEN @start_time AND @end_time
+                    AND statement_type = "CREATE_MODEL"
+                    AND state = "DONE"
+                    AND CONCAT(destination_table.project_id, ".", destination_table.dataset_id, ".", 
+                               destination_table.table_id) IN UNNEST(@full_model_ids)
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY full_model_id ORDER BY creation_time DESC) = 1
+            """
+            params = [
+                {"name": "start_time", "type": "TIMESTAMP", "value": start_time},
+                {"name": "end_time", "type": "TIMESTAMP", "value": end_time},
+                {"name": "full_model_ids", "type": "STRING", "value": project_model_ids},
+            ]
+            table = self.query_arrow(search_model_sql, params)
+            found = dict(zip(table.column("full_model_id").to_pylist(), table.column("query").to_pylist()))
+
+            with self._model_sql_lock:
+                for full_model_id, statement in found.items():
+                    if full_model_id in versions:
+                        self._model_sql_cache[versions[full_model_id]] = statement
+                        self._model_sql_cache.move_to_end(versions[full_model_id])
+                while len(self._model_sql_cache) > self.model_sql_cache_size:
+                    self._model_sql_cache.popitem(last=False)
+            statements.update(found)
+
+        return statements
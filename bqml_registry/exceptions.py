@@ -16,3 +16,28 @@ class SQLNotFoundError(RegistryError):
         self.message = message
         super().__init__(self.message)
 
+
+class RegistryWriteError(RegistryError):
+    """Exception raised when rows could not be written to the registry table."""
+
+    def __init__(self, message="Registry write failed"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class QueryBudgetExceededError(RegistryError):
+    """Exception raised when a query would exceed a byte budget of the CostGovernor."""
+
+    def __init__(self, message="Query byte budget exceeded", estimated_bytes=None, budget_bytes=None):
+        self.message = message
+        self.estimated_bytes = estimated_bytes
+        self.budget_bytes = budget_bytes
+        super().__init__(self.message)
+
+
+class QueryCancelledError(RegistryError):
+    """Exception raised when a query is started on behalf of a cancelled task."""
+
+    def __init__(self, message="Query was cancelled"):
+        self.message = message
+        super().__init__(self.message)
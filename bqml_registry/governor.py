@@ -0,0 +1,101 @@
+from typing import Dict, Literal, Optional
+import threading
+from .exceptions import QueryBudgetExceededError
+
+
+class CostGovernor():
+    """
+    Byte budgets of query jobs. Queries are dry-run first, a query estimated to process more than
+    max_bytes_per_query, or more than is left of max_bytes_per_run, is refused. Admitted jobs run
+    with maximum_bytes_billed capped by the same limits, so BigQuery fails them instead of billing more.
+    With on_exceed="fallback" connectors try a cheaper alternative (narrower projection, cached result)
+    before raising QueryBudgetExceededError. A run lasts until reset(), e.g. one nightly sync.
+    Queries are billed at least minimum_billed_bytes, so a budget below it refuses every query.
+    """
+
+    # On-demand queries are billed at least 10MB, a lower maximum_bytes_billed fails every job
+    minimum_billed_bytes = 10 * 1024 ** 2
+
+    def __init__(self,
+                 max_bytes_per_query: Optional[int] = 10 * 1024 ** 3,
+                 max_bytes_per_run: Optional[int] = 100 * 1024 ** 3,
+                 on_exceed: Literal["raise", "fallback"] = "raise",
+                 dry_run: bool = True) -> None:
+        if on_exceed not in ("raise", "fallback"):
+            raise ValueError(f"Unknown on_exceed mode: {on_exceed}")
+
+        self.max_bytes_per_query = max_bytes_per_query
+        self.max_bytes_per_run = max_bytes_per_run
+        self.on_exceed = on_exceed
+        self.dry_run = dry_run
+
+        # Bytes billed by finished jobs, and estimates of jobs still running
+        self._billed = 0
+        self._reserved = 0
+        self._refused = 0
+        self._lock = threading.Lock()
+
+    @property
+    def fallback(self) -> bool:
+        return self.on_exceed == "fallback"
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Bytes left of the run budget, not counting running jobs. None without a run budget."""
+        if self.max_bytes_per_run is None:
+            return None
+        with self._lock:
+            return max(0, self.max_bytes_per_run - self._billed)
+
+    def admit(self, estimated_bytes: int, sql: str = "") -> Optional[int]:
+        """
+        Reserve billable bytes of a query (its estimate, at least minimum_billed_bytes), raise
+        QueryBudgetExceededError if a budget would be exceeded. Returns maximum_bytes_billed for the job,
+        None when no budget is set.
+        """
+        billable_bytes = self._billable(estimated_bytes)
+        with self._lock:
+            limits = []
+            if self.max_bytes_per_query is not None:
+                limits.append(self.max_bytes_per_query)
+            if self.max_bytes_per_run is not None:
+                limits.append(self.max_bytes_per_run - self._billed - self._reserved)
+
+            limit = min(limits) if limits else None
+            if limit is not None and billable_bytes > limit:
+                self._refused += 1
+                raise QueryBudgetExceededError(
+                    f"Query would bill {billable_bytes} bytes, budget allows {max(0, limit)} bytes: "
+                    f"{' '.join(sql.split())[:200]}",
+                    estimated_bytes=estimated_bytes,
+                    budget_bytes=max(0, limit),
+                )
+            self._reserved += billable_bytes
+
+        return limit
+
+    def settle(self, estimated_bytes: int, billed_bytes: Optional[int]) -> None:
+        """Replace reservation of a finished (or failed) job with the bytes it billed."""
+        with self._lock:
+            self._reserved -= self._billable(estimated_bytes)
+            self._billed += billed_bytes or 0
+
+    def _billable(self, estimated_bytes: int) -> int:
+        return max(estimated_bytes, self.minimum_billed_bytes)
+
+    def reset(self) -> None:
+        """Start a new run, the run budget is available again."""
+        with self._lock:
+            self._billed = 0
+            self._refused = 0
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        """Bytes billed in the current run, bytes of running jobs and number of refused queries."""
+        with self._lock:
+            return {
+                "billed_bytes": self._billed,
+                "reserved_bytes": self._reserved,
+                "refused_queries": self._refused,
+                "max_bytes_per_query": self.max_bytes_per_query,
+                "max_bytes_per_run": self.max_bytes_per_run,
+            }
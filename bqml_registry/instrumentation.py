@@ -0,0 +1,121 @@
+from typing import List, Dict, Any, Callable, Optional
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+
+class Instrumentation():
+    """
+    Collects per-call counts, errors and latency histograms of BigQuery API calls,
+    bytes processed/billed and slot-ms of query jobs, and inserted rows and bytes.
+    Every recorded event is also passed to registered exporters, e.g. for metrics backends.
+    """
+
+    # Upper bounds of latency histogram buckets in seconds, last bucket collects the rest
+    latency_buckets = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"))
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._exporters: List[Callable[[Dict[str, Any]], None]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero all counters, exporters are kept."""
+        with self._lock:
+            self._calls: Dict[str, Dict[str, Any]] = {}
+            self._jobs = {"count": 0, "bytes_processed": 0, "bytes_billed": 0, "slot_millis": 0, "cache_hits": 0}
+            self._inserts = {"requests": 0, "rows": 0, "bytes": 0}
+
+    def add_exporter(self, exporter: Callable[[Dict[str, Any]], None]) -> None:
+        """Register callback receiving event dicts: {"event": "call" | "job" | "insert", ...}."""
+        self._exporters.append(exporter)
+
+    def remove_exporter(self, exporter: Callable[[Dict[str, Any]], None]) -> None:
+        self._exporters.remove(exporter)
+
+    @contextmanager
+    def timed(self, name: str):
+        """Measure latency of the wrapped API call, errors are counted and re-raised."""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record_call(name, time.perf_counter() - start, error)
+
+    def record_call(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            call = self._calls.get(name)
+            if call is None:
+                call = self._calls[name] = {
+                    "count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                    "histogram": [0] * len(self.latency_buckets),
+                }
+
+            call["count"] += 1
+            call["errors"] += int(error)
+            call["total_seconds"] += seconds
+            call["max_seconds"] = max(call["max_seconds"], seconds)
+            call["histogram"][bisect.bisect_left(self.latency_buckets, seconds)] += 1
+
+        self._export({"event": "call", "name": name, "seconds": seconds, "error": error})
+
+    def record_job(self, job) -> None:
+        """Record statistics of finished QueryJob."""
+        bytes_processed = job.total_bytes_processed or 0
+        bytes_billed = job.total_bytes_billed or 0
+        slot_millis = job.slot_millis or 0
+        cache_hit = bool(job.cache_hit)
+
+        with self._lock:
+            self._jobs["count"] += 1
+            self._jobs["bytes_processed"] += bytes_processed
+            self._jobs["bytes_billed"] += bytes_billed
+            self._jobs["slot_millis"] += slot_millis
+            self._jobs["cache_hits"] += int(cache_hit)
+
+        self._export({
+            "event": "job", "job_id": job.job_id, "bytes_processed": bytes_processed,
+            "bytes_billed": bytes_billed, "slot_millis": slot_millis, "cache_hit": cache_hit,
+        })
+
+    def record_insert(self, rows: int, num_bytes: int) -> None:
+        with self._lock:
+            self._inserts["requests"] += 1
+            self._inserts["rows"] += rows
+            self._inserts["bytes"] += num_bytes
+
+        self._export({"event": "insert", "rows": rows, "bytes": num_bytes})
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of recorded calls, jobs and inserts, latency percentiles are bucket upper bounds."""
+        with self._lock:
+            calls = {}
+            for name, call in self._calls.items():
+                calls[name] = {
+                    "count": call["count"],
+                    "errors": call["errors"],
+                    "mean_seconds": call["total_seconds"] / call["count"],
+                    "max_seconds": call["max_seconds"],
+                    "p50_seconds": self._percentile(call["histogram"], 0.5),
+                    "p95_seconds": self._percentile(call["histogram"], 0.95),
+                    "histogram": dict(zip(self.latency_buckets, call["histogram"])),
+                }
+            return {"calls": calls, "jobs": dict(self._jobs), "inserts": dict(self._inserts)}
+
+    def _percentile(self, histogram: List[int], quantile: float) -> Optional[float]:
+        total = sum(histogram)
+        cumulative = 0
+        for bucket, count in zip(self.latency_buckets, histogram):
+            cumulative += count
+            if cumulative >= quantile * total:
+                return bucket
+        return None
+
+    def _export(self, event: Dict[str, Any]) -> None:
+        for exporter in self._exporters:
+            exporter(event)
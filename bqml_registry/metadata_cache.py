@@ -0,0 +1,139 @@
+from typing import Dict, Any, Optional, Tuple
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+
+class MetadataCache():
+    """
+    Persistent SQLite cache of raw model resources and fetched ModelData sections.
+    Entries are keyed by fully qualified model id and are valid only for the model etag they were
+    stored with. Cached resources younger than revalidate_after seconds are used without any API call,
+    older ones are revalidated with a single get_model. Least recently used entries are evicted
+    once the cache grows over max_bytes.
+    """
+
+    # Section name under which the raw model resource is stored
+    MODEL_SECTION = "__model__"
+
+    def __init__(self,
+                 path: str = ".bqml_registry_cache.sqlite",
+                 max_bytes: int = 256 * 1024 ** 2,
+                 revalidate_after: float = 0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                model_id TEXT NOT NULL,
+                section TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (model_id, section)
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get_model(self, model_id: str) -> Optional[Tuple[Dict[str, Any], str, bool]]:
+        """Return cached model resource, its etag and whether it can be used without revalidation."""
+
+        entry = self._get(model_id, self.MODEL_SECTION)
+        if entry is None:
+            return None
+
+        resource, etag, stored = entry
+        return resource, etag, time.time() - stored < self.revalidate_after
+
+    def put_model(self, model_id: str, resource: Dict[str, Any]) -> None:
+        """Store model resource, sections stored for a different etag are dropped."""
+
+        etag = resource.get("etag", "")
+        with self._lock:
+            self._connection.execute("DELETE FROM entries WHERE model_id = ? AND etag != ?", (model_id, etag))
+        self._put(model_id, self.MODEL_SECTION, etag, resource)
+
+    def touch_model(self, model_id: str) -> None:
+        """Mark cached model resource as revalidated now."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "UPDATE entries SET stored = ?, accessed = ? WHERE model_id = ? AND section = ?",
+                (now, now, model_id, self.MODEL_SECTION),
+            )
+
+    def get_section(self, model_id: str, etag: str, section: str) -> Optional[Any]:
+        """Return cached section for model etag, None if missing."""
+
+        entry = self._get(model_id, section)
+        if entry is None or entry[1] != etag:
+            return None
+        return entry[0]
+
+    def put_section(self, model_id: str, etag: str, section: str, value: Any) -> None:
+        self._put(model_id, section, etag, value)
+
+    def drop(self, model_id: Optional[str] = None) -> None:
+        """Drop cached entries of a model, or the whole cache when model_id is not provided."""
+        with self._lock:
+            if model_id is None:
+                self._connection.execute("DELETE FROM entries")
+            else:
+                self._connection.execute("DELETE FROM entries WHERE model_id = ?", (model_id,))
+
+    @property
+    def size(self) -> int:
+        """Total size of cached payloads in bytes."""
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _get(self, model_id: str, section: str) -> Optional[Tuple[Any, str, float]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload, etag, stored FROM entries WHERE model_id = ? AND section = ?", (model_id, section)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE entries SET accessed = ? WHERE model_id = ? AND section = ?", (time.time(), model_id, section)
+            )
+
+        payload, etag, stored = row
+        return json.loads(zlib.decompress(payload)), etag, stored
+
+    def _put(self, model_id: str, section: str, etag: str, value: Any) -> None:
+        payload = zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (model_id, section, etag, payload, len(payload), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently accessed entries until cache fits into max_bytes."""
+
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT model_id, section, size FROM entries ORDER BY accessed").fetchall()
+        to_delete = []
+        for model_id, section, size in rows:
+            if total <= self.max_bytes:
+                break
+            to_delete.append((model_id, section))
+            total -= size
+
+        self._connection.executemany("DELETE FROM entries WHERE model_id = ? AND section = ?", to_delete)
@@ -1,39 +1,278 @@
-from typing import List, Dict, Union, Optional, Any
+from typing import List, Dict, Union, Optional, Any, TYPE_CHECKING
+import datetime
+import inspect
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
+import numpy as np
 import pandas as pd
 from .config import Config
 from .model_names import ModelNames
-from .connector import BigQueryConnector
+from .connector import BigQueryConnector, submit_in_context
+from .metadata_cache import MetadataCache
+from .exceptions import SQLNotFoundError
+
+if TYPE_CHECKING:
+    from .snapshot import ModelSnapshot
+
+
+def memoized(method):
+    """
+    Cache result of a fetch method per arguments, until ModelData.invalidate() is called. Arguments are
+    bound to the method signature with defaults applied, so positional, keyword and omitted defaults share a key.
+    """
+    signature = inspect.signature(method)
+
+    def section_key(self, *args, **kwargs) -> tuple:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = tuple((name, _hashable(value)) for name, value in bound.arguments.items() if name != "self")
+        return method.__name__, arguments
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = section_key(self, *args, **kwargs)
+        with self._lock:
+            if key in self._sections:
+                return self._sections[key]
+
+        # Fall back to persistent cache, entries are valid for the current model etag only
+        if self.cache is not None:
+            result = self.cache.get_section(self.fully_model_id, self.model.etag, repr(key))
+            if result is not None:
+                with self._lock:
+                    self._sections[key] = result
+                return result
+
+        result = method(self, *args, **kwargs)
+        if isinstance(result, _Uncached):
+            return list(result)
+        with self._lock:
+            self._sections[key] = result
+
+        if self.cache is not None:
+            self.cache.put_section(self.fully_model_id, self.model.etag, repr(key), result)
+        return result
+
+    wrapper.section_key = section_key
+    return wrapper
+
+
+class _Uncached(list):
+    """Records returned by a fetch method but not memoized or persisted, e.g. of a narrower fallback query."""
+
+
+def _hashable(value: Any) -> Any:
+    """Convert list and dict arguments into tuples, so they can be part of a section key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
 
 
 class ModelData():
-    """Responsible for fetching and storing model-related metadata."""
+    """
+    Responsible for fetching and storing model-related metadata.
+    Model metadata is loaded on first access (or on init with lazy=False) and fetched
+    sections are memoized, returned lists are shared between calls and should not be modified.
+    """
+
+    # Sections fetched by prefetch(), not applicable ones are skipped
+    prefetch_sections = (
+        "fetch_target", "fetch_feature_names", "fetch_feature_importance", "fetch_hyperparameters",
+        "fetch_eval_metrics", "fetch_training_info", "fetch_trial_info",
+    )
     
-    def __init__(self, project_id: str, dataset_id: str, model_id: str) -> None:
+    def __init__(self, 
+                 project_id: str, 
+                 dataset_id: str, 
+                 model_id: str,
+                 connector: Optional[BigQueryConnector] = None,
+                 lazy: bool = True,
+                 cache: Optional[MetadataCache] = None) -> None:
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.model_id = model_id
         self.fully_model_id = f"{self.project_id}.{self.dataset_id}.{self.model_id}"
 
-        # Initialize BigQueryConnector object
-        self.connector = BigQueryConnector()
+        # Initialize BigQueryConnector object, reuse the shared one if provided
+        self.connector = connector or BigQueryConnector()
+        self.cache = cache
 
-        try:
-            # Fetch model metadata (raw), else raise error
-            model_ref = bigquery.Model(f"{self.fully_model_id}")
-            model = self.connector.client.get_model(model_ref)
+        # Raw model resource and memoized fetch results
+        self._model: Optional[bigquery.Model] = None
+        self._sections: Dict[tuple, Any] = {}
+        self._lock = threading.RLock()
 
-        except NotFound:
-            raise NameError(f"Model: {self.model_id} was not found in {self.dataset_id} dataset.")
-        
-        self.model = model
-        self.created = self.model.created.strftime('%Y-%m-%d')
-        self.model_type = model.model_type
+        # Results of batched ML.* queries, see ModelData.batch_fetch
+        self._feature_importance_df: Optional[pd.DataFrame] = None
+        self._trial_info_df: Optional[pd.DataFrame] = None
+
+        if not lazy:
+            self.load()
+
+    def load(self) -> "ModelData":
+        """Fetch model metadata if not loaded yet, raise error if model is missing or not supported."""
+
+        with self._lock:
+            if self._model is not None:
+                return self
+
+            model = self._load_cached_model()
+            if model is None:
+                try:
+                    # Fetch model metadata (raw), else raise error
+                    model_ref = bigquery.Model(f"{self.fully_model_id}")
+                    model = self.connector.get_model(model_ref)
+
+                except NotFound:
+                    if self.cache is not None:
+                        self.cache.drop(self.fully_model_id)
+                    raise NameError(f"Model: {self.model_id} was not found in {self.dataset_id} dataset.")
+
+                self._store_cached_model(model)
+            
+            # Check if model type is supported
+            if model.model_type not in ModelNames.SUPPORTED_MODELS:
+                raise NotImplementedError(f"Model type: {model.model_type} is not supported.")
+
+            self._model = model
+            return self
+
+    def _load_cached_model(self) -> Optional[bigquery.Model]:
+        """Return model from persistent cache if it does not need revalidation."""
+
+        if self.cache is None:
+            return None
+
+        cached = self.cache.get_model(self.fully_model_id)
+        if cached is None or not cached[2]:
+            return None
+        return bigquery.Model.from_api_repr(cached[0])
+
+    def _store_cached_model(self, model: bigquery.Model) -> None:
+        """Store fetched model in persistent cache, cached sections survive only if etag did not change."""
+
+        if self.cache is None:
+            return
+
+        cached = self.cache.get_model(self.fully_model_id)
+        if cached is not None and cached[1] == model.etag:
+            self.cache.touch_model(self.fully_model_id)
+        else:
+            self.cache.put_model(self.fully_model_id, model.to_api_repr())
+
+    def is_cached(self, section: str) -> bool:
+        """Check if section (fetch method with default arguments) is available without an API call or query."""
+
+        method = getattr(type(self), section)
+        if isinstance(method, property):
+            method = method.fget
+        key = method.section_key(self)
+        with self._lock:
+            if key in self._sections:
+                return True
+
+        if self.cache is None:
+            return False
+        return self.cache.get_section(self.fully_model_id, self.model.etag, repr(key)) is not None
+
+    def invalidate(self, *sections: str) -> None:
+        """
+        Drop memoized sections by fetch method name, e.g. invalidate("fetch_trial_info").
+        Without arguments everything is dropped, including model metadata.
+        """
+        with self._lock:
+            if not sections:
+                self._model = None
+                self._sections.clear()
+                self._feature_importance_df = None
+                self._trial_info_df = None
+                return
+
+            self._sections = {key: value for key, value in self._sections.items() if key[0] not in sections}
+            if "fetch_feature_importance" in sections:
+                self._feature_importance_df = None
+            if "fetch_trial_info" in sections:
+                self._trial_info_df = None
+
+    def refresh(self) -> "ModelData":
+        """Drop all memoized and persistently cached data and fetch model metadata again."""
+        self.invalidate()
+        if self.cache is not None:
+            self.cache.drop(self.fully_model_id)
+        if self.connector.cache is not None:
+            self.connector.cache.invalidate_matching(self.fully_model_id)
+        return self.load()
+
+    def prefetch(self, max_workers: int = 4) -> "ModelData":
+        """Fetch all sections applicable to the model concurrently, so later calls are served from memory."""
+
+        self.load()
+
+        def fetch_section(section: str) -> None:
+            try:
+                getattr(self, section)()
+            except (ValueError, NotImplementedError):
+                # Section is not available for this model type
+                pass
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in [submit_in_context(executor, fetch_section, section) for section in self.prefetch_sections]:
+                future.result()
+        return self
+
+    @property
+    def model(self) -> bigquery.Model:
+        """Raw bigquery.Model resource, fetched on first access."""
+        return self.load()._model
+
+    @property
+    def created(self) -> str:
+        return self.model.created.strftime('%Y-%m-%d')
+
+    @property
+    def model_type(self) -> str:
+        return self.model.model_type
+
+    def snapshot(self, feature_importance: bool = True, trial_info: bool = True) -> "ModelSnapshot":
+        """Detached compact copy of model sections, see ModelSnapshot."""
+        from .snapshot import ModelSnapshot
+        return ModelSnapshot.from_model_data(self, feature_importance, trial_info)
+
+    @staticmethod
+    def batch_fetch(models: List["ModelData"], 
+                    feature_importance: bool = True,
+                    trial_info: bool = True,
+                    chunk_size: int = 50, 
+                    max_workers: int = 4) -> None:
+        """
+        Run ML.FEATURE_IMPORTANCE() and ML.TRIAL_INFO() for many models in batched jobs
+        and store results on each model, so their fetch methods do not start a job per model.
+        """
+        if not models:
+            return
         
-        # Check if model type is supported
-        if self.model_type not in ModelNames.SUPPORTED_MODELS:
-            raise NotImplementedError(f"Model type: {self.model_type} is not supported.")
+        connector = models[0].connector
+        # Models with sections already cached are skipped
+        tree_models = {model.fully_model_id: model for model in models 
+                       if feature_importance and model.model_type in ModelNames.TREE_MODELS
+                       and not model.is_cached("fetch_feature_importance")}
+        tuning_models = {model.fully_model_id: model for model in models 
+                         if trial_info and model.tuning and not model.is_cached("fetch_trial_info")}
+
+        if tree_models:
+            results = connector.execute_feature_importance_sql_many(list(tree_models), chunk_size, max_workers)
+            for full_model_id, df in results.items():
+                tree_models[full_model_id]._feature_importance_df = df
+
+        if tuning_models:
+            results = connector.execute_trial_info_sql_many(list(tuning_models), chunk_size, max_workers)
+            for full_model_id, df in results.items():
+                tuning_models[full_model_id]._trial_info_df = df
 
     @property
     def metadata(self) -> Dict[str, Any]:
@@ -43,10 +282,12 @@ class ModelData():
         return training_runs
     
     @property
+    @memoized
     def tuning(self):
         """Provide information if hyperparameter-tunning was included."""
         return int(self.metadata.get("trainingOptions", {}).get("numTrials", 0)) > 0
     
+    @memoized
     def fetch_target(self) -> str:
         """Fetches and returns model target variable"""
         
@@ -56,20 +297,24 @@ class ModelData():
         
         return target[0]
     
+    @memoized
     def fetch_feature_names(self):
         """Fetches and returns feature names."""
         return [{"name": feature.name} for feature in self.model.feature_columns]
     
+    @memoized
     def fetch_feature_importance(self) -> List[Dict[str, Union[str, float]]]:
         """Fetches and returns feature importance data."""
         
         if self.model_type not in ModelNames.TREE_MODELS:
             raise ValueError(f"Fetching feature importance is not supported for {self.model_type} model type.")
 
-        df: pd.DataFrame = self.connector.execute_feature_importance_sql(self.fully_model_id)
+        df: pd.DataFrame = self._feature_importance_df
+        if df is None:
+            df = self.connector.execute_feature_importance_sql(self.fully_model_id)
 
         # Rename column 'feature' into name to match BigQuery schema
-        df.rename(columns={'feature': 'name'}, inplace=True)
+        df = df.rename(columns={'feature': 'name'})
 
         return  df.to_dict('records')
     
@@ -80,8 +325,8 @@ class ModelData():
         if isinstance(value, str):
             return value
         
-        if isinstance(value, list):
-            return "-".join(value)
+        if isinstance(value, (list, np.ndarray)):
+            return "-".join(str(item) for item in value)
         return None
     
     @staticmethod
@@ -92,6 +337,7 @@ class ModelData():
             return float(value)
         return None
     
+    @memoized
     def fetch_hyperparameters(self) -> List[Dict[str, Union[str, float]]]:
         """Fetches and returns hyperparameters."""
 
@@ -114,6 +360,7 @@ class ModelData():
 
         return hyperparams_data
 
+    @memoized
     def fetch_eval_metrics(self) -> List[Dict[str, float]]:
         """Fetches and returns evaluation metrics."""
 
@@ -134,6 +381,7 @@ class ModelData():
             
         return [{"name": key, "value": float(value)} for key, value in model_metrics.items()]
 
+    @memoized
     def fetch_training_info(self) -> List[Dict[str, float]]:
         """Fetches and returns training info."""
         
@@ -143,32 +391,111 @@ class ModelData():
         
         return [{"name": key, "value": float(value)} for key, value in training_info.items()]
     
-    def fetch_trial_info(self) -> List[Dict[str, Union[str, float]]]:
-        """Fetches and returns trial info based on ML.TRIAL_INFO() function."""
+    @memoized
+    def fetch_trial_info(self,
+                         columns: Optional[List[str]] = None,
+                         only_optimal: bool = False,
+                         top_k: Optional[int] = None,
+                         order_by: Optional[str] = None,
+                         ascending: bool = False) -> List[Dict[str, Union[str, float]]]:
+        """
+        Fetches and returns trial info based on ML.TRIAL_INFO() function.
+        Optional filters are pushed down to BigQuery, see BigQueryConnector.execute_trial_info_sql.
+        Trials of a narrower fallback query (without evaluation metrics) are not cached.
+        """
 
         if not self.tuning:
             raise ValueError(f"Fetching trial info is not supported for non hyperparameter-tunning models.")
 
-        df: pd.DataFrame = self.connector.execute_trial_info_sql(self.fully_model_id)
+        filtered = columns is not None or only_optimal or top_k is not None or order_by is not None
+        df: pd.DataFrame = None if filtered else self._trial_info_df
+        if df is None:
+            df = self.connector.execute_trial_info_sql(
+                self.fully_model_id, columns, only_optimal, top_k, order_by, ascending
+            )
 
-        # Melt Dataframe, trial_id remains as column - others are unpivoted
-        cols_to_melt = [col for col in df.columns if col != 'trial_id']
-        
-        df_melted = pd.melt(df, id_vars=['trial_id'], value_vars=cols_to_melt, 
-                            var_name='name', value_name='value')
-        
-        # Determine the type of the value for proper BigQuery export
-        df_melted["value_string"] = df_melted['value'].apply(lambda x: self._assign_string_type(x))
-        df_melted['value_float'] = df_melted['value'].apply(lambda x: self._assign_float_type(x))
+        if df.attrs.get("fallback"):
+            return _Uncached(self._unpivot_trials(df))
+        return self._unpivot_trials(df)
+
+    @staticmethod
+    def _unpivot_trials(df: pd.DataFrame, id_column: str = "trial_id") -> List[Dict[str, Union[str, float]]]:
+        """
+        Unpivot trials into (trial_id, name, value_string, value_float) records.
+        Value type is decided once per column from its dtype, not per cell.
+        """
+        value_columns = [col for col in df.columns if col != id_column]
+        num_trials = len(df)
+        if not value_columns or not num_trials:
+            return []
+
+        string_parts, float_parts = [], []
+        for column in value_columns:
+            values = df[column]
+            inferred = pd.api.types.infer_dtype(values, skipna=True)
 
-        # Drop unnecessary 'value' column, save results into a dict
-        df_melted.drop('value', axis=1, inplace=True)
-        return df_melted.to_dict('records')
+            if inferred in ("floating", "integer", "mixed-integer-float", "boolean", "decimal", "empty"):
+                floats = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+                strings = np.full(num_trials, None, dtype=object)
+
+            elif inferred == "string":
+                floats = np.full(num_trials, np.nan)
+                strings = values.astype(object).where(values.notna(), None).to_numpy()
+
+            else:
+                # Array hyperparameters (e.g. hidden_units) are joined into a single string
+                floats = np.full(num_trials, np.nan)
+                strings = np.array([ModelData._assign_string_type(value) for value in values], dtype=object)
+
+            string_parts.append(strings)
+            float_parts.append(floats)
+
+        # Melted layout: all trials of the first column, then all trials of the next one
+        trial_ids = np.tile(df[id_column].to_numpy(), len(value_columns)).tolist()
+        names = np.repeat(np.array(value_columns, dtype=object), num_trials).tolist()
+        value_strings = np.concatenate(string_parts).tolist()
+
+        value_floats = np.concatenate(float_parts).astype(object)
+        value_floats[pd.isna(value_floats)] = None
+        value_floats = value_floats.tolist()
+
+        return [
+            {"trial_id": trial_id, "name": name, "value_string": value_string, "value_float": value_float}
+            for trial_id, name, value_string, value_float in zip(trial_ids, names, value_strings, value_floats)
+        ]
      
-    def generate_model_sql(self, region: str = "us") -> str:
-        """Retrive model create statement sql from information schema."""
+    @memoized
+    def generate_model_sql(self, region: Optional[str] = None) -> str:
+        """Retrive model create statement sql from information schema, of the model's region by default."""
         
-        model_info: pd.DataFrame = self.connector.execute_search_model_sql(self.project_id, self.model_id, self.created, region)
+        statements = self.batch_generate_model_sql([self], region)
+        if self.fully_model_id not in statements:
+            raise SQLNotFoundError(("No results found for search_model_sql query. " 
+                                   "Model create statement was most likely executed on a different project."))
+        return statements[self.fully_model_id]
+
+    @staticmethod
+    def batch_generate_model_sql(models: List["ModelData"], 
+                                 region: Optional[str] = None, 
+                                 lookback: datetime.timedelta = datetime.timedelta(days=2)) -> Dict[str, str]:
+        """
+        Retrive create statements of many models with a single INFORMATION_SCHEMA query per project and region.
+        Models are searched in the region of their location, unless region is provided. Jobs are searched
+        from lookback before the earliest model creation until the latest one.
+        Returns statements keyed by full model id, models without a statement are left out.
+        """
+        models_by_region: Dict[str, List[ModelData]] = {}
+        for model in models:
+            models_by_region.setdefault(region or (model.model.location or "us").lower(), []).append(model)
 
-        # Concatenate all rows into a single string
-        return "".join(model_info["query"].to_list())
+        statements = {}
+        for model_region, region_models in models_by_region.items():
+            created = [model.model.created for model in region_models]
+            statements.update(region_models[0].connector.search_model_sql_many(
+                [model.fully_model_id for model in region_models],
+                start_time=min(created) - lookback,
+                end_time=max(created) + datetime.timedelta(hours=1),
+                region=model_region,
+                created={model.fully_model_id: model.model.created for model in region_models},
+            ))
+        return statements
@@ -1,24 +1,92 @@
-from typing import List, Dict, Union, Optional, Literal
+from typing import List, Dict, Union, Optional, Literal, Any, FrozenSet, Set, Tuple, Iterable, Iterator
+import time
+import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+import pandas as pd
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
 from .config import Config
+from .exceptions import RegistryWriteError
 from .model_data import ModelData
 from .schemas import RegistrySchema
 from .model_names import ModelNames
-from .connector import BigQueryConnector
+from .connector import BigQueryConnector, submit_in_context
+from .transport import Transport, AdaptiveLimiter
+from .reports import RegistrationReport
+from .sinks import RegistrySink, StreamingSink
+from .metadata_cache import MetadataCache
+from .snapshot import ModelSnapshot
 
 
 class ModelRegistry():
     """Provides an interface for interacting with the model registry table."""
+
+    # Filter operators accepted by search
+    search_operators = ("=", "!=", "<", "<=", ">", ">=", "IN", "LIKE")
     
-    def __init__(self, project_id: str, dataset_id: str, table_id: str) -> None:
+    def __init__(self, 
+                 project_id: str, 
+                 dataset_id: str, 
+                 table_id: str,
+                 connector: Optional[BigQueryConnector] = None,
+                 sink: Optional[RegistrySink] = None,
+                 metadata_cache: Optional[MetadataCache] = None) -> None:
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.table_id = table_id
         self.full_table_id = f"{project_id}.{dataset_id}.{table_id}"
 
-        # Initialize BigQueryConnector object
-        self.connector = BigQueryConnector()
+        # Initialize BigQueryConnector object, reuse the shared one if provided
+        self.connector = connector or BigQueryConnector()
+
+        # Cached registry schema with an index of all field paths, revalidated by table etag
+        self.schema_ttl = 300
+        self._schema: Optional[List[bigquery.SchemaField]] = None
+        self._schema_index: FrozenSet[str] = frozenset()
+        self._schema_etag: Optional[str] = None
+        self._schema_checked_at = 0.0
+        self._schema_lock = threading.Lock()
+
+        # Hyperparameter names in the registry mapped to whether they hold float values, cached for schema_ttl
+        self._hyperparam_types: Optional[Dict[str, bool]] = None
+        self._hyperparams_checked_at = 0.0
+
+        # Persistent cache passed to models loaded by the registry
+        self.metadata_cache = metadata_cache
+
+        # Write path for registry rows, streaming inserts by default
+        self.sink = sink or StreamingSink()
+        self.sink.attach(self)
+
+        # Reports with models buffered by the sink, resolved by flush()
+        self._pending_reports: List[RegistrationReport] = []
+        self._pending_lock = threading.Lock()
+
+    def __enter__(self) -> "ModelRegistry":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Write out rows buffered by the sink, pending models of returned reports are then marked as registered.
+        If the sink fails, its rows stay buffered, models stay pending and the error is raised.
+        """
+        with self._pending_lock:
+            reports, self._pending_reports = self._pending_reports, []
+
+        try:
+            self.sink.flush()
+        except Exception:
+            with self._pending_lock:
+                self._pending_reports[:0] = reports
+            raise
+
+        for report in reports:
+            report.resolve_pending()
     
     def create_registry(self, schema: RegistrySchema) -> None:
         """Initialize or validate the registry table."""
@@ -27,15 +95,497 @@ class ModelRegistry():
             print(f"Table: {self.full_table_id} already exists!")
 
         else:
-            table_definition = bigquery.Table(self.full_table_id, schema=schema.build_schema())
-            self.connector.client.create_table(table_definition)
+            table_definition = schema.build_table(self.full_table_id)
+            self.connector.create_table(table_definition)
+            self.invalidate_schema()
             print(f"Table: {self.full_table_id} successfully created.")
 
-    def add_model(self, model: ModelData) -> None:
-        """Adds a model to the registry."""
+    def add_model(self, model: Union[ModelData, ModelSnapshot]) -> None:
+        """Adds a model (or its snapshot) to the registry."""
 
         # Fetching schema to automatially collect required metrics
-        schema = self.fetch_schema()
+        self.fetch_schema()
+        model_insert_dict = self._build_row(model)
+
+        # Insert model metadata into the registry table
+        errors = self.sink.write([model_insert_dict])
+        if errors:
+            raise RegistryWriteError(f"Model: {model.model_id} was not inserted: {errors[0]['errors']}")
+
+    def add_models(self, 
+                   model_ids: List[str], 
+                   project_id: Optional[str] = None, 
+                   dataset_id: Optional[str] = None,
+                   max_workers: int = 8,
+                   batch_size: int = 500,
+                   connector: Optional[BigQueryConnector] = None) -> RegistrationReport:
+        """
+        Adds many models to the registry. Models are processed in windows of batch_size:
+        metadata is fetched on a bounded thread pool, ML.* functions run as batched jobs
+        and rows are built concurrently and streamed to the sink as they are ready. Models are looked up 
+        in the registry project and dataset unless project_id or dataset_id is provided,
+        and read with the registry connector unless connector is provided.
+        Failure of a single model does not stop the run, outcome is returned as a report.
+        """
+        project_id = project_id or self.project_id
+        dataset_id = dataset_id or self.dataset_id
+        connector = connector or self.connector
+
+        # Schema is fetched once for the whole run
+        self.fetch_schema()
+        report = RegistrationReport()
+
+        def load_model(model_id: str) -> ModelData:
+            return ModelData(project_id, dataset_id, model_id, 
+                             connector=connector, lazy=False, cache=self.metadata_cache)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for start in range(0, len(model_ids), batch_size):
+                window = model_ids[start:start + batch_size]
+
+                # Fetch model metadata concurrently
+                models = self._run_per_model(executor, load_model, window, report)
+
+                # Run ML.* functions for the whole window, only if registry stores their results
+                ModelData.batch_fetch(
+                    list(models.values()),
+                    feature_importance=self.has_field('features.importance_weight'),
+                    trial_info=self.has_field('tunning'),
+                )
+
+                # Build rows concurrently, a few ahead of the sink, so built rows do not pile up
+                rows = self._iter_per_model(executor, self._build_row, models.values(), report, 2 * max_workers)
+                self._insert_rows(rows, report, list(models))
+
+        return report
+
+    def add_snapshots(self, snapshots: List[ModelSnapshot], batch_size: int = 500) -> RegistrationReport:
+        """
+        Adds snapshots to the registry, e.g. built in worker processes. Snapshots hold all sections,
+        so rows are built without any API call and streamed to the sink, batch_size rows per write.
+        """
+        self.fetch_schema()
+        report = RegistrationReport()
+
+        def build_rows(batch: List[ModelSnapshot]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+            for snapshot in batch:
+                try:
+                    yield snapshot.model_id, self._build_row(snapshot)
+                except Exception as error:
+                    report.add_failure(snapshot.model_id, error)
+
+        for start in range(0, len(snapshots), batch_size):
+            batch = snapshots[start:start + batch_size]
+            self._insert_rows(build_rows(batch), report, [snapshot.model_id for snapshot in batch])
+
+        return report
+
+    def sync_dataset(self, 
+                     project_id: Optional[str] = None, 
+                     dataset_id: Optional[str] = None,
+                     max_workers: int = 8,
+                     batch_size: int = 500,
+                     connector: Optional[BigQueryConnector] = None,
+                     registered_keys: Optional[Set[Tuple[str, str, str, str]]] = None) -> RegistrationReport:
+        """
+        Registers models of a dataset that are not in the registry yet. Models are matched on
+        (project_id, dataset_id, model_name, created), so a model re-created under the same name is
+        registered again. Rows without project and dataset (written by older versions) match by name.
+        Model types that are not supported are skipped. When nothing changed, sync costs
+        one list_models call and one narrow registry query (none if registered_keys are provided).
+        Models are read with the registry connector unless connector is provided.
+        The sink is flushed at the end, models it could not write stay pending in the report.
+        """
+        report = self._sync_dataset(project_id, dataset_id, max_workers, batch_size, connector, registered_keys)
+        self._flush_pending()
+        return report
+
+    def _sync_dataset(self,
+                      project_id: Optional[str],
+                      dataset_id: Optional[str],
+                      max_workers: int,
+                      batch_size: int,
+                      connector: Optional[BigQueryConnector],
+                      registered_keys: Optional[Set[Tuple[str, str, str, str]]]) -> RegistrationReport:
+        project_id = project_id or self.project_id
+        dataset_id = dataset_id or self.dataset_id
+        connector = connector or self.connector
+
+        # Model list is paged by the client iterator
+        listed_models = {
+            model.model_id: model.created.strftime('%Y-%m-%d')
+            for model in connector.list_models(f"{project_id}.{dataset_id}")
+            if model.model_type in ModelNames.SUPPORTED_MODELS
+        }
+
+        if registered_keys is None:
+            registered_keys = self.fetch_registered_keys()
+        new_model_ids = [
+            model_id for model_id, created in listed_models.items()
+            if (project_id, dataset_id, model_id, created) not in registered_keys
+            and (None, None, model_id, created) not in registered_keys
+        ]
+
+        if not new_model_ids:
+            return RegistrationReport()
+        return self.add_models(new_model_ids, project_id, dataset_id, max_workers, batch_size, connector)
+
+    def scan(self,
+             datasets: List[str],
+             locations: Optional[Dict[str, str]] = None,
+             max_workers: int = 16,
+             max_datasets_per_project: int = 2,
+             max_calls_per_project: int = 32,
+             workers_per_dataset: int = 4,
+             batch_size: int = 500) -> Dict[str, RegistrationReport]:
+        """
+        Sync many datasets, given as "project.dataset", across projects and locations into this registry.
+        Datasets are synced concurrently on max_workers threads, at most max_datasets_per_project
+        at a time per project. Each project gets its own connector, with a pooled client bound to
+        the project and location, and its own transport, so quota errors of one project throttle
+        only that project's max_calls_per_project concurrent calls. Locations map a dataset
+        (or a whole project) to its location, missing ones are looked up. Registered models are
+        fetched once for the whole scan and the sink is flushed once after all datasets. Returns a report
+        per dataset, a dataset that could not be listed is reported as a failure of its own id.
+        """
+        locations = locations or {}
+        self.fetch_schema()
+        registered_keys = self.fetch_registered_keys()
+
+        # Datasets queued per project, each project is worked by up to max_datasets_per_project lanes
+        queues: Dict[str, deque] = {}
+        for dataset in datasets:
+            queues.setdefault(dataset.split(".")[0], deque()).append(dataset)
+
+        project_transports = {
+            project_id: Transport(pool_size=self.connector.transport.pool_size,
+                                  limiter=AdaptiveLimiter(maximum=max_calls_per_project))
+            for project_id in queues
+        }
+
+        def sync(dataset: str) -> RegistrationReport:
+            project_id, dataset_id = dataset.split(".")
+            location = locations.get(dataset) or locations.get(project_id)
+            if location is None:
+                location = self.connector.get_dataset(dataset).location
+
+            # Permissions are checked per project, results are cached process-wide
+            connector = BigQueryConnector(
+                permission_check="skip" if self.connector.permission_check == "skip" else "lazy",
+                use_storage_api=self.connector.use_storage_api,
+                cache=self.connector.cache,
+                instrumentation=self.connector.instrumentation,
+                transport=project_transports[project_id],
+                governor=self.connector.governor,
+                project_id=project_id,
+                location=location,
+                backend=self.connector.backend,
+            )
+            return self._sync_dataset(project_id, dataset_id, workers_per_dataset, batch_size,
+                                      connector, registered_keys)
+
+        reports = {}
+
+        def run_lane(project_id: str) -> None:
+            # A lane syncs datasets of its project one by one, workers never wait on a busy project
+            while True:
+                try:
+                    dataset = queues[project_id].popleft()
+                except IndexError:
+                    return
+                try:
+                    reports[dataset] = sync(dataset)
+                except Exception as error:
+                    reports[dataset] = RegistrationReport()
+                    reports[dataset].add_failure(dataset, error)
+
+        # First lanes of all projects are started before second ones, so projects progress side by side
+        lanes = [
+            project_id
+            for lane in range(max_datasets_per_project)
+            for project_id, queue in queues.items() if lane < len(queue)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in [submit_in_context(executor, run_lane, project_id) for project_id in lanes]:
+                future.result()
+
+        self._flush_pending()
+        return {dataset: reports[dataset] for dataset in datasets}
+
+    def _flush_pending(self) -> None:
+        """Flush the sink after a sync, a failed flush leaves models pending in their reports."""
+        try:
+            self.flush()
+        except Exception as error:
+            print(f"Warning: {error}")
+
+    def fetch_registered_keys(self) -> Set[Tuple[str, str, str, str]]:
+        """
+        Fetch (project_id, dataset_id, model_name, created) keys of all models already in the registry.
+        Project and dataset are None for registries without these columns.
+        """
+        if self.has_field("project_id"):
+            location_columns = "project_id, dataset_id"
+        else:
+            location_columns = "CAST(NULL AS STRING) AS project_id, CAST(NULL AS STRING) AS dataset_id"
+
+        registered_sql = f"""
+            SELECT DISTINCT {location_columns}, model_name, CAST(created AS STRING) AS created
+            FROM `{self.full_table_id}`
+        """
+        table = self.connector.query_arrow(registered_sql)
+        return set(zip(*(table.column(column).to_pylist() for column in RegistrySchema.key_fields)))
+
+    def key_fields(self) -> List[str]:
+        """Columns identifying a registered model, registries without project_id and dataset_id use the rest."""
+        return [field for field in RegistrySchema.key_fields if self.has_field(field)]
+
+    def compact(self) -> int:
+        """
+        Remove duplicate registrations, keeping one row per model key, see key_fields(). The table is rewritten
+        with its partitioning and clustering, so compaction should not run concurrently with writes.
+        Returns number of removed rows.
+        """
+        table = self.connector.get_table(self.full_table_id)
+        num_rows_before = table.num_rows
+
+        # CREATE OR REPLACE drops table options not declared in the statement, keep partitioning and clustering
+        table_options = ""
+        if table.time_partitioning is not None and table.time_partitioning.field is not None:
+            field = table.time_partitioning.field
+            partition_type = table.time_partitioning.type_
+            field_type = {schema_field.name: schema_field.field_type for schema_field in table.schema}[field]
+            if partition_type == "DAY" and field_type == "DATE":
+                table_options += f"PARTITION BY `{field}`\n"
+            else:
+                truncate = "DATE_TRUNC" if field_type == "DATE" else f"{field_type}_TRUNC"
+                table_options += f"PARTITION BY {truncate}(`{field}`, {partition_type})\n"
+        if table.clustering_fields:
+            table_options += f"CLUSTER BY {', '.join(f'`{field}`' for field in table.clustering_fields)}\n"
+
+        key_columns = ", ".join(f"`{column}`" for column in self.key_fields())
+        compact_sql = f"""
+            CREATE OR REPLACE TABLE `{self.full_table_id}`
+            {table_options}
+            AS
+            SELECT *
+            FROM `{self.full_table_id}`
+            WHERE TRUE
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY {key_columns}) = 1
+        """
+        self.connector.execute(compact_sql)
+        self.invalidate_schema()
+
+        num_removed = num_rows_before - self.connector.get_table(self.full_table_id).num_rows
+        print(f"Table: {self.full_table_id} compacted, {num_removed} duplicate rows removed.")
+        return num_removed
+
+    def fetch_hyperparameter_names(self, refresh: bool = False) -> Dict[str, bool]:
+        """
+        Fetch names of hyperparameters present in the registry, mapped to whether they hold float values
+        (otherwise value_string is used). Names are cached for schema_ttl seconds, refresh=True refetches them.
+        """
+        if not refresh and self._hyperparam_types is not None \
+                and time.monotonic() - self._hyperparams_checked_at < self.schema_ttl:
+            return self._hyperparam_types
+
+        hyperparams_sql = f"""
+            SELECT hyperparam.name, LOGICAL_OR(hyperparam.value_float IS NOT NULL) AS is_float
+            FROM `{self.full_table_id}`, UNNEST(hyperparams) AS hyperparam
+            WHERE hyperparam.name IS NOT NULL
+            GROUP BY hyperparam.name
+        """
+        table = self.connector.query_arrow(hyperparams_sql)
+
+        self._hyperparam_types = dict(zip(table.column("name").to_pylist(), table.column("is_float").to_pylist()))
+        self._hyperparams_checked_at = time.monotonic()
+        return self._hyperparam_types
+
+    def search(self,
+               filters: Optional[Dict[str, Any]] = None,
+               metrics: Optional[List[str]] = None,
+               hyperparams: Union[List[str], Literal["all"], None] = None,
+               order_by: Optional[str] = None,
+               ascending: bool = False,
+               limit: Optional[int] = None,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Search registered models, returning one row per registered model with requested columns only.
+        Columns selects top-level registry columns (all by default), eval metrics and hyperparameters
+        are pivoted into columns of their own name. Filters map column names to a value, or to an
+        (operator, value) tuple with one of search_operators. Filters, ordering and limit are pushed down
+        to BigQuery, e.g. top 10 regressors by r2Score:
+
+        registry.search({"type": "BOOSTED_TREE_REGRESSOR"}, metrics=["r2Score"], order_by="r2Score", limit=10)
+        """
+        scalar_columns = [
+            field.name for field in self.fetch_schema() if field.field_type != "RECORD" and field.mode != "REPEATED"
+        ]
+        columns = scalar_columns if columns is None else columns
+        for column in columns:
+            if column not in scalar_columns:
+                raise ValueError(f"Column {column} is not a top-level registry column.")
+
+        params: List[Dict[str, Any]] = []
+
+        def add_param(value: Any) -> str:
+            name = f"param_{len(params)}"
+            params.append({"name": name, "type": self._query_parameter_type(value), "value": value})
+            return f"@{name}"
+
+        projection = [f"`{column}`" for column in columns]
+        pivoted_columns = []
+
+        # Pivot eval metrics, a correlated subquery per metric avoids a join of unnested rows
+        if metrics:
+            if not self.has_field('eval'):
+                raise ValueError("Registry schema does not contain eval metrics.")
+            for metric in metrics:
+                pivoted_columns.append(metric)
+                projection.append(f"""(
+                    SELECT MAX(IF(metric.name = {add_param(metric)}, metric.value, NULL)) FROM UNNEST(eval) AS metric
+                ) AS `{metric}`""")
+
+        # Pivot hyperparameters, value column is picked by the type of values stored for each name
+        if hyperparams:
+            hyperparam_types = self.fetch_hyperparameter_names()
+            if hyperparams == "all":
+                hyperparams = sorted(hyperparam_types)
+
+            for hyperparam in hyperparams:
+                if hyperparam not in hyperparam_types:
+                    raise ValueError(f"Hyperparameter {hyperparam} is not present in the registry.")
+                value_column = "value_float" if hyperparam_types[hyperparam] else "value_string"
+                pivoted_columns.append(hyperparam)
+                projection.append(f"""(
+                    SELECT MAX(IF(hyperparam.name = {add_param(hyperparam)}, hyperparam.{value_column}, NULL)) 
+                    FROM UNNEST(hyperparams) AS hyperparam
+                ) AS `{hyperparam}`""")
+
+        output_columns = columns + pivoted_columns
+        for column in pivoted_columns:
+            if not column.isidentifier():
+                raise ValueError(f"Invalid column name: {column}")
+        if len(set(output_columns)) != len(output_columns):
+            raise ValueError("Requested columns, metrics and hyperparameters must have distinct names.")
+
+        # Filters on registry columns are applied before pivoting, filters on pivoted columns after
+        inner_conditions, outer_conditions = [], []
+        for column, condition in (filters or {}).items():
+            if column in scalar_columns:
+                conditions = inner_conditions
+            elif column in pivoted_columns:
+                conditions = outer_conditions
+            else:
+                raise ValueError(f"Filter column {column} is neither a registry column nor a requested metric or hyperparameter.")
+            conditions.append(self._search_condition(column, condition, add_param))
+
+        if order_by is not None and order_by not in output_columns:
+            raise ValueError(f"Order by column {order_by} is not among requested columns.")
+
+        search_sql = f"""
+            SELECT *
+            FROM (
+                SELECT {", ".join(projection)}
+                FROM `{self.full_table_id}`
+                WHERE {" AND ".join(inner_conditions) or "TRUE"}
+            )
+            WHERE {" AND ".join(outer_conditions) or "TRUE"}
+        """
+        if order_by is not None:
+            search_sql += f"ORDER BY `{order_by}` {'ASC' if ascending else 'DESC'} NULLS LAST\n"
+        if limit is not None:
+            search_sql += f"LIMIT {int(limit)}\n"
+
+        # Registry changes with every insert, results are not served from the query cache
+        return self.connector.parameterized_query(search_sql, params, use_cache=False)
+
+    def _search_condition(self, column: str, condition: Any, add_param) -> str:
+        """Build sql condition of a single search filter, values are passed as query parameters."""
+
+        operator, value = condition if isinstance(condition, tuple) else ("=", condition)
+        operator = operator.upper()
+        if operator not in self.search_operators:
+            raise ValueError(f"Unsupported filter operator {operator}, use one of {self.search_operators}.")
+
+        if value is None and operator in ("=", "!="):
+            return f"`{column}` IS {'NOT ' if operator == '!=' else ''}NULL"
+
+        if operator == "IN":
+            if not isinstance(value, (list, tuple, set)) or not value:
+                raise ValueError(f"Filter operator IN on {column} requires a non-empty list of values.")
+            return f"`{column}` IN UNNEST({add_param(list(value))})"
+
+        return f"`{column}` {operator} {add_param(value)}"
+
+    @staticmethod
+    def _query_parameter_type(value: Any) -> str:
+        """BigQuery type of query parameter value, element type for lists."""
+
+        if isinstance(value, list):
+            value = value[0]
+
+        # bool is a subclass of int and datetime of date, order of checks matters
+        if isinstance(value, bool):
+            return "BOOL"
+        if isinstance(value, int):
+            return "INT64"
+        if isinstance(value, float):
+            return "FLOAT64"
+        if isinstance(value, datetime.datetime):
+            return "TIMESTAMP"
+        if isinstance(value, datetime.date):
+            return "DATE"
+        return "STRING"
+
+    @staticmethod
+    def _run_per_model(executor: ThreadPoolExecutor, function, items, report: RegistrationReport) -> Dict[str, Any]:
+        """
+        Apply function to models (or model ids) on executor. Results are keyed by model id
+        and kept in input order, failed models are recorded in the report.
+        """
+        futures = {}
+        for item in items:
+            model_id = item if isinstance(item, str) else item.model_id
+            futures[model_id] = submit_in_context(executor, function, item)
+
+        results = {}
+        for model_id, future in futures.items():
+            try:
+                results[model_id] = future.result()
+            except Exception as error:
+                report.add_failure(model_id, error)
+        return results
+
+    @staticmethod
+    def _iter_per_model(executor: ThreadPoolExecutor, 
+                        function, 
+                        items, 
+                        report: RegistrationReport, 
+                        lookahead: int) -> Iterator[Tuple[str, Any]]:
+        """
+        Apply function to models on executor, yielding (model id, result) in input order. At most lookahead
+        results are computed ahead of the consumer, failed models are recorded in the report.
+        """
+        pending = deque()
+        for item in items:
+            pending.append((item.model_id, submit_in_context(executor, function, item)))
+            if len(pending) > lookahead:
+                yield from ModelRegistry._completed(pending.popleft(), report)
+
+        while pending:
+            yield from ModelRegistry._completed(pending.popleft(), report)
+
+    @staticmethod
+    def _completed(entry: Tuple[str, Future], report: RegistrationReport) -> Iterator[Tuple[str, Any]]:
+        model_id, future = entry
+        try:
+            yield model_id, future.result()
+        except Exception as error:
+            report.add_failure(model_id, error)
+
+    def _build_row(self, model: Union[ModelData, ModelSnapshot]) -> Dict[str, Any]:
+        """Build registry row with model metadata."""
 
         # Create a dict with general model metadata
         model_insert_dict = {
@@ -44,33 +594,135 @@ class ModelRegistry():
             "type": model.model_type,
             "target": model.fetch_target(),
             "tuning": model.tuning,
-            "features": self._process_feature_importance(model, schema),
-            "eval": model.fetch_eval_metrics(),
-            "trainint_info": model.fetch_training_info(),
+            "features": self._process_feature_importance(model),
+            "eval": self._process_eval_metrics(model),
+            "training": model.fetch_training_info(),
             "hyperparams": model.fetch_hyperparameters(),
         }
 
+        # Registries created before models were keyed by project and dataset lack these columns
+        if self.has_field('project_id'):
+            model_insert_dict["project_id"] = model.project_id
+            model_insert_dict["dataset_id"] = model.dataset_id
+
         # Check schema for tuning trials info columns
-        if any(field.name == 'tuning' for field in schema):
-            model_insert_dict["tuning"] = self._process_trial_info(model, schema)
+        if self.has_field('tunning'):
+            model_insert_dict["tunning"] = self._process_trial_info(model)
 
-        # Insert model metadata into the registry table
-        self.connector.client.insert_rows_json(self.full_table_id, [model_insert_dict])
+        return model_insert_dict
 
-    def fetch_schema(self) -> List[bigquery.SchemaField]:
-        """Fetch model registry schema."""
+    def _insert_rows(self,
+                     rows: Iterable[Tuple[str, Dict[str, Any]]],
+                     report: RegistrationReport,
+                     window_ids: Optional[List[str]] = None) -> None:
+        """
+        Write (model id, row) pairs to the sink and record per-model outcome. Rows are passed on
+        as a generator, the sink consumes them as it fills its requests. Rows held by a buffering
+        sink are recorded as pending until flush(). window_ids lists models of a row generator,
+        so if the sink fails, models it did not get to are failed without building their rows.
+        """
+        model_ids = []
+
+        def sink_rows() -> Iterator[Dict[str, Any]]:
+            for model_id, row in rows:
+                model_ids.append(model_id)
+                yield row
+
+        try:
+            errors = self.sink.write(sink_rows())
 
-        if not self._check_if_table_exists():
-            raise NameError(f"Table: {self.full_table_id} does not exist.")
+        except Exception as error:
+            # Rows the sink did not get to are failed as well, without building them
+            if window_ids is None:
+                remaining = [model_id for model_id, _ in rows]
+            else:
+                written = set(model_ids)
+                remaining = [model_id for model_id in window_ids
+                             if model_id not in written and model_id not in report.failed]
+                if hasattr(rows, "close"):
+                    rows.close()
 
-        table = self.connector.client.get_table(self.full_table_id)
-        return table.schema
+            for model_id in model_ids + remaining:
+                report.add_failure(model_id, error)
+            return
+
+        # Insert errors are reported per row index
+        failed_rows = {error["index"]: error["errors"] for error in errors}
+        for index, model_id in enumerate(model_ids):
+            if index in failed_rows:
+                report.add_failure(model_id, failed_rows[index])
+            elif self.sink.buffered:
+                report.add_pending(model_id)
+            else:
+                report.add_success(model_id)
+
+        if report.pending:
+            with self._pending_lock:
+                if not any(pending is report for pending in self._pending_reports):
+                    self._pending_reports.append(report)
+
+    def fetch_schema(self, refresh: bool = False) -> List[bigquery.SchemaField]:
+        """
+        Fetch model registry schema. Schema is cached and revalidated against table etag
+        once schema_ttl seconds have passed, refresh=True forces revalidation.
+        """
+        with self._schema_lock:
+            if not refresh and self._schema is not None \
+                    and time.monotonic() - self._schema_checked_at < self.schema_ttl:
+                return self._schema
+
+            try:
+                table = self.connector.get_table(self.full_table_id)
+            except NotFound:
+                raise NameError(f"Table: {self.full_table_id} does not exist.")
+
+            # Rebuild field index only if table was modified
+            if self._schema is None or table.etag != self._schema_etag:
+                self._schema = table.schema
+                self._schema_index = self._index_schema(table.schema)
+                self._schema_etag = table.etag
+
+            self._schema_checked_at = time.monotonic()
+            return self._schema
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summary of API calls, query job costs and inserts recorded by the registry connector,
+        with retry counters and current concurrency limit of its transport, and byte budgets of its governor.
+        """
+        stats = {**self.connector.instrumentation.stats(), "transport": self.connector.transport.stats()}
+        if self.connector.governor is not None:
+            stats["governor"] = self.connector.governor.stats()
+        return stats
+
+    def invalidate_schema(self) -> None:
+        """Drop cached schema, next access fetches it again."""
+        with self._schema_lock:
+            self._schema = None
+            self._schema_index = frozenset()
+            self._schema_etag = None
+
+    def has_field(self, field_path: str) -> bool:
+        """Check if registry schema contains a field, nested fields use dot notation e.g. 'features.importance_gain'."""
+        self.fetch_schema()
+        return field_path in self._schema_index
+
+    @staticmethod
+    def _index_schema(fields: List[bigquery.SchemaField], prefix: str = "") -> FrozenSet[str]:
+        """Collect paths of all schema fields, including nested ones."""
+
+        paths = set()
+        for field in fields:
+            path = f"{prefix}{field.name}"
+            paths.add(path)
+            paths.update(ModelRegistry._index_schema(field.fields, prefix=f"{path}."))
+        return frozenset(paths)
     
     def _check_if_table_exists(self) -> bool:
         """Check if model registry exists."""
 
         try:
-            self.connector.client.get_table(self.full_table_id)
+            self.connector.get_table(self.full_table_id)
             return True
         
         except NotFound: return False
@@ -88,21 +740,30 @@ class ModelRegistry():
         # Return dummy eval metrics dict with None values for tuning models
         return [{"name": None, "value": None}]
 
-    def _process_trial_info(self, model: ModelData, schema: List[bigquery.SchemaField]) -> Dict[str, float]:
+    def _process_trial_info(self, model: ModelData) -> Dict[str, float]:
         """Process trial info to fit BigQuery schema."""
 
+        # Registries created before trial_id was added to the schema keep unpivoted trials without it
+        has_trial_id = self.has_field('tunning.trial_id')
+
         # Logic to determine if trial info can be calculated
         if model.tuning:
-            return model.fetch_trial_info()
+            trials = model.fetch_trial_info()
+            if has_trial_id:
+                return trials
+            return [{key: value for key, value in trial.items() if key != "trial_id"} for trial in trials]
         
         # if schema includes hyperparameter tuning columns, but model is not tuned
-        return [{"name": None, "value_string": None, 'value_float': None}]
+        dummy_trial = {"name": None, "value_string": None, 'value_float': None}
+        if has_trial_id:
+            dummy_trial["trial_id"] = None
+        return [dummy_trial]
 
-    def _process_feature_importance(self, model: ModelData, schema: List[bigquery.SchemaField]):
+    def _process_feature_importance(self, model: ModelData):
         """Process feature importance to fit BigQuery schema."""
 
         # Check schema for feature importance columns
-        check_if_importance_column = any(field.name == 'features.importance' for field in schema)
+        check_if_importance_column = self.has_field('features.importance_weight')
 
         # Cech if model is tree-based
         check_if_tree_model = model.model_type in ModelNames.TREE_MODELS
@@ -0,0 +1,191 @@
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Results are DataFrames, pandas itself is never needed to manage them
+if TYPE_CHECKING:
+    import pandas as pd
+
+# String literals, quoted identifiers and comments, kept verbatim by normalize_sql
+_VERBATIM = re.compile("(" + "|".join([
+    r"'''.*?'''",
+    r'""".*?"""',
+    r"'(?:\\.|[^'\\])*'",
+    r'"(?:\\.|[^"\\])*"',
+    r"`(?:\\.|[^`\\])*`",
+    r"--[^\n]*\n?",
+    r"#[^\n]*\n?",
+    r"/\*.*?\*/",
+]) + ")", re.DOTALL)
+
+
+class QueryCache():
+    """
+    Content-addressed cache of query results, keyed by normalized sql and query parameters.
+    Results are kept in a bounded in-memory LRU (max_entries, max_bytes) with per-entry TTL,
+    and optionally in a Parquet-backed disk tier under disk_path. Cached DataFrames are shared,
+    callers should not modify them in place.
+    """
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 max_bytes: int = 256 * 1024 ** 2,
+                 ttl: Optional[float] = 3600,
+                 disk_path: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_path = disk_path
+
+        # key -> (normalized sql, expiry timestamp, size in bytes, result)
+        self._entries: "OrderedDict[str, Tuple[str, float, int, pd.DataFrame]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if disk_path is not None:
+            os.makedirs(disk_path, exist_ok=True)
+
+    @staticmethod
+    def normalize_sql(sql: str) -> str:
+        """
+        Collapse whitespace outside string literals, quoted identifiers and comments,
+        so formatting differences map to the same entry but different literal values do not.
+        """
+        parts = _VERBATIM.split(sql)
+        # Split alternates code and verbatim parts, starting with code
+        return "".join(part if index % 2 else re.sub(r"\s+", " ", part) for index, part in enumerate(parts)).strip()
+
+    def key(self, sql: str, params: Optional[List[Dict[str, object]]] = None) -> str:
+        """Cache key of sql with its query parameters."""
+        params_key = sorted((param["name"], param["type"], repr(param["value"])) for param in params or [])
+        content = repr((self.normalize_sql(sql), params_key))
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional["pd.DataFrame"]:
+        """
+        Return cached result, None if missing or expired. Expired entries are kept until replaced
+        or evicted, with allow_expired they are returned, e.g. as a fallback when the query cannot be run.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (allow_expired or entry[1] > time.time()):
+                self._entries.move_to_end(key)
+                return entry[3]
+
+        if self.disk_path is None:
+            return None
+        return self._get_from_disk(key, allow_expired)
+
+    def put(self, key: str, sql: str, result: "pd.DataFrame", ttl: Optional[float] = None) -> None:
+        """Store query result, ttl overrides default TTL of the cache for this entry."""
+
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl is not None else float("inf")
+        size = int(result.memory_usage(deep=True).sum())
+
+        if size <= self.max_bytes:
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (self.normalize_sql(sql), expires, size, result)
+                self._size += size
+                self._evict()
+
+        if self.disk_path is not None:
+            self._put_to_disk(key, sql, result, expires)
+
+    def invalidate(self, key: str) -> None:
+        """Drop single entry from all tiers."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+        if self.disk_path is not None and os.path.exists(self._disk_file(key)):
+            os.remove(self._disk_file(key))
+
+    def invalidate_matching(self, text: str) -> None:
+        """Drop entries whose sql contains text, e.g. a full model id."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if text in entry[0]]
+            for key in keys:
+                self._remove(key)
+
+        if self.disk_path is None:
+            return
+
+        import pyarrow.parquet as pq
+        for file_name in os.listdir(self.disk_path):
+            if not file_name.endswith(".parquet"):
+                continue
+            file_path = os.path.join(self.disk_path, file_name)
+            metadata = pq.read_schema(file_path).metadata or {}
+            if text in metadata.get(b"sql", b"").decode("utf-8"):
+                os.remove(file_path)
+
+    def clear(self) -> None:
+        """Drop all entries from all tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+        if self.disk_path is not None:
+            for file_name in os.listdir(self.disk_path):
+                os.remove(os.path.join(self.disk_path, file_name))
+
+    def _remove(self, key: str) -> None:
+        self._size -= self._entries.pop(key)[2]
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until cache fits its limits."""
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.parquet")
+
+    def _put_to_disk(self, key: str, sql: str, result: "pd.DataFrame", expires: float) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"sql": self.normalize_sql(sql).encode("utf-8"),
+            b"expires": repr(expires).encode("utf-8"),
+        })
+
+        # Write to temporary file first, so readers never see a partial file
+        temporary_file = f"{self._disk_file(key)}.{threading.get_ident()}.tmp"
+        pq.write_table(table, temporary_file)
+        os.replace(temporary_file, self._disk_file(key))
+
+    def _get_from_disk(self, key: str, allow_expired: bool = False) -> Optional["pd.DataFrame"]:
+        import pyarrow.parquet as pq
+
+        file_path = self._disk_file(key)
+        try:
+            metadata = pq.read_schema(file_path).metadata or {}
+            if not allow_expired and float(metadata.get(b"expires", b"0")) <= time.time():
+                return None
+
+            result = pq.read_table(file_path).to_pandas()
+
+        except FileNotFoundError:
+            # Missing, or removed by a concurrent invalidation
+            return None
+
+        # Promote to memory tier, keeping original expiry
+        size = int(result.memory_usage(deep=True).sum())
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = (metadata.get(b"sql", b"").decode("utf-8"),
+                                          float(metadata[b"expires"]), size, result)
+                    self._size += size
+                    self._evict()
+        return result
@@ -0,0 +1,46 @@
+from typing import List, Dict, Optional
+
+
+class RegistrationReport():
+    """
+    Collects per-model outcome of a bulk registry operation. Models written to a buffering sink
+    are pending until the sink is flushed.
+    """
+
+    def __init__(self) -> None:
+        self.succeeded: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.pending: List[str] = []
+
+    def add_success(self, model_id: str) -> None:
+        """Mark model as successfully registered."""
+        self.succeeded.append(model_id)
+
+    def add_failure(self, model_id: str, error: object) -> None:
+        """Mark model as failed, keeping the error message."""
+        self.failed[model_id] = str(error)
+
+    def add_pending(self, model_id: str) -> None:
+        """Mark model as buffered by the sink, not written yet."""
+        self.pending.append(model_id)
+
+    def resolve_pending(self, error: Optional[object] = None) -> None:
+        """Mark pending models as succeeded after a flush, or as failed with error."""
+        for model_id in self.pending:
+            if error is None:
+                self.add_success(model_id)
+            else:
+                self.add_failure(model_id, error)
+        self.pending = []
+
+    @property
+    def ok(self) -> bool:
+        """True if every model was registered."""
+        return not self.failed and not self.pending
+
+    def __len__(self) -> int:
+        return len(self.succeeded) + len(self.failed) + len(self.pending)
+
+    def __repr__(self) -> str:
+        return (f"RegistrationReport(succeeded={len(self.succeeded)}, failed={len(self.failed)}, "
+                f"pending={len(self.pending)})")
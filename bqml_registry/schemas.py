@@ -1,4 +1,5 @@
 
+from typing import List, Optional, Literal
 from google.cloud import bigquery
 
 
@@ -6,6 +7,8 @@ class RegistrySchema():
 
     # Registry components
     general_fields = [
+            bigquery.SchemaField("project_id", "STRING"),
+            bigquery.SchemaField("dataset_id", "STRING"),
             bigquery.SchemaField("model_name", "STRING"),
             bigquery.SchemaField("created", "DATE"),
             bigquery.SchemaField("type", "STRING"),
@@ -13,7 +16,9 @@ class RegistrySchema():
             bigquery.SchemaField("tuning", "STRING"),
     ]
     feature_fields = [
-            bigquery.SchemaField("features", "REPEATED")
+            bigquery.SchemaField("features", "RECORD", mode="REPEATED", fields=(
+            bigquery.SchemaField("name", "STRING"),
+            ))
     ]
     feature_importance_fields = [
             bigquery.SchemaField("features", "RECORD", mode="REPEATED", fields=(
@@ -45,19 +50,34 @@ class RegistrySchema():
 
     tunning_fields = [
             bigquery.SchemaField("tunning", "RECORD", mode="REPEATED", fields=(
+            bigquery.SchemaField("trial_id", "INT64"),
             bigquery.SchemaField("name", "STRING"),
             bigquery.SchemaField("value_string", "STRING"),
             bigquery.SchemaField("value_float", "FLOAT64")
             ))
     ]
 
+    # Registered models are identified by these columns, e.g. for upserts and compaction.
+    # Registries created before project_id and dataset_id were added are keyed on the remaining ones
+    key_fields = ("project_id", "dataset_id", "model_name", "created")
+
     def __init__(self, 
                  feature_importance: bool = False,
                  tunning_info: bool = True,
+                 partition_field: Optional[str] = "created",
+                 partition_type: Literal["DAY", "MONTH", "YEAR"] = "MONTH",
+                 clustering_fields: Optional[List[str]] = ("model_name", "type"),
                  ) -> None:
-        
+        """
+        Registry table is partitioned on partition_field and clustered on clustering_fields,
+        so lookups by model name, type or creation date scan only matching blocks.
+        Monthly partitions keep the number of partitions low, set partition_field to None to disable.
+        """
         self.feature_importance = feature_importance
         self.tunning_info = tunning_info
+        self.partition_field = partition_field
+        self.partition_type = partition_type
+        self.clustering_fields = list(clustering_fields) if clustering_fields else []
 
     def build_schema(self) -> list:
         schema = []
@@ -71,7 +91,20 @@ class RegistrySchema():
         schema = schema + self.eval_fields + self.training_info_fields + self.hyperparam_fields
         
         if self.tunning_info:
-            schema.extend(self.tunning_info)
+            schema.extend(self.tunning_fields)
         
         return schema
+
+    def time_partitioning(self) -> Optional[bigquery.TimePartitioning]:
+        if self.partition_field is None:
+            return None
+        return bigquery.TimePartitioning(type_=self.partition_type, field=self.partition_field)
+
+    def build_table(self, table_id: str) -> bigquery.Table:
+        """Registry table definition with schema, partitioning and clustering."""
+
+        table = bigquery.Table(table_id, schema=self.build_schema())
+        table.time_partitioning = self.time_partitioning()
+        table.clustering_fields = self.clustering_fields or None
+        return table
         
@@ -0,0 +1,536 @@
+from typing import List, Dict, Any, Literal, Callable, Optional, Iterable, Iterator, Tuple
+import io
+import json
+import uuid
+import hashlib
+import datetime
+import threading
+from google.cloud import bigquery
+from .exceptions import RegistryWriteError
+
+
+class RegistrySink():
+    """
+    Base class for registry write paths. A sink is attached to a single ModelRegistry, write() takes
+    any iterable of rows (e.g. a generator building them) and returns insert errors in insert_rows_json
+    format: [{"index": int, "errors": list}], indexed by position of the row in the iterable.
+    Buffering sinks write rows only when flushed, their rows are reported as pending until then.
+    """
+
+    # Rows are held by the sink until flush()
+    buffered = False
+
+    def __init__(self) -> None:
+        self.registry = None
+
+    def attach(self, registry) -> None:
+        """Bind sink to the registry it writes to."""
+        self.registry = registry
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Write out buffered rows, no-op for unbuffered sinks."""
+        pass
+
+    @property
+    def _connector(self):
+        return self.registry.connector
+
+
+class StreamingSink(RegistrySink):
+    """
+    Writes rows with legacy streaming inserts (insert_rows_json), rows are visible immediately.
+    Rows are serialized one at a time and sent in requests under max_request_bytes and
+    max_rows_per_request, so only a single request is held in memory. Insert ids are derived
+    from row content, retried requests are deduplicated by BigQuery. A row over max_request_bytes
+    (above the 10MB streaming limit) is written with a load job instead.
+    """
+
+    # Serialized insertId and json keys of each row in the request body
+    row_overhead = 100
+
+    def __init__(self, max_request_bytes: int = 9 * 1024 ** 2, max_rows_per_request: int = 500) -> None:
+        super().__init__()
+        self.max_request_bytes = max_request_bytes
+        self.max_rows_per_request = max_rows_per_request
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        errors = []
+        offset = 0
+        chunks = _chunk_by_size(rows, _serialize_json, self.max_request_bytes, self.max_rows_per_request, self.row_overhead)
+        for chunk in chunks:
+            if len(chunk[0][1]) + self.row_overhead > self.max_request_bytes:
+                errors.extend(self._load_oversized(chunk[0][1], offset))
+            else:
+                errors.extend(self._insert(chunk, offset))
+            offset += len(chunk)
+        return errors
+
+    def _insert(self, chunk: List[Tuple[Dict[str, Any], bytes]], offset: int) -> List[Dict[str, Any]]:
+        """Insert a chunk of rows, errors (including a failed request) are reported per row."""
+
+        rows = [row for row, _ in chunk]
+        row_ids = [hashlib.sha256(serialized).hexdigest() for _, serialized in chunk]
+        num_bytes = sum(len(serialized) for _, serialized in chunk)
+        try:
+            errors = self._connector.insert_rows_json(self.registry.full_table_id, rows, row_ids, num_bytes)
+        except Exception as error:
+            return _request_errors(offset, len(chunk), error)
+        return [{**error, "index": error["index"] + offset} for error in errors]
+
+    def _load_oversized(self, serialized: bytes, index: int) -> List[Dict[str, Any]]:
+        """Write a row too large for streaming inserts with a load job, load jobs accept rows up to 100MB."""
+
+        job_config = bigquery.LoadJobConfig(
+            schema=self.registry.fetch_schema(),
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        )
+        try:
+            self._connector.load_table_from_file(io.BytesIO(serialized), self.registry.full_table_id, job_config, 1)
+        except Exception as error:
+            return _request_errors(index, 1, error)
+        return []
+
+
+class LoadJobSink(RegistrySink):
+    """
+    Buffers rows and writes them with free batch load jobs, once batch_size rows
+    are collected or flush() is called. Rows are sent as newline-delimited JSON or Parquet.
+    Rows of a failed load job are put back into the buffer and retried by the next load.
+    """
+
+    buffered = True
+
+    def __init__(self,
+                 batch_size: int = 10000,
+                 source_format: Literal["NEWLINE_DELIMITED_JSON", "PARQUET"] = "NEWLINE_DELIMITED_JSON") -> None:
+        super().__init__()
+        if source_format not in ("NEWLINE_DELIMITED_JSON", "PARQUET"):
+            raise ValueError(f"Unsupported source format: {source_format}")
+
+        self.batch_size = batch_size
+        self.source_format = source_format
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Rows are built before taking the lock, other writers and flush() do not wait on them
+        rows = list(rows)
+        with self._lock:
+            self._buffer.extend(rows)
+            if len(self._buffer) < self.batch_size:
+                return []
+            rows, self._buffer = self._buffer, []
+
+        # Rows stay buffered (and pending) when the load fails, flush() retries them
+        try:
+            self._load(rows)
+        except Exception as error:
+            self._restore(rows)
+            print(f"Warning: {error}, {len(rows)} rows stay buffered until flush")
+        return []
+
+    def flush(self) -> None:
+        """Load all buffered rows, on failure rows stay buffered and RegistryWriteError names their models."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+
+        if not rows:
+            return
+        try:
+            self._load(rows)
+        except Exception as error:
+            self._restore(rows)
+            model_ids = [row.get("model_name") for row in rows]
+            raise RegistryWriteError(f"{error}, models stay buffered: {model_ids}") from error
+
+    def _restore(self, rows: List[Dict[str, Any]]) -> None:
+        """Put rows of a failed load back in front of the buffer, keeping write order."""
+        with self._lock:
+            self._buffer[:0] = rows
+
+    def _load(self, rows: List[Dict[str, Any]], table_id: Optional[str] = None) -> None:
+        """Run load job appending rows to the registry (or given) table, raise on job errors."""
+
+        schema = self.registry.fetch_schema()
+        job_config = bigquery.LoadJobConfig(
+            schema=schema,
+            source_format=self.source_format,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        )
+
+        if self.source_format == "PARQUET":
+            data = _rows_to_parquet(rows, schema)
+        else:
+            coerced = (_coerce_row(row, schema, str) for row in rows)
+            data = io.BytesIO("\n".join(json.dumps(row) for row in coerced).encode("utf-8"))
+
+        try:
+            self._connector.load_table_from_file(data, table_id or self.registry.full_table_id, job_config, len(rows))
+        except Exception as error:
+            raise RegistryWriteError(f"Load job failed: {error}") from error
+
+
+class MergeSink(LoadJobSink):
+    """
+    Upserts rows: buffered rows are loaded into a staging table and merged into the registry
+    on the model key (project_id, dataset_id, model_name, created), so re-registered models replace their previous row
+    instead of adding a duplicate. Staging tables are deleted after the merge and expire on their own
+    if the merge fails. Requires bigquery.tables.delete permission on the registry dataset.
+    """
+
+    # Staging tables left behind by failed merges are dropped by BigQuery after this many seconds
+    staging_expiration = 3600
+
+    def _load(self, rows: List[Dict[str, Any]], table_id: Optional[str] = None) -> None:
+        # Later rows of the same model replace earlier ones, MERGE requires at most one source row per key
+        key_fields = self.registry.key_fields()
+        latest_rows = {tuple(str(row.get(field)) for field in key_fields): row for row in rows}
+        rows = list(latest_rows.values())
+
+        schema = self.registry.fetch_schema()
+        staging_table_id = f"{self.registry.full_table_id}_staging_{uuid.uuid4().hex[:12]}"
+
+        staging_table = bigquery.Table(staging_table_id, schema=schema)
+        staging_table.expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=self.staging_expiration)
+        self._connector.create_table(staging_table)
+
+        try:
+            super()._load(rows, staging_table_id)
+            self._merge(staging_table_id, schema, rows)
+        finally:
+            self._connector.delete_table(staging_table_id)
+
+    def _merge(self, staging_table_id: str, schema: List[bigquery.SchemaField], rows: List[Dict[str, Any]]) -> None:
+        """Merge staging table into the registry, matched rows are replaced and new rows inserted."""
+
+        key_fields = self.registry.key_fields()
+        key_condition = " AND ".join(f"target.`{field}` = source.`{field}`" for field in key_fields)
+        update_columns = ", ".join(
+            f"`{field.name}` = source.`{field.name}`" for field in schema if field.name not in key_fields
+        )
+
+        # Bounding created on the target side prunes registry partitions the batch cannot match
+        created = [str(row["created"]) for row in rows if row.get("created") is not None]
+        params = []
+        if created:
+            key_condition += " AND target.`created` BETWEEN @min_created AND @max_created"
+            params = [
+                {"name": "min_created", "type": "DATE", "value": datetime.date.fromisoformat(min(created))},
+                {"name": "max_created", "type": "DATE", "value": datetime.date.fromisoformat(max(created))},
+            ]
+
+        merge_sql = f"""
+            MERGE `{self.registry.full_table_id}` AS target
+            USING `{staging_table_id}` AS source
+            ON {key_condition}
+            WHEN MATCHED THEN
+                UPDATE SET {update_columns}
+            WHEN NOT MATCHED THEN
+                INSERT ROW
+        """
+        try:
+            self._connector.execute(merge_sql, params)
+        except Exception as error:
+            raise RegistryWriteError(f"Merge into {self.registry.full_table_id} failed: {error}") from error
+
+
+class StorageWriteSink(RegistrySink):
+    """
+    Writes rows with the BigQuery Storage Write API. In committed mode rows are visible
+    as soon as each append succeeds. In pending mode rows become visible atomically
+    when flush() commits the stream, their models are reported as pending until then.
+    A failed append fails only its own rows.
+    Requires google-cloud-bigquery-storage.
+    """
+
+    # Append requests are limited to 10MB, rows are sent in smaller chunks
+    rows_per_append = 500
+    max_append_bytes = 9 * 1024 ** 2
+
+    def __init__(self, mode: Literal["committed", "pending"] = "committed") -> None:
+        super().__init__()
+        if mode not in ("committed", "pending"):
+            raise ValueError(f"Unsupported stream mode: {mode}")
+
+        self.mode = mode
+        # Rows of pending streams are written only when flush() commits them
+        self.buffered = mode == "pending"
+        self._write_client = None
+        self._stream = None
+        self._append_stream = None
+        self._message_class = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._append_stream is None:
+                self._open_stream()
+            message_class = self._message_class
+
+        schema = self.registry.fetch_schema()
+
+        def serialize(row: Dict[str, Any]) -> bytes:
+            return _row_to_message(row, schema, message_class).SerializeToString()
+
+        # Rows are built and serialized outside the lock, it is held only to send each append
+        errors = []
+        offset = 0
+        for chunk in _chunk_by_size(rows, serialize, self.max_append_bytes, self.rows_per_append):
+            errors.extend(self._append(chunk, offset))
+            offset += len(chunk)
+        return errors
+
+    def _append(self, chunk: List[Tuple[Dict[str, Any], bytes]], offset: int) -> List[Dict[str, Any]]:
+        """Append a chunk of serialized rows, a failed append is reported as errors of its rows only."""
+        from google.cloud.bigquery_storage_v1 import types
+
+        proto_rows = types.ProtoRows()
+        proto_rows.serialized_rows.extend(serialized for _, serialized in chunk)
+        num_bytes = sum(len(serialized) for _, serialized in chunk)
+
+        proto_data = types.AppendRowsRequest.ProtoData()
+        proto_data.rows = proto_rows
+        request = types.AppendRowsRequest()
+        request.proto_rows = proto_data
+
+        with self._lock:
+            if self._append_stream is None:
+                self._open_stream()
+            request.offset = self._offset
+
+            try:
+                with self._connector.instrumentation.timed("append_rows"):
+                    self._append_stream.send(request).result()
+            except Exception as error:
+                # Rows of earlier appends are committed already, later chunks go to a new stream
+                if self.mode == "committed":
+                    self._discard_stream()
+                return _request_errors(offset, len(chunk), error)
+
+            self._offset += len(chunk)
+
+        self._connector.instrumentation.record_insert(len(chunk), num_bytes)
+        return []
+
+    def flush(self) -> None:
+        from google.cloud.bigquery_storage_v1 import types
+
+        with self._lock:
+            if self._append_stream is None:
+                return
+
+            self._append_stream.close()
+            self._write_client.finalize_write_stream(name=self._stream.name)
+
+            # Pending streams become visible only after commit
+            if self.mode == "pending":
+                request = types.BatchCommitWriteStreamsRequest(
+                    parent=self._table_path(), write_streams=[self._stream.name]
+                )
+                response = self._write_client.batch_commit_write_streams(request)
+                if response.stream_errors:
+                    raise RegistryWriteError(f"Commit of {self._stream.name} failed: {response.stream_errors}")
+
+            self._stream, self._append_stream, self._offset = None, None, 0
+
+    def _discard_stream(self) -> None:
+        """Drop a broken append connection, the next append opens a new stream."""
+        try:
+            self._append_stream.close()
+        except Exception:
+            pass
+        self._stream, self._append_stream, self._offset = None, None, 0
+
+    def _table_path(self) -> str:
+        project_id, dataset_id, table_id = self.registry.full_table_id.split(".")
+        return f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
+
+    def _open_stream(self) -> None:
+        """Create write stream and bidirectional append connection for the registry table."""
+        from google.cloud import bigquery_storage_v1
+        from google.cloud.bigquery_storage_v1 import types, writer
+
+        if self._write_client is None:
+            self._write_client = bigquery_storage_v1.BigQueryWriteClient(credentials=self._connector.credentials)
+
+        stream_type = types.WriteStream.Type.PENDING if self.mode == "pending" else types.WriteStream.Type.COMMITTED
+        self._stream = self._write_client.create_write_stream(
+            parent=self._table_path(), write_stream=types.WriteStream(type_=stream_type)
+        )
+
+        descriptor_proto = _schema_to_descriptor(self.registry.fetch_schema())
+        self._message_class = _descriptor_to_class(descriptor_proto)
+
+        proto_schema = types.ProtoSchema()
+        proto_schema.proto_descriptor = descriptor_proto
+        proto_data = types.AppendRowsRequest.ProtoData()
+        proto_data.writer_schema = proto_schema
+
+        request_template = types.AppendRowsRequest()
+        request_template.write_stream = self._stream.name
+        request_template.proto_rows = proto_data
+        self._append_stream = writer.AppendRowsStream(self._write_client, request_template)
+
+
+def _serialize_json(row: Dict[str, Any]) -> bytes:
+    return json.dumps(row, default=str).encode("utf-8")
+
+
+def _chunk_by_size(rows: Iterable[Dict[str, Any]],
+                   serialize: Callable[[Dict[str, Any]], bytes],
+                   max_bytes: int,
+                   max_rows: int,
+                   row_overhead: int = 0) -> Iterator[List[Tuple[Dict[str, Any], bytes]]]:
+    """
+    Group rows with their serialized form into chunks under max_bytes and max_rows, rows are consumed
+    (and built, for generators) only as chunks are requested. A row over max_bytes forms a chunk of its own.
+    """
+    chunk, chunk_bytes = [], 0
+    for row in rows:
+        serialized = serialize(row)
+        row_bytes = len(serialized) + row_overhead
+        if chunk and (chunk_bytes + row_bytes > max_bytes or len(chunk) >= max_rows):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append((row, serialized))
+        chunk_bytes += row_bytes
+    if chunk:
+        yield chunk
+
+
+def _request_errors(offset: int, num_rows: int, error: Exception) -> List[Dict[str, Any]]:
+    """Per-row insert errors of rows sent in a failed request."""
+    return [
+        {"index": offset + index, "errors": [{"reason": "requestFailed", "message": str(error)}]}
+        for index in range(num_rows)
+    ]
+
+
+def _coerce_row(row: Dict[str, Any],
+                schema: List[bigquery.SchemaField],
+                convert_date: Callable[[str], Any]) -> Dict[str, Any]:
+    """Coerce row values to schema types, fields missing from schema are dropped."""
+
+    coerced = {}
+    for field in schema:
+        if field.name not in row:
+            continue
+
+        value = row[field.name]
+        if field.mode == "REPEATED":
+            coerced[field.name] = [_coerce_value(item, field, convert_date) for item in value or []]
+        else:
+            coerced[field.name] = _coerce_value(value, field, convert_date)
+    return coerced
+
+
+def _coerce_value(value: Any, field: bigquery.SchemaField, convert_date: Callable[[str], Any]) -> Any:
+    if value is None:
+        return None
+    if field.field_type in ("RECORD", "STRUCT"):
+        return _coerce_row(value, field.fields, convert_date)
+    if field.field_type == "DATE":
+        return convert_date(str(value))
+    if field.field_type == "STRING":
+        return value if isinstance(value, str) else str(value)
+    if field.field_type in ("FLOAT", "FLOAT64"):
+        return float(value)
+    if field.field_type in ("INTEGER", "INT64"):
+        return int(value)
+    if field.field_type in ("BOOLEAN", "BOOL"):
+        return bool(value)
+    return value
+
+
+def _rows_to_parquet(rows: List[Dict[str, Any]], schema: List[bigquery.SchemaField]) -> io.BytesIO:
+    """Serialize rows into an in-memory Parquet file matching registry schema."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet load jobs require pyarrow, install it with: pip install pyarrow")
+
+    def to_arrow_type(field: bigquery.SchemaField):
+        if field.field_type in ("RECORD", "STRUCT"):
+            arrow_type = pa.struct([pa.field(sub.name, to_arrow_type(sub)) for sub in field.fields])
+        else:
+            arrow_type = {
+                "STRING": pa.string(), "DATE": pa.date32(), "FLOAT": pa.float64(), "FLOAT64": pa.float64(),
+                "INTEGER": pa.int64(), "INT64": pa.int64(), "BOOLEAN": pa.bool_(), "BOOL": pa.bool_(),
+            }[field.field_type]
+        return pa.list_(arrow_type) if field.mode == "REPEATED" else arrow_type
+
+    arrow_schema = pa.schema([pa.field(field.name, to_arrow_type(field)) for field in schema])
+    coerced = [_coerce_row(row, schema, datetime.date.fromisoformat) for row in rows]
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(coerced, schema=arrow_schema), buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _schema_to_descriptor(schema: List[bigquery.SchemaField], name: str = "RegistryRow"):
+    """Build self-contained proto DescriptorProto for registry schema, records become nested types."""
+    from google.protobuf import descriptor_pb2
+
+    proto_types = {
+        "STRING": descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+        "DATE": descriptor_pb2.FieldDescriptorProto.TYPE_INT32,
+        "FLOAT": descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+        "FLOAT64": descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+        "INTEGER": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+        "INT64": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+        "BOOLEAN": descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
+        "BOOL": descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
+    }
+
+    descriptor = descriptor_pb2.DescriptorProto(name=name)
+    for number, field in enumerate(schema, start=1):
+        proto_field = descriptor.field.add(name=field.name, number=number)
+        proto_field.label = (descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED if field.mode == "REPEATED"
+                             else descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL)
+
+        if field.field_type in ("RECORD", "STRUCT"):
+            nested_name = f"{field.name.capitalize()}Record"
+            descriptor.nested_type.append(_schema_to_descriptor(field.fields, nested_name))
+            proto_field.type = descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE
+            proto_field.type_name = nested_name
+        else:
+            proto_field.type = proto_types[field.field_type]
+
+    return descriptor
+
+
+def _descriptor_to_class(descriptor_proto):
+    """Create message class for dynamically built DescriptorProto."""
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+    file_proto = descriptor_pb2.FileDescriptorProto(name=f"{descriptor_proto.name}.proto")
+    file_proto.message_type.append(descriptor_proto)
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName(descriptor_proto.name))
+
+
+def _row_to_message(row: Dict[str, Any], schema: List[bigquery.SchemaField], message_class):
+    """Convert registry row into proto message, dates are encoded as days since epoch."""
+    from google.protobuf import json_format
+
+    epoch = datetime.date(1970, 1, 1)
+    coerced = _coerce_row(row, schema, lambda value: (datetime.date.fromisoformat(value) - epoch).days)
+    return json_format.ParseDict(_drop_nulls(coerced), message_class())
+
+
+def _drop_nulls(value: Any) -> Any:
+    """Proto messages have no nulls, unset fields are written as NULL by BigQuery."""
+    if isinstance(value, dict):
+        return {key: _drop_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_drop_nulls(item) for item in value]
+    return value
@@ -0,0 +1,216 @@
+from typing import List, Dict, Union, Optional, Any, Tuple, Iterable
+import sys
+import math
+from array import array
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _names(values: Iterable[Optional[str]]) -> Tuple[Optional[str], ...]:
+    """Tuple of interned names, fleets of models share the same few hundred names."""
+    return tuple(_intern(value) for value in values)
+
+
+def _floats(values: Iterable[Optional[float]]) -> array:
+    """Typed array of floats, missing values are stored as NaN."""
+    return array('d', (math.nan if value is None else float(value) for value in values))
+
+
+def _float_or_none(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class ModelSnapshot():
+    """
+    Detached, compact copy of fetched ModelData sections. Names are interned and numeric values
+    are kept in typed arrays, the snapshot holds no client or model resource, so it can be pickled
+    to worker processes and caches. Fetch methods return the same records as ModelData, so
+    ModelRegistry registers snapshots like models. Sections not captured raise ValueError.
+    """
+
+    __slots__ = (
+        "project_id", "dataset_id", "model_id", "created", "model_type", "target", "tuning",
+        "feature_names", "importance_names", "importance",
+        "hyperparam_names", "hyperparam_strings", "hyperparam_floats",
+        "eval_names", "eval_values", "training_names", "training_values",
+        "trial_ids", "trial_names", "trial_strings", "trial_floats",
+    )
+
+    def __init__(self,
+                 project_id: str,
+                 dataset_id: str,
+                 model_id: str,
+                 created: str,
+                 model_type: str,
+                 target: Optional[str] = None,
+                 tuning: bool = False) -> None:
+        self.project_id = _intern(project_id)
+        self.dataset_id = _intern(dataset_id)
+        self.model_id = model_id
+        self.created = _intern(created)
+        self.model_type = _intern(model_type)
+        self.target = _intern(target)
+        self.tuning = tuning
+
+        # Sections are None until captured
+        self.feature_names: Optional[Tuple[str, ...]] = None
+        self.importance_names: Optional[Tuple[str, ...]] = None
+        # Interleaved (importance_weight, importance_gain, importance_cover) per feature
+        self.importance: Optional[array] = None
+        self.hyperparam_names: Optional[Tuple[str, ...]] = None
+        self.hyperparam_strings: Optional[Tuple[Optional[str], ...]] = None
+        self.hyperparam_floats: Optional[array] = None
+        self.eval_names: Optional[Tuple[str, ...]] = None
+        self.eval_values: Optional[array] = None
+        self.training_names: Optional[Tuple[str, ...]] = None
+        self.training_values: Optional[array] = None
+        self.trial_ids: Optional[Tuple[Optional[int], ...]] = None
+        self.trial_names: Optional[Tuple[Optional[str], ...]] = None
+        self.trial_strings: Optional[Tuple[Optional[str], ...]] = None
+        self.trial_floats: Optional[array] = None
+
+    @property
+    def fully_model_id(self) -> str:
+        return f"{self.project_id}.{self.dataset_id}.{self.model_id}"
+
+    @classmethod
+    def from_model_data(cls, model, feature_importance: bool = True, trial_info: bool = True) -> "ModelSnapshot":
+        """
+        Capture sections of a ModelData, fetching them if needed. Sections not applicable to the model
+        (e.g. eval metrics of tuned models) are left out, feature importance and trial info can be skipped.
+        """
+        snapshot = cls(model.project_id, model.dataset_id, model.model_id, model.created, model.model_type,
+                       tuning=model.tuning)
+
+        def fetch(method: str) -> Optional[Any]:
+            try:
+                return getattr(model, method)()
+            except (ValueError, NotImplementedError, KeyError, IndexError):
+                return None
+
+        snapshot.target = _intern(fetch("fetch_target"))
+        snapshot.set_feature_names(fetch("fetch_feature_names"))
+        snapshot.set_hyperparameters(fetch("fetch_hyperparameters"))
+        snapshot.set_eval_metrics(fetch("fetch_eval_metrics"))
+        snapshot.set_training_info(fetch("fetch_training_info"))
+        if feature_importance:
+            snapshot.set_feature_importance(fetch("fetch_feature_importance"))
+        if trial_info and model.tuning:
+            snapshot.set_trial_info(fetch("fetch_trial_info"))
+        return snapshot
+
+    @classmethod
+    def batch_from_model_data(cls,
+                              models: list,
+                              feature_importance: bool = True,
+                              trial_info: bool = True,
+                              chunk_size: int = 50,
+                              max_workers: int = 4) -> List["ModelSnapshot"]:
+        """Capture many models, ML.* functions run as batched jobs, see ModelData.batch_fetch."""
+        from .model_data import ModelData
+
+        ModelData.batch_fetch(models, feature_importance, trial_info, chunk_size, max_workers)
+        return [cls.from_model_data(model, feature_importance, trial_info) for model in models]
+
+    def set_feature_names(self, records: Optional[List[Dict[str, str]]]) -> None:
+        if records is not None:
+            self.feature_names = _names(record["name"] for record in records)
+
+    def set_feature_importance(self, records: Optional[List[Dict[str, Union[str, float]]]]) -> None:
+        if records is None:
+            return
+        self.importance_names = _names(record["name"] for record in records)
+        self.importance = _floats(
+            record.get(key) for record in records for key in ("importance_weight", "importance_gain", "importance_cover")
+        )
+
+    def set_hyperparameters(self, records: Optional[List[Dict[str, Union[str, float]]]]) -> None:
+        if records is None:
+            return
+        self.hyperparam_names = _names(record["name"] for record in records)
+        self.hyperparam_strings = _names(record["value_string"] for record in records)
+        self.hyperparam_floats = _floats(record["value_float"] for record in records)
+
+    def set_eval_metrics(self, records: Optional[List[Dict[str, float]]]) -> None:
+        if records is None:
+            return
+        self.eval_names = _names(record["name"] for record in records)
+        self.eval_values = _floats(record["value"] for record in records)
+
+    def set_training_info(self, records: Optional[List[Dict[str, float]]]) -> None:
+        if records is None:
+            return
+        self.training_names = _names(record["name"] for record in records)
+        self.training_values = _floats(record["value"] for record in records)
+
+    def set_trial_info(self, records: Optional[List[Dict[str, Union[str, float]]]]) -> None:
+        if records is None:
+            return
+        self.trial_ids = tuple(None if record.get("trial_id") is None else int(record["trial_id"]) for record in records)
+        self.trial_names = _names(record["name"] for record in records)
+        self.trial_strings = _names(record["value_string"] for record in records)
+        self.trial_floats = _floats(record["value_float"] for record in records)
+
+    def _require(self, section: Optional[Any], name: str) -> None:
+        if section is None:
+            raise ValueError(f"Section {name} was not captured in snapshot of {self.fully_model_id}.")
+
+    # Fetch methods mirror ModelData, records are rebuilt on every call
+
+    def fetch_target(self) -> str:
+        self._require(self.target, "target")
+        return self.target
+
+    def fetch_feature_names(self) -> List[Dict[str, str]]:
+        self._require(self.feature_names, "feature names")
+        return [{"name": name} for name in self.feature_names]
+
+    def fetch_feature_importance(self) -> List[Dict[str, Union[str, float]]]:
+        self._require(self.importance, "feature importance")
+        values = self.importance
+        return [
+            {"name": name, "importance_weight": _float_or_none(values[3 * index]),
+             "importance_gain": _float_or_none(values[3 * index + 1]),
+             "importance_cover": _float_or_none(values[3 * index + 2])}
+            for index, name in enumerate(self.importance_names)
+        ]
+
+    def fetch_hyperparameters(self) -> List[Dict[str, Union[str, float]]]:
+        self._require(self.hyperparam_names, "hyperparameters")
+        return [
+            {"name": name, "value_string": value_string, "value_float": _float_or_none(value_float)}
+            for name, value_string, value_float in zip(self.hyperparam_names, self.hyperparam_strings, self.hyperparam_floats)
+        ]
+
+    def fetch_eval_metrics(self) -> List[Dict[str, float]]:
+        self._require(self.eval_names, "eval metrics")
+        return [{"name": name, "value": _float_or_none(value)} for name, value in zip(self.eval_names, self.eval_values)]
+
+    def fetch_training_info(self) -> List[Dict[str, float]]:
+        self._require(self.training_names, "training info")
+        return [{"name": name, "value": _float_or_none(value)} for name, value in zip(self.training_names, self.training_values)]
+
+    def fetch_trial_info(self) -> List[Dict[str, Union[str, float]]]:
+        self._require(self.trial_names, "trial info")
+        return [
+            {"trial_id": trial_id, "name": name, "value_string": value_string, "value_float": _float_or_none(value_float)}
+            for trial_id, name, value_string, value_float
+            in zip(self.trial_ids, self.trial_names, self.trial_strings, self.trial_floats)
+        ]
+
+    def __getstate__(self) -> tuple:
+        # Plain tuple of slot values, without slot names repeated in every pickled snapshot
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for slot, value in zip(self.__slots__, state):
+            if isinstance(value, str):
+                value = sys.intern(value)
+            elif isinstance(value, tuple) and slot != "trial_ids":
+                value = _names(value)
+            setattr(self, slot, value)
+
+    def __repr__(self) -> str:
+        return f"ModelSnapshot({self.fully_model_id}, type={self.model_type}, created={self.created})"
@@ -0,0 +1,174 @@
+from typing import Dict, Any, Callable, Optional, TypeVar
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+T = TypeVar("T")
+
+
+class AdaptiveLimiter():
+    """
+    Concurrency limit of API calls adapted with AIMD: every successful call raises the limit by 1/limit
+    (about +1 per round of limit calls), a quota error multiplies it by decrease_factor. Quota errors
+    of calls that were in flight together count as one signal, the limit drops at most once per cooldown.
+    """
+
+    def __init__(self,
+                 initial: int = 16,
+                 minimum: int = 1,
+                 maximum: int = 128,
+                 decrease_factor: float = 0.5,
+                 cooldown: float = 1.0) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        # Limit starts within bounds, e.g. a transport over a small pool never exceeds its connections
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextmanager
+    def slot(self):
+        """Hold one of limit slots for the duration of an API call."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            previous = int(self._limit)
+            self._limit = min(float(self.maximum), self._limit + 1 / self._limit)
+            if int(self._limit) > previous:
+                self._condition.notify()
+
+    def on_throttle(self) -> None:
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._limit = max(float(self.minimum), self._limit * self.decrease_factor)
+                self._last_decrease = now
+
+
+class Transport():
+    """
+    HTTP and retry settings of BigQuery API calls. The shared client is built on a session with a
+    connection pool of pool_size connections. Calls run through call(): concurrency is bounded by an
+    AdaptiveLimiter, retryable errors are retried with jittered exponential backoff up to max_retries
+    times, and quota errors (429, rateLimitExceeded, quotaExceeded) lower the concurrency limit.
+    """
+
+    # Error reasons reported by BigQuery, in the errors list of API and job errors
+    throttle_reasons = frozenset({"rateLimitExceeded", "jobRateLimitExceeded", "quotaExceeded"})
+    retryable_reasons = throttle_reasons | {"backendError", "internalError", "badGateway"}
+
+    def __init__(self,
+                 pool_size: int = 128,
+                 max_retries: int = 5,
+                 initial_backoff: float = 0.5,
+                 max_backoff: float = 32.0,
+                 limiter: Optional[AdaptiveLimiter] = None) -> None:
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.limiter = limiter or AdaptiveLimiter(maximum=pool_size)
+
+        self._counters = {"attempts": 0, "retries": 0, "throttles": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def build_session(self, credentials):
+        """Authorized session with a connection pool sized for pool_size concurrent calls."""
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+
+        session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        return session
+
+    def build_client(self, credentials, project: Optional[str] = None, location: Optional[str] = None):
+        """BigQuery client sending requests through a pooled session."""
+        from google.cloud import bigquery
+        return bigquery.Client(
+            project=project, credentials=credentials, location=location, _http=self.build_session(credentials)
+        )
+
+    def call(self, function: Callable[[], T]) -> T:
+        """Run API call within the concurrency limit, retrying retryable errors."""
+
+        attempt = 0
+        while True:
+            with self.limiter.slot():
+                try:
+                    result = function()
+                except Exception as error:
+                    throttled = self.is_throttle(error)
+                    if throttled:
+                        self.limiter.on_throttle()
+                    retry = attempt < self.max_retries and (throttled or self.is_retryable(error))
+                    self._count("attempts", "retries" if retry else "failures", *(["throttles"] if throttled else []))
+                    if not retry:
+                        raise
+                else:
+                    self.limiter.on_success()
+                    self._count("attempts")
+                    return result
+
+            # Backoff outside of the slot, full jitter spreads retries of concurrent calls
+            time.sleep(random.uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** attempt)))
+            attempt += 1
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+    @staticmethod
+    def _status(error: Exception) -> Optional[int]:
+        """HTTP status of google.api_core (code) or requests (response.status_code) errors."""
+        response = getattr(error, "response", None)
+        return getattr(error, "code", None) or getattr(response, "status_code", None)
+
+    @classmethod
+    def error_reasons(cls, error: Exception) -> set:
+        """Reasons of BigQuery errors, e.g. rateLimitExceeded or bytesBilledLimitExceeded."""
+        return {item.get("reason") for item in getattr(error, "errors", None) or [] if isinstance(item, dict)}
+
+    @classmethod
+    def is_throttle(cls, error: Exception) -> bool:
+        """Quota or rate limit error, concurrency should back off."""
+        return cls._status(error) == 429 or bool(cls.error_reasons(error) & cls.throttle_reasons)
+
+    @classmethod
+    def is_retryable(cls, error: Exception) -> bool:
+        """Transient error worth retrying: quota, 5xx server errors and dropped connections."""
+        import requests
+
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if cls._status(error) in (429, 500, 502, 503, 504):
+            return True
+        return bool(cls.error_reasons(error) & cls.retryable_reasons)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of attempts by outcome, with current concurrency limit."""
+        with self._lock:
+            return {**self._counters, "limit": self.limiter.limit, "in_flight": self.limiter.in_flight}
@@ -0,0 +1,386 @@
+from typing import List, Dict, Optional, Any, Tuple
+import os
+import re
+import json
+import time
+import threading
+from .model_registry import ModelRegistry
+from .model_names import ModelNames
+from .reports import RegistrationReport
+
+
+class ModelEvent():
+    """Notification that a model was created or changed. ack_id identifies the event in its source."""
+
+    def __init__(self,
+                 project_id: str,
+                 dataset_id: str,
+                 model_id: str,
+                 timestamp: Optional[int] = None,
+                 ack_id: Any = None) -> None:
+        self.project_id = project_id
+        self.dataset_id = dataset_id
+        self.model_id = model_id
+        self.timestamp = timestamp
+        self.ack_id = ack_id
+
+    @property
+    def full_model_id(self) -> str:
+        return f"{self.project_id}.{self.dataset_id}.{self.model_id}"
+
+    def __repr__(self) -> str:
+        return f"ModelEvent({self.full_model_id}, timestamp={self.timestamp})"
+
+
+class EventSource():
+    """
+    Base class of model event sources consumed by ModelWatcher. Events are delivered at least once:
+    they are acknowledged after their models are registered, and position() returns a JSON-serializable
+    checkpoint from which a restarted source resumes delivery of unacknowledged events.
+    """
+
+    def poll(self, timeout: float) -> List[ModelEvent]:
+        """Return new events, waiting up to timeout seconds for some to arrive."""
+        raise NotImplementedError
+
+    def ack(self, events: List[ModelEvent]) -> None:
+        """Acknowledge events whose models were registered or given up on."""
+        pass
+
+    def position(self) -> Any:
+        """Checkpoint of the source, None if the source keeps its position itself."""
+        return None
+
+    def restore(self, position: Any) -> None:
+        """Resume from checkpoint returned by position()."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryEventSource(EventSource):
+    """
+    Event source fed by publish(), for local runs and tests. Position is the offset of the first
+    unacknowledged event, restoring it replays all events from that offset.
+    """
+
+    def __init__(self) -> None:
+        self._events: List[ModelEvent] = []
+        self._next = 0
+        self._acked = set()
+        self._committed = 0
+        self._condition = threading.Condition()
+
+    def publish(self, project_id: str, dataset_id: str, model_id: str, timestamp: Optional[int] = None) -> None:
+        with self._condition:
+            offset = len(self._events)
+            self._events.append(ModelEvent(project_id, dataset_id, model_id, timestamp, ack_id=offset))
+            self._condition.notify_all()
+
+    def poll(self, timeout: float) -> List[ModelEvent]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._next < len(self._events), timeout=timeout)
+            events = self._events[self._next:]
+            self._next = len(self._events)
+            return events
+
+    def ack(self, events: List[ModelEvent]) -> None:
+        with self._condition:
+            self._acked.update(event.ack_id for event in events)
+
+            # Position only moves over a contiguous prefix of acknowledged events
+            while self._committed in self._acked:
+                self._acked.discard(self._committed)
+                self._committed += 1
+
+    def position(self) -> int:
+        with self._condition:
+            return self._committed
+
+    def restore(self, position: int) -> None:
+        with self._condition:
+            self._committed = self._next = position
+            self._acked.clear()
+
+
+class PollingEventSource(EventSource):
+    """
+    Event source listing models of datasets every interval seconds. Models with lastModifiedTime
+    above the watermark are reported, the watermark is advanced as events are acknowledged and
+    never passes an unacknowledged event. Costs one list_models call per dataset and interval.
+    """
+
+    def __init__(self,
+                 registry: ModelRegistry,
+                 datasets: Optional[List[Tuple[str, str]]] = None,
+                 interval: float = 30.0,
+                 start_time: Optional[int] = None) -> None:
+        """
+        Datasets are (project_id, dataset_id) pairs, the registry dataset by default. Models changed after
+        start_time (epoch ms, now by default) are reported, existing models can be registered with sync_dataset.
+        """
+        self.connector = registry.connector
+        self.datasets = datasets or [(registry.project_id, registry.dataset_id)]
+        self.interval = interval
+
+        self._watermark = start_time if start_time is not None else int(time.time() * 1000)
+        self._next_poll = 0.0
+
+        # Delivered events above the watermark, by full model id
+        self._delivered: Dict[str, int] = {}
+        self._unacked: Dict[str, int] = {}
+
+    def poll(self, timeout: float) -> List[ModelEvent]:
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        self._next_poll = time.monotonic() + self.interval
+
+        events = []
+        for project_id, dataset_id in self.datasets:
+            for model in self.connector.list_models(f"{project_id}.{dataset_id}"):
+                if model.model_type not in ModelNames.SUPPORTED_MODELS or model.modified is None:
+                    continue
+
+                modified = int(model.modified.timestamp() * 1000)
+                full_model_id = f"{project_id}.{dataset_id}.{model.model_id}"
+                if modified <= self._watermark or self._delivered.get(full_model_id, -1) >= modified:
+                    continue
+
+                self._delivered[full_model_id] = modified
+                self._unacked[full_model_id] = modified
+                events.append(ModelEvent(project_id, dataset_id, model.model_id, modified))
+        return events
+
+    def ack(self, events: List[ModelEvent]) -> None:
+        for event in events:
+            if self._unacked.get(event.full_model_id) == event.timestamp:
+                del self._unacked[event.full_model_id]
+
+        # Watermark stays below the oldest unacknowledged change, so it is delivered again after restart
+        if self._unacked:
+            self._watermark = max(self._watermark, min(self._unacked.values()) - 1)
+        elif self._delivered:
+            self._watermark = max(self._watermark, max(self._delivered.values()))
+
+        self._delivered = {
+            full_model_id: modified for full_model_id, modified in self._delivered.items() if modified > self._watermark
+        }
+
+    def position(self) -> int:
+        return self._watermark
+
+    def restore(self, position: int) -> None:
+        self._watermark = position
+        self._delivered.clear()
+        self._unacked.clear()
+
+
+class PubSubEventSource(EventSource):
+    """
+    Event source pulling from a Pub/Sub subscription, e.g. of a Cloud Logging sink routing BigQuery
+    audit logs (protoPayload.resourceName of a model). Plain JSON messages with project_id, dataset_id
+    and model_id keys are accepted as well. Messages are acknowledged once models are registered,
+    the subscription keeps the position. Requires google-cloud-pubsub.
+    """
+
+    # Audit log resource names of models, e.g. projects/p/datasets/d/models/m
+    resource_pattern = re.compile(r"projects/([^/]+)/datasets/([^/]+)/models/([^/]+)")
+
+    def __init__(self, subscription: str, max_messages: int = 500, credentials=None) -> None:
+        """Subscription is a full path: projects/<project>/subscriptions/<subscription>."""
+        try:
+            from google.cloud import pubsub_v1
+        except ImportError:
+            raise ImportError("Pub/Sub event source requires google-cloud-pubsub, install it with: pip install google-cloud-pubsub")
+
+        self.subscription = subscription
+        self.max_messages = max_messages
+        self._subscriber = pubsub_v1.SubscriberClient(credentials=credentials)
+
+    def poll(self, timeout: float) -> List[ModelEvent]:
+        from google.api_core.exceptions import DeadlineExceeded
+
+        try:
+            response = self._subscriber.pull(
+                request={"subscription": self.subscription, "max_messages": self.max_messages}, timeout=timeout
+            )
+        except DeadlineExceeded:
+            return []
+
+        events, ignored = [], []
+        for received in response.received_messages:
+            event = self._parse(received.message.data, received.ack_id)
+            if event is None:
+                ignored.append(received.ack_id)
+            else:
+                events.append(event)
+
+        # Messages unrelated to model creation are dropped right away
+        if ignored:
+            self._subscriber.acknowledge(request={"subscription": self.subscription, "ack_ids": ignored})
+        return events
+
+    def _parse(self, data: bytes, ack_id: str) -> Optional[ModelEvent]:
+        """Parse audit log entry or plain JSON message, None for messages not announcing a model."""
+
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return None
+
+        if {"project_id", "dataset_id", "model_id"} <= message.keys():
+            return ModelEvent(message["project_id"], message["dataset_id"], message["model_id"], ack_id=ack_id)
+
+        payload = message.get("protoPayload", {})
+        if "modelDeletion" in payload.get("metadata", {}):
+            return None
+
+        match = self.resource_pattern.fullmatch(payload.get("resourceName", ""))
+        if match is None:
+            return None
+        return ModelEvent(*match.groups(), ack_id=ack_id)
+
+    def ack(self, events: List[ModelEvent]) -> None:
+        if events:
+            self._subscriber.acknowledge(
+                request={"subscription": self.subscription, "ack_ids": [event.ack_id for event in events]}
+            )
+
+    def close(self) -> None:
+        self._subscriber.close()
+
+
+class ModelWatcher():
+    """
+    Long-running registration of models as their creation events arrive. Events of a model are
+    debounced: it is registered once no new event came for debounce seconds, so models emitting
+    several events while training finishes are registered once. Ready models are registered
+    in batches through ModelRegistry.add_models and the registry sink is flushed. Events are then
+    acknowledged and the source position is saved to checkpoint_path. Delivery is at least once,
+    use MergeSink to make re-registration after a restart idempotent.
+    """
+
+    def __init__(self,
+                 registry: ModelRegistry,
+                 source: EventSource,
+                 debounce: float = 5.0,
+                 max_batch_size: int = 500,
+                 max_attempts: int = 3,
+                 checkpoint_path: Optional[str] = None,
+                 poll_timeout: float = 1.0) -> None:
+        self.registry = registry
+        self.source = source
+        self.debounce = debounce
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.checkpoint_path = checkpoint_path
+        self.poll_timeout = poll_timeout
+
+        # Full model id -> (events of the model, monotonic time of last event, failed attempts)
+        self._pending: Dict[str, Tuple[List[ModelEvent], float, int]] = {}
+        self._stop = threading.Event()
+
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as file:
+                self.source.restore(json.load(file)["position"])
+
+    def run_once(self) -> RegistrationReport:
+        """Poll source once and register models whose events settled, report uses full model ids."""
+
+        now = time.monotonic()
+        for event in self.source.poll(self.poll_timeout):
+            events, _, attempts = self._pending.get(event.full_model_id, ([], 0.0, 0))
+            self._pending[event.full_model_id] = (events + [event], now, attempts)
+
+        # Models are ready once their events settled, a full batch is registered right away
+        ready = [
+            full_model_id for full_model_id, (_, last_event, _) in self._pending.items()
+            if now - last_event >= self.debounce
+        ]
+        if len(self._pending) >= self.max_batch_size:
+            ready = list(self._pending)
+
+        report = RegistrationReport()
+        for start in range(0, len(ready), self.max_batch_size):
+            self._register(ready[start:start + self.max_batch_size], report)
+        return report
+
+    def run(self, max_iterations: Optional[int] = None) -> None:
+        """Run until stop() is called or max_iterations polls are done, pending models are registered on exit."""
+
+        self._stop.clear()
+        iterations = 0
+        try:
+            while not self._stop.is_set() and (max_iterations is None or iterations < max_iterations):
+                self.run_once()
+                iterations += 1
+        finally:
+            self.drain()
+
+    def stop(self) -> None:
+        """Ask run() to return after the current poll, safe to call from other threads or signal handlers."""
+        self._stop.set()
+
+    def drain(self) -> RegistrationReport:
+        """Register all pending models without waiting for debounce."""
+        report = RegistrationReport()
+        while self._pending:
+            self._register(list(self._pending)[:self.max_batch_size], report)
+        return report
+
+    def _register(self, full_model_ids: List[str], report: RegistrationReport) -> None:
+        """Register batch of pending models, failed models are retried up to max_attempts."""
+
+        # add_models looks models up per project and dataset
+        by_dataset: Dict[Tuple[str, str], List[str]] = {}
+        for full_model_id in full_model_ids:
+            project_id, dataset_id, model_id = full_model_id.split(".")
+            by_dataset.setdefault((project_id, dataset_id), []).append(model_id)
+
+        failed: Dict[str, str] = {}
+        for (project_id, dataset_id), model_ids in by_dataset.items():
+            try:
+                dataset_report = self.registry.add_models(model_ids, project_id, dataset_id, batch_size=self.max_batch_size)
+                self.registry.flush()
+            except Exception as error:
+                dataset_report = RegistrationReport()
+                for model_id in model_ids:
+                    dataset_report.add_failure(model_id, error)
+
+            for model_id in dataset_report.succeeded:
+                report.add_success(f"{project_id}.{dataset_id}.{model_id}")
+            for model_id, error in dataset_report.failed.items():
+                failed[f"{project_id}.{dataset_id}.{model_id}"] = error
+
+        done_events = []
+        now = time.monotonic()
+        for full_model_id in full_model_ids:
+            events, _, attempts = self._pending.pop(full_model_id)
+
+            if full_model_id in failed and attempts + 1 < self.max_attempts:
+                # Retried after another debounce period
+                self._pending[full_model_id] = (events, now, attempts + 1)
+                continue
+
+            if full_model_id in failed:
+                print(f"Warning: Model {full_model_id} was not registered after {self.max_attempts} attempts: {failed[full_model_id]}")
+                report.add_failure(full_model_id, failed[full_model_id])
+            done_events.extend(events)
+
+        self.source.ack(done_events)
+        self._save_checkpoint()
+
+    def _save_checkpoint(self) -> None:
+        if self.checkpoint_path is None:
+            return
+
+        # Write to temporary file first, so a crash never leaves a partial checkpoint
+        temporary_file = f"{self.checkpoint_path}.tmp"
+        with open(temporary_file, "w") as file:
+            json.dump({"position": self.source.position()}, file)
+        os.replace(temporary_file, self.checkpoint_path)
@@ -18,10 +18,8 @@ if __name__ == "__main__":
     # List models to add to the registry
     model_ids = ["model_forest_01", "model_forest_02", "model_forest_03"]
 
-    # Iterate over model ids and add them to the registry
-    for model in model_ids:
-        # Create Model Data instance
-        model = ModelData(project_id, dataset_id, model)
+    # Add models to registry table, metadata is fetched concurrently
+    report = registry.add_models(model_ids, max_workers=8)
 
-        # Add model to registry table 
-        registry.add_model(model)
+    # Inspect models that failed to register
+    print(report.failed)